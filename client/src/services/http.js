@@ -76,9 +76,31 @@ export async function request(method, path, body) {
     return parseJson(res);
 }
 
+/**
+ * POST a multipart form (file uploads); the browser sets the boundary.
+ * @param {string} path
+ * @param {FormData} formData
+ * @returns {Promise<any>}
+ */
+export async function postForm(path, formData) {
+    const res = await fetch(buildUrl(path), {
+        method: "POST",
+        credentials: "include",
+        body: formData,
+    });
+
+    if (!res.ok) {
+        await throwApiError(res);
+    }
+
+    return parseJson(res);
+}
+
 export const http = {
+    url: (path) => buildUrl(path),
     get: (path) => request("GET", path),
     post: (path, body) => request("POST", path, body),
+    postForm: (path, formData) => postForm(path, formData),
     patch: (path, body) => request("PATCH", path, body),
     delete: (path) => request("DELETE", path),
 };
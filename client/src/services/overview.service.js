@@ -4,4 +4,15 @@ export const overviewService = {
     today() {
         return http.get("/overview/today");
     },
+
+    /**
+     * Meal groups for several days. Recipes are returned once in
+     * `recipes` (keyed by id) and referenced by `recipeId` per placement.
+     * @param {string} from YYYY-MM-DD
+     * @param {number} [days]
+     */
+    range(from, days = 3) {
+        const params = new URLSearchParams({ from, days: String(days) });
+        return http.get(`/overview?${params.toString()}`);
+    },
 };
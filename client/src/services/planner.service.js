@@ -127,4 +127,37 @@ export const plannerService = {
         return http.post(`/meal-plans/weeks/${sourceWeekId}/copy`, payload);
     },
 
+    /**
+     * Copy a week onto `count` consecutive weeks in one request.
+     * @param {number} sourceWeekId
+     * @param {{count: number, weekStart?: string}} payload
+     * @returns {Promise<{weeks: MealPlanWeek[]}>}
+     */
+    rolloutWeek(sourceWeekId, payload) {
+        return http.post(`/meal-plans/weeks/${sourceWeekId}/rollout`, payload);
+    },
+
+    /**
+     * Apply an ordered batch of group/placement edits in one transaction.
+     * Ops: createGroup, updateGroup, deleteGroup, addRecipe, updateRecipe,
+     * removeRecipe, moveRecipe. Use `ref`/`groupRef` to target objects
+     * created earlier in the same batch.
+     * @param {number} weekId
+     * @param {Object[]} ops
+     * @returns {Promise<{week: MealPlanWeek, refs: Object<string, number>}>}
+     */
+    applyOps(weekId, ops) {
+        return http.post(`/meal-plans/weeks/${weekId}/ops`, { ops });
+    },
+
+    /**
+     * Download link for weeks starting between `from` and `to` (inclusive).
+     * @param {{from: string, to: string, format?: "csv"|"jsonl"}} opts
+     * @returns {string}
+     */
+    exportUrl({ from, to, format = "csv" }) {
+        const params = new URLSearchParams({ from, to, format });
+        return http.url(`/meal-plans/export?${params.toString()}`);
+    },
+
 };
@@ -7,6 +7,11 @@ export const publicRecipesService = {
     list() {
         return http.get("/public/recipes");
     },
+    listPage({ limit = 50, cursor = null } = {}) {
+        const params = new URLSearchParams({ limit: String(limit) });
+        if (cursor) params.set("cursor", cursor);
+        return http.get(`/public/recipes?${params.toString()}`);
+    },
     getById(recipeId) {
         return http.get(`/public/recipes/${recipeId}`);
     },
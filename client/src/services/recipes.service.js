@@ -24,6 +24,7 @@ import { http } from "./http.js";
  * @property {string|null} [notes]
  * @property {string} createdAt
  * @property {string} updatedAt
+ * @property {string|null} [externalId]
  * @property {RecipeIngredient[]} [ingredients]
  */
 
@@ -51,6 +52,26 @@ import { http } from "./http.js";
  * @property {RecipeIngredient[]} [ingredients]
  */
 
+/**
+ * @typedef {Object} ImportJob
+ * @property {number} id
+ * @property {"queued"|"running"|"succeeded"|"failed"} status
+ * @property {"create"|"upsert"} mode
+ * @property {"create"|"skip"} onDuplicate
+ * @property {number} rowsParsed
+ * @property {number} recipesCreated
+ * @property {number} recipesUpdated
+ * @property {number} recipesUnchanged
+ * @property {number} recipesSkipped
+ * @property {number} duplicatesFound
+ * @property {string|null} error
+ * @property {number} attempts
+ * @property {string} createdAt
+ * @property {string|null} startedAt
+ * @property {string|null} finishedAt
+ * @property {number|null} elapsedSeconds
+ */
+
 export const recipesService = {
     /**
      * @returns {Promise<Recipe[]>}
@@ -59,6 +80,50 @@ export const recipesService = {
         return http.get("/recipes");
     },
 
+    /**
+     * Keyset-paginated listing. Pass `fields` to fetch only what the view
+     * shows (e.g. ["title", "prepMin", "cookMin"]).
+     * @param {{limit?: number, cursor?: string|null, fields?: string[]}} [opts]
+     * @returns {Promise<{items: Partial<Recipe>[], nextCursor: string|null}>}
+     */
+    listPage({ limit = 50, cursor = null, fields } = {}) {
+        const params = new URLSearchParams({ limit: String(limit) });
+        if (cursor) params.set("cursor", cursor);
+        if (fields && fields.length) params.set("fields", fields.join(","));
+        return http.get(`/recipes?${params.toString()}`);
+    },
+
+    /**
+     * Ranked full-text search over your recipes and public ones.
+     * @param {string} q
+     * @param {{scope?: "mine"|"public"|"all", limit?: number, offset?: number}} [opts]
+     * @returns {Promise<{items: Recipe[], nextOffset: number|null}>}
+     */
+    search(q, { scope = "all", limit = 20, offset = 0 } = {}) {
+        const params = new URLSearchParams({
+            q,
+            scope,
+            limit: String(limit),
+            offset: String(offset),
+        });
+        return http.get(`/recipes/search?${params.toString()}`);
+    },
+
+    /**
+     * Recipes ranked by how many of their ingredients you already have.
+     * @param {string[]} ingredients
+     * @param {{scope?: "mine"|"public"|"all", limit?: number}} [opts]
+     * @returns {Promise<{items: {recipe: Recipe, matchedCount: number, ingredientCount: number, coverage: number, missing: string[]}[]}>}
+     */
+    cookWith(ingredients, { scope = "all", limit = 20 } = {}) {
+        const params = new URLSearchParams({
+            ingredients: ingredients.join(","),
+            scope,
+            limit: String(limit),
+        });
+        return http.get(`/recipes/cook-with?${params.toString()}`);
+    },
+
     /**
      * @param {number} recipeId
      * @returns {Promise<Recipe>}
@@ -68,17 +133,78 @@ export const recipesService = {
     },
 
     /**
+     * Your recipes that look like near-duplicates of this one.
+     * @param {number} recipeId
+     * @returns {Promise<{items: {recipeId: number, title: string, similarity: number}[]}>}
+     */
+    duplicates(recipeId) {
+        return http.get(`/recipes/${recipeId}/duplicates`);
+    },
+
+    /**
+     * The response lists likely near-duplicates already in your library.
      * @param {RecipeCreatePayload} payload
-     * @returns {Promise<Recipe>}
+     * @returns {Promise<Recipe & {possibleDuplicates: {recipeId: number, title: string, similarity: number}[]}>}
      */
     create(payload) {
         return http.post("/recipes", payload);
     },
 
     /**
+     * Upload a CSV file; the server streams it and commits in chunks.
+     * With mode "upsert", recipes matching an existing external_id (or
+     * title) are updated in place, and unchanged ones are left alone.
+     * @param {File} file
+     * @param {{onDuplicate?: "create"|"skip", mode?: "create"|"upsert"}} [opts]
+     * @returns {Promise<{createdCount: number, skippedCount: number, updatedCount?: number, unchangedCount?: number, duplicates: object[], skipped: object[]}>}
+     */
+    importCsvFile(file, { onDuplicate = "create", mode = "create" } = {}) {
+        const form = new FormData();
+        form.append("file", file);
+        form.append("onDuplicate", onDuplicate);
+        form.append("mode", mode);
+        return http.postForm("/recipes/from-csv", form);
+    },
+
+    /**
+     * Queue a CSV file as a background import; poll with getImportJob.
+     * @param {File} file
+     * @param {{onDuplicate?: "create"|"skip", mode?: "create"|"upsert"}} [opts]
+     * @returns {Promise<ImportJob>}
+     */
+    importCsvFileAsync(file, { onDuplicate = "create", mode = "create" } = {}) {
+        const form = new FormData();
+        form.append("file", file);
+        form.append("onDuplicate", onDuplicate);
+        form.append("mode", mode);
+        return http.postForm("/recipes/from-csv?async=1", form);
+    },
+
+    /**
+     * Progress of a background import.
+     * @param {number} jobId
+     * @returns {Promise<ImportJob>}
+     */
+    getImportJob(jobId) {
+        return http.get(`/import-jobs/${jobId}`);
+    },
+
+    /**
+     * Create (no `id`) or update (with `id`) many recipes in one request.
+     * Invalid items are reported per index and do not fail the batch.
+     * @param {Array<RecipeCreatePayload | (RecipeUpdatePayload & {id: number})>} recipes
+     * @returns {Promise<{results: {index: number, status: "created"|"updated"|"error", id?: number, error?: string}[], created: number, updated: number, failed: number}>}
+     */
+    bulkSave(recipes) {
+        return http.post("/recipes/bulk", recipes);
+    },
+
+    /**
+     * Ingredients carrying an `id` update that row in place; the response
+     * reports how many ingredient rows were updated, inserted and deleted.
      * @param {number} recipeId
      * @param {RecipeUpdatePayload} payload
-     * @returns {Promise<Recipe>}
+     * @returns {Promise<Recipe & {ingredientChanges?: {updated: number, inserted: number, deleted: number}}>}
      */
     update(recipeId, payload) {
         return http.patch(`/recipes/${recipeId}`, payload);
@@ -99,4 +225,14 @@ export const recipesService = {
         return http.post(`/recipes/${recipeId}/unpublish`, {});
     },
 
+    /**
+     * Download link for the user's library (streamed by the server).
+     * The CSV format can be re-imported with importCsvFile.
+     * @param {{format?: "csv"|"jsonl"}} [opts]
+     * @returns {string}
+     */
+    exportUrl({ format = "csv" } = {}) {
+        return http.url(`/recipes/export?format=${format}`);
+    },
+
 };
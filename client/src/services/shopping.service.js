@@ -13,6 +13,21 @@ import { http } from "./http.js";
  * @property {ShoppingListItem[]} items
  */
 
+/**
+ * @typedef {Object} ShoppingListWeekQuantity
+ * @property {number} weekId
+ * @property {string} weekStart
+ * @property {number} quantity
+ */
+
+/**
+ * @typedef {Object} ShoppingListRangeResponse
+ * @property {string} [from]
+ * @property {string} [to]
+ * @property {number[]} weekIds
+ * @property {(ShoppingListItem & {weeks?: ShoppingListWeekQuantity[]})[]} items
+ */
+
 export const shoppingService = {
     /**
      * @param {number} weekId
@@ -21,4 +36,17 @@ export const shoppingService = {
     getForWeek(weekId) {
         return http.get(`/shopping-lists?weekId=${weekId}`);
     },
+
+    /**
+     * Aggregate every week starting between two dates (inclusive).
+     * @param {string} from YYYY-MM-DD
+     * @param {string} to YYYY-MM-DD
+     * @param {boolean} [byWeek]
+     * @returns {Promise<ShoppingListRangeResponse>}
+     */
+    getForRange(from, to, byWeek = false) {
+        const params = new URLSearchParams({ from, to });
+        if (byWeek) params.set("byWeek", "1");
+        return http.get(`/shopping-lists?${params.toString()}`);
+    },
 };
@@ -7,7 +7,7 @@ from flask_cors import CORS
 from .extensions import db, migrate, bcrypt
 
 
-def create_app() -> Flask:
+def create_app(config_object: str = "config.DevelopmentConfig") -> Flask:
     """
     App factory.
     Loads env, config, initializes extensions, registers blueprints.
@@ -20,7 +20,7 @@ def create_app() -> Flask:
     os.makedirs(app.instance_path, exist_ok=True)
 
     # Config
-    app.config.from_object("config.DevelopmentConfig")
+    app.config.from_object(config_object)
 
     # Override the default sqlite path if using the default sqlite config
     if not app.config.get("SQLALCHEMY_DATABASE_URI") or app.config[
@@ -55,6 +55,7 @@ def create_app() -> Flask:
     from .routes.auth import auth_bp
     from .routes.overview import overview_bp
     from .routes.public_recipes import public_recipes_bp
+    from .routes.import_jobs import import_jobs_bp
 
     app.register_blueprint(health_bp, url_prefix="/api")
     app.register_blueprint(recipes_bp, url_prefix="/api")
@@ -66,5 +67,16 @@ def create_app() -> Flask:
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(overview_bp, url_prefix="/api")
     app.register_blueprint(public_recipes_bp, url_prefix="/api")
+    app.register_blueprint(import_jobs_bp, url_prefix="/api")
+
+    # Background imports interrupted by a restart
+    from .services.import_jobs_service import init_import_jobs
+
+    init_import_jobs(app)
+
+    # CLI
+    from .commands import register_commands
+
+    register_commands(app)
 
     return app
@@ -0,0 +1,65 @@
+import click
+from flask import Flask
+
+from app.extensions import db
+from app.models.meal_plan_week import MealPlanWeek
+from app.services.ingredient_index_service import rebuild_ingredient_index
+from app.services.recipes_service import rebuild_content_hashes
+from app.services.search_service import rebuild_search_index
+from app.services.similarity_service import rebuild_similarity_index
+from app.services.shopping_service import check_week_shopping_list
+
+
+def register_commands(app: Flask) -> None:
+    """Attach maintenance CLI commands (`flask <command>`)."""
+
+    @app.cli.command("check-shopping-lists")
+    @click.option("--week-id", type=int, default=None, help="Only check this week.")
+    @click.option("--repair", is_flag=True, help="Rebuild weeks that differ.")
+    def check_shopping_lists(week_id: int | None, repair: bool):
+        """Verify materialized shopping lists against a fresh aggregate."""
+        query = MealPlanWeek.query.filter(MealPlanWeek.shopping_list_stale.is_(False))
+        if week_id is not None:
+            query = query.filter(MealPlanWeek.id == week_id)
+
+        bad = 0
+        for week in query.order_by(MealPlanWeek.id).all():
+            problems = check_week_shopping_list(week, repair=repair)
+            if problems:
+                bad += 1
+                click.echo(f"week {week.id}: {len(problems)} mismatched item(s)")
+                for p in problems:
+                    click.echo(f"  {p}")
+
+        if repair:
+            db.session.commit()
+
+        click.echo(f"{bad} inconsistent week(s)" + (" repaired" if repair else ""))
+
+    @app.cli.command("rebuild-search-index")
+    def rebuild_search_index_command():
+        """Rebuild the recipe full-text index from scratch."""
+        rebuild_search_index()
+        db.session.commit()
+        click.echo("search index rebuilt")
+
+    @app.cli.command("rebuild-ingredient-index")
+    def rebuild_ingredient_index_command():
+        """Rebuild the "what can I cook with" ingredient postings."""
+        rebuild_ingredient_index()
+        db.session.commit()
+        click.echo("ingredient index rebuilt")
+
+    @app.cli.command("rebuild-similarity-index")
+    def rebuild_similarity_index_command():
+        """Recompute near-duplicate signatures for every recipe."""
+        rebuild_similarity_index()
+        db.session.commit()
+        click.echo("similarity index rebuilt")
+
+    @app.cli.command("rebuild-content-hashes")
+    def rebuild_content_hashes_command():
+        """Recompute the content hash upsert imports compare recipes by."""
+        rebuild_content_hashes()
+        db.session.commit()
+        click.echo("content hashes rebuilt")
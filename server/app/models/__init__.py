@@ -4,3 +4,9 @@ from .recipe_ingredient import RecipeIngredient
 from .meal_plan_week import MealPlanWeek
 from .meal_group import MealGroup
 from .meal_group_recipe import MealGroupRecipe
+from .shopping_list_item import ShoppingListItem
+from .recipe_search import SEARCH_TABLE
+from .ingredient_posting import IngredientPosting
+from .recipe_signature import RecipeSignature
+from .recipe_lsh_bucket import RecipeLshBucket
+from .import_job import ImportJob
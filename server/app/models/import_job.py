@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+
+from app.extensions import db
+
+
+class ImportJob(db.Model):
+    """
+    A recipe CSV import running in the background.
+
+    The uploaded file is kept under instance/import_jobs/ until the job
+    finishes. Progress is committed together with each chunk of recipes, so
+    a job interrupted by a worker restart resumes after its last chunk.
+    """
+
+    __tablename__ = "import_jobs"
+    __table_args__ = (
+        # Active jobs per user, and jobs to resume on startup
+        db.Index("ix_import_jobs_user_status", "user_id", "status"),
+        db.Index("ix_import_jobs_status_heartbeat", "status", "heartbeat_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    # queued | running | succeeded | failed
+    status = db.Column(db.String(16), nullable=False, default="queued")
+    # create | upsert (see import_recipe_groups)
+    mode = db.Column(db.String(16), nullable=False, default="create")
+    on_duplicate = db.Column(db.String(16), nullable=False, default="create")
+    source_path = db.Column(db.String(500), nullable=True)
+
+    # Committed progress
+    groups_done = db.Column(db.Integer, nullable=False, default=0)
+    rows_parsed = db.Column(db.Integer, nullable=False, default=0)
+    recipes_created = db.Column(db.Integer, nullable=False, default=0)
+    recipes_updated = db.Column(db.Integer, nullable=False, default=0)
+    recipes_unchanged = db.Column(db.Integer, nullable=False, default=0)
+    recipes_skipped = db.Column(db.Integer, nullable=False, default=0)
+    duplicates_found = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # Lease token of the run holding the job (see import_jobs_service)
+    worker_id = db.Column(db.String(64), nullable=True)
+    heartbeat_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    created_at = db.Column(
+        db.DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    started_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    def to_dict(self):
+        started = _aware(self.started_at)
+        finished = _aware(self.finished_at)
+        elapsed = None
+        if started is not None:
+            end = finished or datetime.now(timezone.utc)
+            elapsed = round((end - started).total_seconds(), 3)
+
+        return {
+            "id": self.id,
+            "status": self.status,
+            "mode": self.mode,
+            "onDuplicate": self.on_duplicate,
+            "rowsParsed": self.rows_parsed,
+            "recipesCreated": self.recipes_created,
+            "recipesUpdated": self.recipes_updated,
+            "recipesUnchanged": self.recipes_unchanged,
+            "recipesSkipped": self.recipes_skipped,
+            "duplicatesFound": self.duplicates_found,
+            "error": self.error,
+            "attempts": self.attempts,
+            "createdAt": self.created_at.isoformat(),
+            "startedAt": self.started_at.isoformat() if self.started_at else None,
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None,
+            "elapsedSeconds": elapsed,
+        }
+
+
+def _aware(value: datetime | None) -> datetime | None:
+    # SQLite hands back naive datetimes for timezone-aware columns
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
@@ -0,0 +1,42 @@
+from app.extensions import db
+
+
+class IngredientPosting(db.Model):
+    """
+    Inverted index entry: one normalized ingredient token -> one ingredient.
+
+    Maintained by ingredient_index_service; powers "what can I cook with"
+    lookups without scanning recipe_ingredients. The recipe's owner and
+    visibility are copied in so lookups can narrow a token's postings to the
+    recipes the user may see before aggregating.
+    """
+
+    __tablename__ = "ingredient_postings"
+    __table_args__ = (
+        db.Index("ix_ingredient_postings_token_user", "token", "user_id"),
+        db.Index("ix_ingredient_postings_token_public", "token", "is_public"),
+    )
+
+    token = db.Column(db.String(80), primary_key=True)
+
+    ingredient_id = db.Column(
+        db.Integer,
+        db.ForeignKey("recipe_ingredients.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    recipe_id = db.Column(
+        db.Integer,
+        db.ForeignKey("recipes.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    # Mirrors recipes.is_public; kept in sync by the publish toggle
+    is_public = db.Column(db.Boolean, nullable=False, default=False)
@@ -1,5 +1,7 @@
 from datetime import date
 
+from sqlalchemy import insert_sentinel
+
 from app.extensions import db
 
 
@@ -15,6 +17,14 @@ class MealGroup(db.Model):
         index=True,
     )
 
+    # Denormalized owner (= week.user_id) so lookups can authorize by id
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
     # Day inside the week (YYYY-MM-DD)
     day = db.Column(db.Date, nullable=False, index=True)
 
@@ -23,6 +33,10 @@ class MealGroup(db.Model):
 
     sort_order = db.Column(db.Integer, nullable=False, default=0)
 
+    # Filled by SQLAlchemy during batched inserts so RETURNING ids can be
+    # put back in parameter order (sort_by_parameter_order) on SQLite
+    _sentinel = insert_sentinel("_sentinel")
+
     week = db.relationship("MealPlanWeek", back_populates="meal_groups")
 
     group_recipes = db.relationship(
@@ -13,6 +13,14 @@ class MealGroupRecipe(db.Model):
         index=True,
     )
 
+    # Denormalized owner (= meal_group.user_id) so lookups can authorize by id
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
     recipe_id = db.Column(
         db.Integer,
         db.ForeignKey("recipes.id", ondelete="CASCADE"),
@@ -27,6 +27,11 @@ class MealPlanWeek(db.Model):
         nullable=False,
     )
 
+    # True when shopping_list_items must be rebuilt before the next read
+    shopping_list_stale = db.Column(
+        db.Boolean, nullable=False, default=True, server_default=db.true()
+    )
+
     user = db.relationship("User", back_populates="meal_plan_weeks")
 
     meal_groups = db.relationship(
@@ -37,6 +42,13 @@ class MealPlanWeek(db.Model):
         order_by="MealGroup.sort_order.asc()",
     )
 
+    shopping_list_items = db.relationship(
+        "ShoppingListItem",
+        back_populates="week",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
     def to_dict(self, include_groups: bool = False):
         data = {
             "id": self.id,
@@ -1,9 +1,20 @@
 from datetime import datetime, timezone
+
+from sqlalchemy import insert_sentinel
+
 from app.extensions import db
 
 
 class Recipe(db.Model):
     __tablename__ = "recipes"
+    __table_args__ = (
+        # Keyset pagination of a user's recipes, newest first
+        db.Index("ix_recipes_user_created", "user_id", "created_at", "id"),
+        # Keyset pagination of the public feed, latest update first
+        db.Index("ix_recipes_public_updated", "is_public", "updated_at", "id"),
+        # Upsert imports match rows by external id
+        db.Index("ix_recipes_user_external_id", "user_id", "external_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -23,6 +34,19 @@ class Recipe(db.Model):
     notes = db.Column(db.Text, nullable=True)
     is_public = db.Column(db.Boolean, nullable=False, default=False)
 
+    # Id of the recipe in the user's own spreadsheet or app, set by imports
+    external_id = db.Column(db.String(200), nullable=True)
+    # sha256 of the normalized fields and ingredients (recipe_content_hash);
+    # upsert imports skip rows whose hash matches
+    content_hash = db.Column(db.String(64), nullable=True)
+    # Background import that created the recipe; resumed jobs replay from it
+    import_job_id = db.Column(
+        db.Integer,
+        db.ForeignKey("import_jobs.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+
     created_at = db.Column(
         db.DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
@@ -35,6 +59,10 @@ class Recipe(db.Model):
         nullable=False,
     )
 
+    # Filled by SQLAlchemy during batched inserts so RETURNING ids can be
+    # put back in parameter order (sort_by_parameter_order) on SQLite
+    _sentinel = insert_sentinel("_sentinel")
+
     user = db.relationship("User", back_populates="recipes")
 
     ingredients = db.relationship(
@@ -66,6 +94,7 @@ class Recipe(db.Model):
             "createdAt": self.created_at.isoformat(),
             "updatedAt": self.updated_at.isoformat(),
             "isPublic": self.is_public,
+            "externalId": self.external_id,
         }
         if include_ingredients:
             data["ingredients"] = [i.to_dict() for i in self.ingredients]
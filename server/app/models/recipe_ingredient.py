@@ -1,4 +1,7 @@
+from sqlalchemy import event
+
 from app.extensions import db
+from app.services.units import canonicalize
 
 
 class RecipeIngredient(db.Model):
@@ -18,6 +21,13 @@ class RecipeIngredient(db.Model):
     unit = db.Column(db.String(40), nullable=True)
     notes = db.Column(db.String(240), nullable=True)
 
+    # Shopping-list aggregation key, derived from name on every write
+    name_key = db.Column(db.String(200), nullable=False, default="")
+
+    # Derived from (quantity, unit) on every write; see services/units.py.
+    canonical_unit = db.Column(db.String(40), nullable=True)
+    base_quantity = db.Column(db.Float, nullable=True)
+
     sort_order = db.Column(db.Integer, nullable=False, default=0)
 
     recipe = db.relationship("Recipe", back_populates="ingredients")
@@ -32,3 +42,22 @@ class RecipeIngredient(db.Model):
             "notes": self.notes,
             "sortOrder": self.sort_order,
         }
+
+
+def ingredient_name_key(name: str | None) -> str:
+    """
+    Normalized name that shopping lists group by ("" for blank names).
+
+    Computed in Python rather than with SQL lower/trim, which only fold
+    ASCII case and only trim spaces.
+    """
+    return (name or "").strip().lower()
+
+
+@event.listens_for(RecipeIngredient, "before_insert")
+@event.listens_for(RecipeIngredient, "before_update")
+def _sync_canonical_unit(mapper, connection, target: RecipeIngredient) -> None:
+    target.name_key = ingredient_name_key(target.name)
+    target.canonical_unit, target.base_quantity = canonicalize(
+        target.quantity, target.unit
+    )
@@ -0,0 +1,29 @@
+from app.extensions import db
+
+
+class RecipeLshBucket(db.Model):
+    """
+    One LSH band hash of a recipe's MinHash signature.
+
+    Recipes sharing any bucket are near-duplicate candidates; see
+    similarity_service.
+    """
+
+    __tablename__ = "recipe_lsh_buckets"
+    __table_args__ = (
+        db.Index("ix_recipe_lsh_buckets_user_bucket", "user_id", "bucket"),
+    )
+
+    recipe_id = db.Column(
+        db.Integer,
+        db.ForeignKey("recipes.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    bucket = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
@@ -0,0 +1,30 @@
+"""
+Full-text index over recipes (SQLite FTS5).
+
+`recipe_search` is an FTS5 virtual table whose rowid is the recipe id. It is
+not a mapped model; search_service keeps it in sync. The DDL hooks below make
+`db.create_all()` / `db.drop_all()` manage it alongside the recipes table.
+"""
+
+from sqlalchemy import DDL, event
+
+from app.models.recipe import Recipe
+
+SEARCH_TABLE = "recipe_search"
+
+CREATE_SEARCH_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "title, description, instructions, ingredients, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+event.listen(
+    Recipe.__table__,
+    "after_create",
+    DDL(CREATE_SEARCH_TABLE).execute_if(dialect="sqlite"),
+)
+event.listen(
+    Recipe.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {SEARCH_TABLE}").execute_if(dialect="sqlite"),
+)
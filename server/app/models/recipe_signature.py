@@ -0,0 +1,20 @@
+from app.extensions import db
+
+
+class RecipeSignature(db.Model):
+    """
+    MinHash signature of a recipe's title words and ingredient set.
+
+    Maintained by similarity_service; compared to estimate how alike two
+    recipes are without loading their ingredients.
+    """
+
+    __tablename__ = "recipe_signatures"
+
+    recipe_id = db.Column(
+        db.Integer,
+        db.ForeignKey("recipes.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    signature = db.Column(db.LargeBinary, nullable=False)
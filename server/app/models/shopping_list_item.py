@@ -0,0 +1,42 @@
+from app.extensions import db
+
+
+class ShoppingListItem(db.Model):
+    """
+    Materialized shopping list row for a week.
+
+    Maintained incrementally by shopping_service as placements and recipes
+    change; `contributions` counts the (placement, ingredient) pairs summed
+    into the row so it can be dropped when the last one goes away.
+    """
+
+    __tablename__ = "shopping_list_items"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "week_id", "name_key", "canonical_unit", name="uq_shopping_item_key"
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    week_id = db.Column(
+        db.Integer,
+        db.ForeignKey("meal_plan_weeks.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    # Aggregation key: normalized name + canonical unit
+    name_key = db.Column(db.String(200), nullable=False)
+    canonical_unit = db.Column(db.String(40), nullable=True)
+
+    # Display values: from the last contributing row in plan order, as the
+    # rebuild picks them. Delta updates set label_stale and the next read
+    # re-derives them with the same rule.
+    name = db.Column(db.String(200), nullable=False)
+    unit = db.Column(db.String(40), nullable=True)
+    label_stale = db.Column(db.Boolean, nullable=False, default=False)
+
+    base_quantity = db.Column(db.Float, nullable=False, default=0.0)
+    contributions = db.Column(db.Integer, nullable=False, default=0)
+
+    week = db.relationship("MealPlanWeek", back_populates="shopping_list_items")
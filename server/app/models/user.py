@@ -10,6 +10,9 @@ class User(db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
 
+    # Bumped by every mutation of the user's data; drives GET ETags
+    revision = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     created_at = db.Column(
         db.DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
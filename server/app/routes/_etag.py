@@ -0,0 +1,40 @@
+import hashlib
+from datetime import date
+from functools import wraps
+
+from flask import make_response, request, session
+
+from app.services.revisions import get_user_revision
+
+
+def conditional_by_revision(fn):
+    """
+    Answer GETs with an ETag derived from the user's data revision.
+
+    The tag covers the user's revision, the request path + query string and
+    today's date (for endpoints that default to "today"). If the client's
+    If-None-Match matches, a 304 is returned before the view runs, so no
+    queries or serialization beyond the revision lookup happen.
+
+    Must be applied inside `login_required`.
+    """
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        user_id = session["user_id"]
+        revision = get_user_revision(user_id)
+        raw = f"{user_id}:{revision}:{date.today().isoformat()}:{request.full_path}"
+        etag = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+        if request.if_none_match.contains_weak(etag):
+            response = make_response("", 304)
+        else:
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag, weak=True)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+
+    return wrapper
@@ -1,8 +1,8 @@
 from flask import Blueprint, jsonify, request, session
 
-from app.models.meal_group import MealGroup
-from app.models.meal_group_recipe import MealGroupRecipe
 from app.services.meal_plans_service import (
+    get_group_for_user,
+    get_group_recipe_for_user,
     add_recipe_to_group,
     update_group_recipe,
     delete_group_recipe,
@@ -17,7 +17,7 @@ group_recipes_bp = Blueprint("group_recipes", __name__)
 def add_recipe(group_id: int):
     user_id = session["user_id"]
 
-    group = MealGroup.query.get(group_id)
+    group = get_group_for_user(user_id, group_id)
     if not group:
         return jsonify({"error": "Meal group not found"}), 404
 
@@ -33,7 +33,7 @@ def add_recipe(group_id: int):
 def patch_group_recipe(group_recipe_id: int):
     user_id = session["user_id"]
 
-    gr = MealGroupRecipe.query.get(group_recipe_id)
+    gr = get_group_recipe_for_user(user_id, group_recipe_id)
     if not gr:
         return jsonify({"error": "Meal group recipe not found"}), 404
 
@@ -49,7 +49,7 @@ def patch_group_recipe(group_recipe_id: int):
 def remove_group_recipe(group_recipe_id: int):
     user_id = session["user_id"]
 
-    gr = MealGroupRecipe.query.get(group_recipe_id)
+    gr = get_group_recipe_for_user(user_id, group_recipe_id)
     if not gr:
         return jsonify({"error": "Meal group recipe not found"}), 404
 
@@ -0,0 +1,16 @@
+from flask import Blueprint, jsonify, session
+
+from app.routes._auth_guard import login_required
+from app.services.import_jobs_service import get_import_job
+
+import_jobs_bp = Blueprint("import_jobs", __name__)
+
+
+@import_jobs_bp.get("/import-jobs/<int:job_id>")
+@login_required
+def get_import_job_route(job_id: int):
+    """Progress of a background CSV import (see POST /recipes/from-csv?async=1)."""
+    job = get_import_job(session["user_id"], job_id)
+    if not job:
+        return jsonify({"error": "Import job not found"}), 404
+    return jsonify(job.to_dict())
@@ -1,8 +1,8 @@
 from math import log
 from flask import Blueprint, jsonify, request, session
 
-from app.models.meal_group import MealGroup
 from app.services.meal_plans_service import (
+    get_group_for_user,
     create_meal_group,
     update_meal_group,
     delete_meal_group,
@@ -27,7 +27,7 @@ def create_group():
 @login_required
 def patch_group(group_id: int):
     user_id = session["user_id"]
-    group = MealGroup.query.get(group_id)
+    group = get_group_for_user(user_id, group_id)
     if not group:
         return jsonify({"error": "Meal group not found"}), 404
 
@@ -42,7 +42,7 @@ def patch_group(group_id: int):
 @login_required
 def remove_group(group_id: int):
     user_id = session["user_id"]
-    group = MealGroup.query.get(group_id)
+    group = get_group_for_user(user_id, group_id)
     if not group:
         return jsonify({"error": "Meal group not found"}), 404
 
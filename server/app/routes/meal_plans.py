@@ -1,8 +1,15 @@
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, Response, jsonify, request, session, stream_with_context
 
+from app.services.export_service import export_meal_plans
 from app.services.meal_plans_service import get_or_create_week, get_week_by_id
-from app.services.meal_plans_service import copy_week
+from app.services.meal_plans_service import (
+    _parse_iso_date,
+    apply_week_ops,
+    copy_week,
+    rollout_week,
+)
 from app.routes._auth_guard import login_required
+from app.routes._etag import conditional_by_revision
 
 meal_plans_bp = Blueprint("meal_plans", __name__)
 
@@ -15,16 +22,47 @@ def create_or_get_week():
     week_start = body.get("weekStart")
     try:
         week = get_or_create_week(user_id, week_start)
+        week = get_week_by_id(user_id, week.id, include_groups=True)
         return jsonify(week.to_dict(include_groups=True)), 201
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
 
+@meal_plans_bp.get("/meal-plans/export")
+@login_required
+def export_meal_plans_route():
+    """
+    Query params:
+      - from, to: YYYY-MM-DD; weeks starting in this range (inclusive)
+      - format: csv (default) | jsonl
+
+    The body is streamed.
+    """
+    args = request.args
+    fmt = args.get("format", "csv")
+    try:
+        chunks = export_meal_plans(
+            session["user_id"],
+            _parse_iso_date(args.get("from")),
+            _parse_iso_date(args.get("to")),
+            fmt,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype="text/csv" if fmt == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="meal-plans.{fmt}"'},
+    )
+
+
 @meal_plans_bp.get("/meal-plans/weeks/<int:week_id>")
 @login_required
+@conditional_by_revision
 def get_week(week_id: int):
     user_id = session["user_id"]
-    week = get_week_by_id(user_id, week_id)
+    week = get_week_by_id(user_id, week_id, include_groups=True)
     if not week:
         return jsonify({"error": "Week not found"}), 404
 
@@ -39,6 +77,45 @@ def copy_week_route(week_id: int):
     week_start = body.get("weekStart")
     try:
         target = copy_week(user_id, week_id, week_start)
+        target = get_week_by_id(user_id, target.id, include_groups=True)
         return jsonify(target.to_dict(include_groups=True)), 201
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+
+
+@meal_plans_bp.post("/meal-plans/weeks/<int:week_id>/rollout")
+@login_required
+def rollout_week_route(week_id: int):
+    """
+    Body:
+      - count: int (number of weeks to fill)
+      - weekStart: YYYY-MM-DD (optional; first target, default next week)
+    """
+    user_id = session["user_id"]
+    body = request.get_json() or {}
+    try:
+        targets = rollout_week(
+            user_id, week_id, int(body.get("count", 0)), body.get("weekStart")
+        )
+        return jsonify({"weeks": [w.to_dict() for w in targets]}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@meal_plans_bp.post("/meal-plans/weeks/<int:week_id>/ops")
+@login_required
+def apply_ops_route(week_id: int):
+    """
+    Body:
+      - ops: ordered list of planner edits (see apply_week_ops)
+
+    Returns the updated week tree plus `refs` mapping client refs to new ids.
+    """
+    user_id = session["user_id"]
+    body = request.get_json() or {}
+    try:
+        week, refs = apply_week_ops(user_id, week_id, body.get("ops"))
+        week = get_week_by_id(user_id, week.id, include_groups=True)
+        return jsonify({"week": week.to_dict(include_groups=True), "refs": refs})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
@@ -1,14 +1,38 @@
-from flask import Blueprint, jsonify, session
+from datetime import date
+
+from flask import Blueprint, jsonify, request, session
 
 from app.routes._auth_guard import login_required
-from app.services.overview_service import get_today_overview
+from app.routes._etag import conditional_by_revision
+from app.services.overview_service import get_range_overview, get_today_overview
 
 overview_bp = Blueprint("overview", __name__)
 
 
 @overview_bp.get("/overview/today")
 @login_required
+@conditional_by_revision
 def overview_today():
     user_id = session["user_id"]
     payload = get_today_overview(user_id=user_id)
     return jsonify(payload)
+
+
+@overview_bp.get("/overview")
+@login_required
+@conditional_by_revision
+def overview_range():
+    """
+    Query params:
+      - from: YYYY-MM-DD (default: today)
+      - days: int (default: 3)
+    """
+    user_id = session["user_id"]
+    try:
+        start_raw = request.args.get("from")
+        start = date.fromisoformat(start_raw) if start_raw else date.today()
+        days = int(request.args.get("days", 3))
+        payload = get_range_overview(user_id=user_id, start=start, days=days)
+        return jsonify(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
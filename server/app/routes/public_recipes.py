@@ -1,20 +1,41 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app, jsonify, make_response, request
 from sqlalchemy.orm import joinedload
 
 from app.models.recipe import Recipe
+from app.services.public_feed_service import (
+    get_public_feed_page,
+    DEFAULT_FEED_PAGE_SIZE,
+    PUBLIC_FEED_TTL_SECONDS,
+)
 
 public_recipes_bp = Blueprint("public_recipes", __name__)
 
 
 @public_recipes_bp.get("/public/recipes")
 def list_public_recipes():
-    recipes = (
-        Recipe.query.filter(Recipe.is_public.is_(True))
-        .order_by(Recipe.updated_at.desc())
-        .limit(50)
-        .all()
-    )
-    return jsonify([r.to_dict() for r in recipes])
+    """
+    Query params (optional; without any, returns the latest 50 as an array):
+      - limit: int page size (enables pagination)
+      - cursor: opaque nextCursor from the previous page
+    """
+    args = request.args
+    paginated = "limit" in args or "cursor" in args
+    try:
+        body, etag = get_public_feed_page(
+            limit=int(args.get("limit", DEFAULT_FEED_PAGE_SIZE)),
+            cursor=args.get("cursor"),
+            paginated=paginated,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={PUBLIC_FEED_TTL_SECONDS}"
+    return response
 
 
 @public_recipes_bp.get("/public/recipes/<int:recipe_id>")
@@ -1,13 +1,27 @@
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, Response, jsonify, request, session, stream_with_context
 from app.extensions import db
 from app.models.recipe import Recipe
 from app.routes._auth_guard import login_required
+from app.routes._etag import conditional_by_revision
+from app.services.export_service import export_recipes
+from app.services.public_feed_service import invalidate_public_feed
+from app.services.revisions import bump_user_revision
+from app.services.similarity_service import find_similar_recipes
+from app.services.search_service import search_recipes, DEFAULT_SEARCH_LIMIT
+from app.services.ingredient_index_service import (
+    find_recipes_by_ingredients,
+    set_postings_visibility,
+    DEFAULT_MATCH_LIMIT,
+)
 
 from app.services.recipes_service import (
     get_all_recipes,
+    get_recipes_page,
+    DEFAULT_PAGE_SIZE,
     get_recipe_by_id,
     create_recipe,
     update_recipe,
+    bulk_save_recipes,
     delete_recipe,
 )
 
@@ -16,14 +30,108 @@ recipes_bp = Blueprint("recipes", __name__)
 
 @recipes_bp.get("/recipes")
 @login_required
+@conditional_by_revision
 def list_recipes():
+    """
+    Query params (all optional; without any, returns the full list):
+      - limit: int page size (enables pagination)
+      - cursor: opaque nextCursor from the previous page
+      - fields: comma-separated recipe fields to return, e.g. id,title,prepMin
+    """
+    user_id = session["user_id"]
+    args = request.args
+    if not any(k in args for k in ("limit", "cursor", "fields")):
+        recipes = get_all_recipes(user_id)
+        return jsonify([r.to_dict() for r in recipes])
+
+    try:
+        fields = None
+        if args.get("fields"):
+            fields = [f.strip() for f in args["fields"].split(",") if f.strip()]
+        items, next_cursor = get_recipes_page(
+            user_id,
+            limit=int(args.get("limit", DEFAULT_PAGE_SIZE)),
+            cursor=args.get("cursor"),
+            fields=fields,
+        )
+        return jsonify({"items": items, "nextCursor": next_cursor})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@recipes_bp.get("/recipes/search")
+@login_required
+def search_recipes_route():
+    """
+    Query params:
+      - q: search text (required)
+      - scope: mine | public | all (default all)
+      - limit, offset: paging
+    """
+    user_id = session["user_id"]
+    args = request.args
+    try:
+        items, next_offset = search_recipes(
+            user_id,
+            args.get("q", ""),
+            scope=args.get("scope", "all"),
+            limit=int(args.get("limit", DEFAULT_SEARCH_LIMIT)),
+            offset=int(args.get("offset", 0)),
+        )
+        return jsonify({"items": items, "nextOffset": next_offset})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@recipes_bp.get("/recipes/cook-with")
+@login_required
+def cook_with_route():
+    """
+    Query params:
+      - ingredients: comma-separated things you have (required)
+      - scope: mine | public | all (default all)
+      - limit: max results
+    """
     user_id = session["user_id"]
-    recipes = get_all_recipes(user_id)
-    return jsonify([r.to_dict() for r in recipes])
+    args = request.args
+    have = [i.strip() for i in args.get("ingredients", "").split(",") if i.strip()]
+    try:
+        items = find_recipes_by_ingredients(
+            user_id,
+            have,
+            scope=args.get("scope", "all"),
+            limit=int(args.get("limit", DEFAULT_MATCH_LIMIT)),
+        )
+        return jsonify({"items": items})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@recipes_bp.get("/recipes/export")
+@login_required
+def export_recipes_route():
+    """
+    Query params:
+      - format: csv (default; re-importable via /recipes/from-csv) | jsonl
+
+    The body is streamed.
+    """
+    fmt = request.args.get("format", "csv")
+    try:
+        chunks = export_recipes(session["user_id"], fmt)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype="text/csv" if fmt == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="recipes.{fmt}"'},
+    )
 
 
 @recipes_bp.get("/recipes/<int:recipe_id>")
 @login_required
+@conditional_by_revision
 def get_recipe(recipe_id: int):
     user_id = session["user_id"]
     recipe = get_recipe_by_id(recipe_id, user_id)
@@ -33,16 +141,61 @@ def get_recipe(recipe_id: int):
     return jsonify(recipe.to_dict(include_ingredients=True))
 
 
+@recipes_bp.get("/recipes/<int:recipe_id>/duplicates")
+@login_required
+def recipe_duplicates(recipe_id: int):
+    user_id = session["user_id"]
+    recipe = get_recipe_by_id(recipe_id, user_id)
+    if not recipe:
+        return jsonify({"error": "Recipe not found"}), 404
+
+    return jsonify({"items": find_similar_recipes(user_id, recipe.id)})
+
+
 @recipes_bp.post("/recipes")
 @login_required
 def create_recipe_route():
     user_id = session["user_id"]
     try:
         recipe = create_recipe(user_id, request.get_json() or {})
-        return jsonify(recipe.to_dict(include_ingredients=True)), 201
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
+    data = recipe.to_dict(include_ingredients=True)
+    data["possibleDuplicates"] = find_similar_recipes(user_id, recipe.id)
+    return jsonify(data), 201
+
+
+@recipes_bp.post("/recipes/bulk")
+@login_required
+def bulk_save_recipes_route():
+    """
+    Body: array of recipe payloads. Items with "id" update that recipe;
+    the rest are created. Invalid items are reported, not fatal.
+    """
+    user_id = session["user_id"]
+    try:
+        results = bulk_save_recipes(user_id, request.get_json())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    counts = {"created": 0, "updated": 0, "error": 0}
+    for r in results:
+        counts[r["status"]] += 1
+
+    # Updates may have touched public recipes
+    if counts["updated"]:
+        invalidate_public_feed()
+
+    return jsonify(
+        {
+            "results": results,
+            "created": counts["created"],
+            "updated": counts["updated"],
+            "failed": counts["error"],
+        }
+    )
+
 
 @recipes_bp.patch("/recipes/<int:recipe_id>")
 @login_required
@@ -52,8 +205,18 @@ def update_recipe_route(recipe_id: int):
     if not recipe:
         return jsonify({"error": "Recipe not found"}), 404
 
-    recipe = update_recipe(recipe, request.get_json() or {})
-    return jsonify(recipe.to_dict(include_ingredients=True))
+    try:
+        recipe, ingredient_changes = update_recipe(recipe, request.get_json() or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if recipe.is_public:
+        invalidate_public_feed()
+
+    data = recipe.to_dict(include_ingredients=True)
+    if ingredient_changes is not None:
+        data["ingredientChanges"] = ingredient_changes
+    return jsonify(data)
 
 
 @recipes_bp.delete("/recipes/<int:recipe_id>")
@@ -64,7 +227,10 @@ def delete_recipe_route(recipe_id: int):
     if not recipe:
         return jsonify({"error": "Recipe not found"}), 404
 
+    was_public = recipe.is_public
     delete_recipe(recipe)
+    if was_public:
+        invalidate_public_feed()
     return jsonify({"status": "deleted"})
 
 
@@ -74,7 +240,10 @@ def publish_recipe(recipe_id: int):
     user_id = session["user_id"]
     recipe = Recipe.query.filter_by(id=recipe_id, user_id=user_id).first_or_404()
     recipe.is_public = True
+    set_postings_visibility(recipe.id, True)
+    bump_user_revision(user_id)
     db.session.commit()
+    invalidate_public_feed()
     return jsonify(recipe.to_dict())
 
 
@@ -84,5 +253,8 @@ def unpublish_recipe(recipe_id: int):
     user_id = session["user_id"]
     recipe = Recipe.query.filter_by(id=recipe_id, user_id=user_id).first_or_404()
     recipe.is_public = False
+    set_postings_visibility(recipe.id, False)
+    bump_user_revision(user_id)
     db.session.commit()
+    invalidate_public_feed()
     return jsonify(recipe.to_dict())
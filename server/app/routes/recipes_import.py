@@ -1,6 +1,15 @@
+import csv
+import io
+
 from flask import Blueprint, jsonify, request, session
 
-from app.services.csv_import_service import import_recipes_from_csv_text
+from app.services.csv_import_service import (
+    CsvReadError,
+    import_recipes_from_csv_stream,
+    import_recipes_from_csv_text,
+)
+from app.services.import_jobs_service import ImportJobLimitError, create_import_job
+from app.services.public_feed_service import invalidate_public_feed
 from app.routes._auth_guard import login_required
 
 recipes_import_bp = Blueprint("recipes_import", __name__)
@@ -9,12 +18,117 @@ recipes_import_bp = Blueprint("recipes_import", __name__)
 @recipes_import_bp.post("/recipes/from-csv")
 @login_required
 def import_from_csv():
+    """
+    Accepts one of:
+      - application/json: {"csvText": "...", "onDuplicate": "create|skip",
+        "mode": "create|upsert", "echo": bool}
+      - multipart/form-data: a "file" part (onDuplicate and mode as form
+        fields or query)
+      - text/csv: the raw file as the body (onDuplicate and mode as query
+        params)
+
+    Returns a summary; echo (body field, or ?echo=1 for uploads) adds the
+    created recipes with their ingredients. mode=upsert updates recipes
+    matched by external_id or title instead of creating new ones, and
+    adds updatedCount and unchangedCount to the summary.
+
+    If the file cannot be read to the end (bad encoding or malformed CSV),
+    the recipes before the bad line are kept and the 400 carries the
+    summary so far plus error and errorLine.
+
+    With ?async=1 the file is queued as a background job instead and the
+    response (202) is the job; poll GET /api/import-jobs/<id> for progress.
+    """
     user_id = session["user_id"]
-    body = request.get_json() or {}
-    csv_text = body.get("csvText")
+    if request.args.get("async") in ("1", "true"):
+        return _queue_import(user_id)
+
+    echo = request.args.get("echo") in ("1", "true")
+
+    try:
+        if request.mimetype == "multipart/form-data":
+            upload = request.files.get("file")
+            if upload is None:
+                return jsonify({"error": "file is required"}), 400
+            on_duplicate = request.form.get(
+                "onDuplicate", request.args.get("onDuplicate", "create")
+            )
+            mode = request.form.get("mode", request.args.get("mode", "create"))
+            stream = io.TextIOWrapper(
+                upload.stream,
+                encoding="utf-8-sig",
+                errors="surrogateescape",
+                newline="",
+            )
+            result = import_recipes_from_csv_stream(
+                user_id, stream, on_duplicate=on_duplicate, echo=echo, mode=mode
+            )
+        elif request.mimetype == "text/csv":
+            stream = io.TextIOWrapper(
+                request.stream,
+                encoding="utf-8-sig",
+                errors="surrogateescape",
+                newline="",
+            )
+            result = import_recipes_from_csv_stream(
+                user_id,
+                stream,
+                on_duplicate=request.args.get("onDuplicate", "create"),
+                echo=echo,
+                mode=request.args.get("mode", "create"),
+            )
+        else:
+            body = request.get_json() or {}
+            result = import_recipes_from_csv_text(
+                user_id,
+                body.get("csvText"),
+                on_duplicate=body.get("onDuplicate", "create"),
+                echo=bool(body.get("echo")),
+                mode=body.get("mode", "create"),
+            )
+    except CsvReadError as e:
+        if e.summary.get("updatedCount"):
+            invalidate_public_feed()
+        return jsonify({**e.summary, "error": str(e), "errorLine": e.line}), 400
+    except (ValueError, csv.Error) as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Updates may have touched public recipes
+    if result.get("updatedCount"):
+        invalidate_public_feed()
+    return jsonify(result), 201
+
+
+def _queue_import(user_id: int):
+    on_duplicate = request.args.get("onDuplicate", "create")
+    mode = request.args.get("mode", "create")
+    if request.mimetype == "multipart/form-data":
+        upload = request.files.get("file")
+        if upload is None:
+            return jsonify({"error": "file is required"}), 400
+        source = upload.stream
+        on_duplicate = request.form.get("onDuplicate", on_duplicate)
+        mode = request.form.get("mode", mode)
+    elif request.mimetype == "text/csv":
+        source = request.stream
+    else:
+        body = request.get_json() or {}
+        csv_text = body.get("csvText")
+        if not csv_text or not csv_text.strip():
+            return jsonify({"error": "csvText is required"}), 400
+        source = io.BytesIO(csv_text.encode("utf-8"))
+        on_duplicate = body.get("onDuplicate", "create")
+        mode = body.get("mode", "create")
 
     try:
-        result = import_recipes_from_csv_text(user_id, csv_text)
-        return jsonify(result), 201
+        job = create_import_job(
+            user_id, source, on_duplicate=on_duplicate, mode=mode
+        )
+    except ImportJobLimitError as e:
+        return jsonify({"error": str(e)}), 429
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+
+    response = jsonify(job.to_dict())
+    response.headers["Location"] = f"/api/import-jobs/{job.id}"
+    return response, 202
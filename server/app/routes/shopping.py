@@ -1,24 +1,54 @@
+from datetime import date
+
 from flask import Blueprint, jsonify, request, session
 
-from app.services.shopping_service import build_shopping_list_for_week
+from app.services.shopping_service import (
+    build_shopping_list_for_week,
+    build_shopping_list_for_weeks,
+)
 from app.routes._auth_guard import login_required
+from app.routes._etag import conditional_by_revision
 
 shopping_bp = Blueprint("shopping", __name__)
 
 
 @shopping_bp.get("/shopping-lists")
 @login_required
+@conditional_by_revision
 def get_shopping_list():
     """
     Query params:
-      - weekId: int (required)
+      - weekId: int (single week)
+      - weekIds: comma-separated ints (several weeks)
+      - from, to: YYYY-MM-DD (meals on days inside the range)
+      - byWeek: 1 to include per-week quantities (multi-week only)
     """
     user_id = session["user_id"]
     week_id = request.args.get("weekId")
-    if not week_id:
-        return jsonify({"error": "weekId is required"}), 400
+    week_ids_raw = request.args.get("weekIds")
+    date_from = request.args.get("from")
+    date_to = request.args.get("to")
 
     try:
+        if week_ids_raw or date_from or date_to:
+            week_ids = None
+            if week_ids_raw:
+                week_ids = [int(w) for w in week_ids_raw.split(",") if w.strip()]
+
+            result = build_shopping_list_for_weeks(
+                user_id,
+                week_ids=week_ids,
+                date_from=date.fromisoformat(date_from) if date_from else None,
+                date_to=date.fromisoformat(date_to) if date_to else None,
+                by_week=request.args.get("byWeek") in ("1", "true"),
+            )
+            if week_ids is None:
+                result = {"from": date_from, "to": date_to, **result}
+            return jsonify(result)
+
+        if not week_id:
+            return jsonify({"error": "weekId is required"}), 400
+
         items = build_shopping_list_for_week(user_id, int(week_id))
         return jsonify({"weekId": int(week_id), "items": items})
     except ValueError as e:
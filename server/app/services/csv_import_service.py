@@ -1,141 +1,1000 @@
 import csv
 import io
-from collections import defaultdict
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from operator import attrgetter, itemgetter
+from typing import Callable, Iterable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 
 from app.extensions import db
 from app.models.recipe import Recipe
-from app.models.recipe_ingredient import RecipeIngredient
+from app.services.recipes_service import (
+    _apply_recipe_update,
+    insert_ingredient_rows,
+    insert_recipe_rows,
+    recipe_content_hash,
+    refresh_content_hashes,
+)
+from app.services.revisions import bump_user_revision
+from app.services.search_service import index_recipes
+from app.services.ingredient_index_service import index_recipe_ingredients
+from app.services.similarity_service import (
+    DuplicateDetector,
+    compute_signature,
+    index_recipe_signatures,
+    pack_signature,
+    store_signatures,
+    unpack_signature,
+)
+
+DUPLICATE_MODES = ("create", "skip")
+IMPORT_MODES = ("create", "upsert")
+
+# Recipes committed per transaction when importing
+IMPORT_CHUNK_SIZE = 500
+
+# Characters of CSV text handed to each parse worker in parallel mode
+PARALLEL_BLOCK_CHARS = 4 * 1024 * 1024
+
+# Exports name a recipe without an external id of its own "mealflo:<id>"
+EXPORT_ID_PREFIX = "mealflo:"
+
+# Appended to each parallel block; it only parses back as its own row if
+# the block did not end inside a quoted field
+_SEAM = "\x00seam"
+
+# Logical field -> accepted header names (lowercased), first present wins
+_COLUMNS = (
+    ("title", ("title",)),
+    ("external_id", ("external_id", "externalid")),
+    ("description", ("description",)),
+    ("servings", ("servings",)),
+    ("ingredient_name", ("ingredient_name",)),
+    ("ingredient", ("ingredient",)),
+    ("quantity", ("quantity",)),
+    ("unit", ("unit",)),
+    ("notes", ("notes",)),
+    # Exports write ingredient notes separately; older files share "notes"
+    ("ingredient_notes", ("ingredient_notes", "notes")),
+    ("prep_min", ("prep_min", "prepmin")),
+    ("cook_min", ("cook_min", "cookmin")),
+    ("instructions", ("instructions",)),
+)
+
+_FIELD_INDEX = {name: idx for idx, (name, _) in enumerate(_COLUMNS)}
+_TITLE = _FIELD_INDEX["title"]
+_EXTERNAL_ID = _FIELD_INDEX["external_id"]
+_DESCRIPTION = _FIELD_INDEX["description"]
+_SERVINGS = _FIELD_INDEX["servings"]
+_INGREDIENT_NAME = _FIELD_INDEX["ingredient_name"]
+_INGREDIENT = _FIELD_INDEX["ingredient"]
+_QUANTITY = _FIELD_INDEX["quantity"]
+_UNIT = _FIELD_INDEX["unit"]
+_NOTES = _FIELD_INDEX["notes"]
+_INGREDIENT_NOTES = _FIELD_INDEX["ingredient_notes"]
+_PREP_MIN = _FIELD_INDEX["prep_min"]
+_COOK_MIN = _FIELD_INDEX["cook_min"]
+_INSTRUCTIONS = _FIELD_INDEX["instructions"]
+
+
+class CsvReadError(ValueError):
+    """
+    The CSV could not be read past `line` (bad encoding or malformed CSV).
+
+    import_recipe_groups commits the recipes read completely before the
+    error (the run of rows it cut off is left out), then re-raises with the
+    import summary so far attached as `summary`.
+    """
+
+    def __init__(self, message: str, line: int | None = None):
+        super().__init__(message if line is None else f"Line {line}: {message}")
+        self.line = line
+        self.summary: dict = {}
+
+
+@dataclass(slots=True)
+class ParsedRecipe:
+    """One run of consecutive CSV rows sharing a title (and external id)."""
+
+    title: str
+    description: str | None
+    servings: int
+    prep_min: int | None
+    cook_min: int | None
+    instructions: str | None
+    notes: str | None
+    external_id: str | None = None
+    # (name, quantity, unit, notes) in row order
+    ingredients: list[tuple] = field(default_factory=list)
+    # CSV rows the recipe was read from
+    rows: int = 0
+    # Packed near-duplicate signature if a parse worker computed it
+    # (b"" when the recipe has no features), else None
+    signature: bytes | None = None
+
+    def duplicate_signature(self) -> tuple[int, ...] | None:
+        """The recipe's MinHash signature (see similarity_service)."""
+        if self.signature is not None:
+            return unpack_signature(self.signature) if self.signature else None
+        return compute_signature(self.title, [i[0] for i in self.ingredients])
+
+    def column_values(self) -> dict:
+        """Recipe column values, as insert_recipe_rows takes them."""
+        return {
+            "title": self.title,
+            "description": self.description,
+            "servings": self.servings,
+            "prep_min": self.prep_min,
+            "cook_min": self.cook_min,
+            "instructions": self.instructions,
+            "notes": self.notes,
+            "external_id": _stored_external_id(self.external_id),
+        }
+
+    def content_hash(self) -> str:
+        return recipe_content_hash(self.column_values(), self.ingredients)
+
+    def update_payload(self) -> dict:
+        """The recipe as an update_recipe payload."""
+        return {
+            "title": self.title,
+            "description": self.description,
+            "servings": self.servings,
+            "prepMin": self.prep_min,
+            "cookMin": self.cook_min,
+            "instructions": self.instructions,
+            "notes": self.notes,
+            "ingredients": [
+                {"name": name, "quantity": qty, "unit": unit, "notes": notes}
+                for name, qty, unit, notes in self.ingredients
+            ],
+        }
+
+
+def _recipe_key(parsed: ParsedRecipe) -> tuple[str, str]:
+    """What identifies a recipe across imports: its external id, else its title."""
+    if parsed.external_id:
+        return ("external_id", parsed.external_id)
+    return ("title", parsed.title)
+
+
+def export_external_id(recipe_id: int, external_id: str | None) -> str:
+    """The external id an export writes: the recipe's own, else mealflo:<id>."""
+    return external_id or f"{EXPORT_ID_PREFIX}{recipe_id}"
+
+
+def _exported_recipe_id(external_id: str) -> int | None:
+    """The recipe id inside a "mealflo:<id>" external id, if it is one."""
+    if not external_id.startswith(EXPORT_ID_PREFIX):
+        return None
+    raw = external_id[len(EXPORT_ID_PREFIX) :]
+    return int(raw) if raw.isascii() and raw.isdigit() else None
+
+
+def _stored_external_id(external_id: str | None) -> str | None:
+    """
+    The external id an imported recipe keeps. "mealflo:<id>" ids are only
+    synthesized by exports, so they are never stored: a copy keeping one
+    would export under the same id as the recipe it was copied from.
+    """
+    if external_id is None or _exported_recipe_id(external_id) is not None:
+        return None
+    return external_id
+
+
+# Workers send ParsedRecipe fields back as plain tuples, which pickle much
+# faster than dataclass instances
+_recipe_fields = attrgetter(*ParsedRecipe.__slots__)
+
+
+def compile_columns(header: list[str]) -> Callable[[list[str]], tuple]:
+    """
+    Resolve the header once into a row accessor.
+
+    The returned function maps a csv.reader row to a tuple of raw values in
+    _COLUMNS order (None for absent columns or short rows), via a single
+    itemgetter call instead of a header scan per field.
+    """
+    lowered = [(h or "").strip().lower() for h in header]
+    width = len(header)
+
+    positions = {}
+    for idx, name in enumerate(lowered):
+        positions.setdefault(name, idx)
+
+    # Absent columns read a trailing None appended to each row
+    indexes = []
+    for _, aliases in _COLUMNS:
+        found = next((positions[a] for a in aliases if a in positions), width)
+        indexes.append(found)
+    getter = itemgetter(*indexes)
+
+    def extract(row: list[str]) -> tuple:
+        n = len(row)
+        if n != width:
+            if n > width:
+                del row[width:]
+            else:
+                row.extend([None] * (width - n))
+        row.append(None)
+        return getter(row)
+
+    return extract
+
+
+def _to_int_or_none(raw: str) -> int | None:
+    if not raw:
+        return None
+    try:
+        return int(float(raw))
+    except ValueError:
+        return None
+
+
+def _clean(raw: str | None) -> str | None:
+    return (raw or "").strip() or None
+
+
+def _parse_ingredients(values: list[tuple], into: list[tuple]) -> None:
+    for row in values:
+        name = (row[_INGREDIENT_NAME] or row[_INGREDIENT] or "").strip()
+        if not name:
+            continue
+
+        qty_raw = (row[_QUANTITY] or "").strip()
+        qty = None
+        if qty_raw:
+            try:
+                qty = float(qty_raw)
+            except ValueError:
+                qty = None
+
+        into.append((name, qty, _clean(row[_UNIT]), _clean(row[_INGREDIENT_NOTES])))
+
+
+def _parse_group(key: tuple, values: list[tuple]) -> ParsedRecipe:
+    # Pull recipe-level fields from first row
+    first = values[0]
+    servings_raw = (first[_SERVINGS] or "").strip()
+    try:
+        servings = int(servings_raw) if servings_raw else 1
+    except ValueError:
+        servings = 1
+
+    external_id, title = key
+    parsed = ParsedRecipe(
+        title=title,
+        external_id=external_id,
+        description=_clean(first[_DESCRIPTION]),
+        servings=servings if servings > 0 else 1,
+        prep_min=_to_int_or_none((first[_PREP_MIN] or "").strip()),
+        cook_min=_to_int_or_none((first[_COOK_MIN] or "").strip()),
+        instructions=_clean(first[_INSTRUCTIONS]),
+        notes=_clean(first[_NOTES]),
+        rows=len(values),
+    )
+    _parse_ingredients(values, parsed.ingredients)
+    return parsed
+
+
+def parse_recipe_csv(stream: Iterable[str]) -> Iterator[ParsedRecipe]:
+    """
+    Parse recipe CSV into one ParsedRecipe per run of same-title rows.
+
+    Pure parsing (no database access). The header is checked eagerly; rows
+    are read lazily, holding only the current title's rows.
+    """
+    reader = csv.reader(_checked_lines(stream))
+    header = next(reader, None)
+    if not header:
+        raise ValueError("CSV must include a header row")
+
+    return _iter_title_groups(_read_rows(reader), compile_columns(header))
+
+
+def _checked_lines(stream: Iterable[str]) -> Iterator[str]:
+    """
+    Lines of `stream`, failing on the first one that is not valid UTF-8.
+
+    Streams opened with errors="surrogateescape" let undecodable bytes
+    through as lone surrogates, so the bad line is found exactly; a strict
+    decoder fails a whole buffer ahead of the reader instead.
+    """
+    for number, line in enumerate(stream, 1):
+        if not line.isascii():
+            try:
+                line.encode("utf-8")
+            except UnicodeEncodeError:
+                raise CsvReadError("File is not valid UTF-8", number) from None
+        yield line
+
+
+def _read_rows(reader) -> Iterator[list[str]]:
+    """Rows of `reader`; read errors become CsvReadError with the line."""
+    try:
+        yield from reader
+    except csv.Error as e:
+        raise CsvReadError(str(e), reader.line_num) from e
+    except UnicodeDecodeError as e:
+        # Decoded ahead of the reader: this is the first line not read,
+        # not necessarily the one holding the bad bytes
+        raise CsvReadError("File is not valid UTF-8", reader.line_num + 1) from e
+
+
+def _iter_title_groups(reader, extract) -> Iterator[ParsedRecipe]:
+    current, values = None, []
+    for row in reader:
+        if not row:
+            continue
+        row_values = extract(row)
+        title = (row_values[_TITLE] or "").strip()
+        if not title:
+            continue
+        external_id = _clean(row_values[_EXTERNAL_ID])
+        # Ingredient rows may give the external id on the first row only;
+        # a blank one continues the run of the same title above
+        if external_id is None and current is not None and current[1] == title:
+            external_id = current[0]
+        key = (external_id, title)
+        if key != current and values:
+            yield _parse_group(current, values)
+            values = []
+        current = key
+        values.append(row_values)
+    if values:
+        yield _parse_group(current, values)
+
+
+def parse_recipe_csv_parallel(
+    stream: Iterable[str], workers: int, block_chars: int = PARALLEL_BLOCK_CHARS
+) -> Iterator[ParsedRecipe]:
+    """
+    parse_recipe_csv spread over a pool of `workers` processes.
 
+    The text is cut into blocks at line ends (cheap: no CSV parsing in this
+    process) and each block is parsed in a worker, which also computes each
+    recipe's near-duplicate signature. Results come back in file order; a
+    title run cut by a block boundary is stitched back together, and a
+    boundary that fell inside a quoted field is detected and the two blocks
+    parsed as one. Yields exactly what parse_recipe_csv does for the same
+    input, including when the file breaks off: the recipes before a read
+    error are yielded, then the error is raised.
+    """
+    lines = _checked_lines(stream)
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if not header:
+        raise ValueError("CSV must include a header row")
+
+    return _iter_parallel_groups(
+        lines, header, workers, block_chars, first_line=reader.line_num
+    )
 
-def import_recipes_from_csv_text(user_id: int, csv_text: str) -> dict:
+
+def _read_blocks(
+    lines: Iterator[str], block_chars: int, first_line: int = 0
+) -> Iterator[tuple[str, int]]:
+    """
+    (text, number of lines before it) blocks of whole lines. A read error
+    is raised only once the lines before it have been yielded.
     """
-    Import recipes from CSV text.
+    buf, size, start = [], 0, first_line
+    try:
+        for line in lines:
+            buf.append(line)
+            size += len(line)
+            if size >= block_chars:
+                yield "".join(buf), start
+                start += len(buf)
+                buf, size = [], 0
+    except CsvReadError:
+        if buf:
+            yield "".join(buf), start
+        raise
+    except UnicodeDecodeError as e:
+        if buf:
+            yield "".join(buf), start
+        # Decoded ahead of the lines, reported as _read_rows does
+        raise CsvReadError("File is not valid UTF-8", start + len(buf) + 1) from e
+    if buf:
+        yield "".join(buf), start
+
+
+def _parse_block(
+    header: list[str],
+    text: str,
+    first_line: int,
+    check_seam: bool = True,
+    cut_off: bool = False,
+) -> tuple[list[tuple], tuple[str, int] | None] | None:
+    """
+    Parse one block in a worker into ParsedRecipe field tuples, signatures
+    included; None if the block ends inside a quoted field.
+
+    Returns the tuples and, if the CSV is malformed partway, the error as
+    (message, line): the tuples then hold the rows before it. `cut_off`
+    means a read error ended the file inside a quoted field, so the last,
+    unfinished record is dropped.
+    """
+    if check_seam:
+        if not text.endswith("\n"):
+            text += "\n"
+        reader = csv.reader(io.StringIO(text + _SEAM + "\n"))
+    else:
+        reader = csv.reader(io.StringIO(text))
+
+    rows, error = [], None
+    try:
+        for row in reader:
+            rows.append(row)
+    except csv.Error as e:
+        error = (str(e), first_line + reader.line_num)
+    if error is None:
+        if check_seam:
+            if not rows or rows[-1] != [_SEAM]:
+                return None
+            rows.pop()
+        elif cut_off and rows:
+            rows.pop()
+
+    result = []
+    for parsed in _iter_title_groups(iter(rows), compile_columns(header)):
+        signature = parsed.duplicate_signature()
+        parsed.signature = pack_signature(signature) if signature else b""
+        result.append(_recipe_fields(parsed))
+    return result, error
+
+
+def _iter_parallel_groups(
+    lines: Iterator[str],
+    header: list[str],
+    workers: int,
+    block_chars: int,
+    first_line: int = 1,
+) -> Iterator[ParsedRecipe]:
+    blocks = _read_blocks(lines, block_chars, first_line)
+    pool = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    # Bounded read-ahead: blocks in flight stay the same whatever the file size
+    inflight = deque()
+    # Raised once every block before it has been yielded
+    read_error = None
+
+    def next_block() -> tuple[str, int] | None:
+        nonlocal read_error
+        if read_error is not None:
+            return None
+        try:
+            return next(blocks, None)
+        except CsvReadError as e:
+            read_error = e
+            return None
+
+    def fill():
+        while len(inflight) < workers * 2:
+            block = next_block()
+            if block is None:
+                return
+            inflight.append((block, pool.submit(_parse_block, header, *block)))
+
+    try:
+        fill()
+        carry = None
+        while inflight:
+            (text, start), future = inflight.popleft()
+            parsed_block = future.result()
+            while parsed_block is None:
+                # Cut inside a quoted field: parse with the following block
+                if inflight:
+                    (following, _), pending = inflight.popleft()
+                    pending.cancel()
+                else:
+                    block = next_block()
+                    following = None if block is None else block[0]
+                if following is None:
+                    parsed_block = _parse_block(
+                        header,
+                        text,
+                        start,
+                        check_seam=False,
+                        cut_off=read_error is not None,
+                    )
+                else:
+                    text += following
+                    parsed_block = _parse_block(header, text, start)
+            groups, error = parsed_block
+            if error is not None:
+                # Malformed CSV: later blocks are not read
+                read_error = CsvReadError(*error)
+                for _, pending in inflight:
+                    pending.cancel()
+                inflight.clear()
+            else:
+                fill()
+
+            if not groups:
+                continue
+            groups = [ParsedRecipe(*fields) for fields in groups]
+            if carry is not None:
+                # The block could not see the run it continues: its leading
+                # rows may have a blank external id, then repeat the run's
+                while (
+                    groups
+                    and groups[0].title == carry.title
+                    and groups[0].external_id in (None, carry.external_id)
+                ):
+                    carry.ingredients.extend(groups[0].ingredients)
+                    carry.rows += groups[0].rows
+                    carry.signature = None
+                    groups = groups[1:]
+                if not groups:
+                    continue
+                yield carry
+            yield from groups[:-1]
+            carry = groups[-1]
+
+        # A read error cuts off the run it was in, as in parse_recipe_csv
+        if read_error is not None:
+            raise read_error
+        if carry is not None:
+            yield carry
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def import_recipes_from_csv_text(
+    user_id: int,
+    csv_text: str,
+    on_duplicate: str = "create",
+    echo: bool = False,
+    mode: str = "create",
+) -> dict:
+    """Import recipes from CSV text (the JSON `csvText` body)."""
+    if not csv_text or not csv_text.strip():
+        raise ValueError("csvText is required")
+
+    return import_recipes_from_csv_stream(
+        user_id,
+        io.StringIO(csv_text),
+        on_duplicate=on_duplicate,
+        echo=echo,
+        mode=mode,
+    )
+
+
+def import_recipes_from_csv_stream(
+    user_id: int,
+    stream: Iterable[str],
+    on_duplicate: str = "create",
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    echo: bool = False,
+    workers: int = 1,
+    mode: str = "create",
+) -> dict:
+    """
+    Import recipes from a CSV text stream (file object or iterable of lines).
 
     Supported columns (case-insensitive):
       - title (required)
+      - external_id OR externalId (optional; the recipe's id in the source.
+        Rows continuing a recipe may leave it blank: a blank external id
+        carries forward from the row above when the title is the same)
       - description (optional)
       - servings (optional)
       - ingredient_name OR ingredient (optional; if missing, row can still create recipe)
       - quantity (optional)
       - unit (optional)
-      - notes (optional)
+      - notes (optional; recipe notes from the first row, and ingredient
+        notes unless ingredient_notes is present)
+      - ingredient_notes (optional)
       - prep_min OR prepMin (optional)
       - cook_min OR cookMin (optional)
       - instructions (optional)
 
     Behavior:
-      - Groups rows by title
-      - Creates one Recipe per title
+      - Groups rows by title (and external id)
+      - Creates one Recipe per title, or per external id where given
       - Adds ingredients in row order
       - Skips blank ingredient rows
+      - Checks each recipe against the user's library (and earlier rows of
+        the same file) for near-duplicates; on_duplicate="create" imports
+        and reports them, "skip" leaves them out
+
+    mode="upsert" makes re-importing the same file idempotent: a recipe
+    whose external id (or, without one, title) matches a stored recipe
+    updates it instead of creating another. Exports write "mealflo:<id>"
+    for recipes without an external id, which matches that recipe; such
+    ids are not stored on the recipes an import creates. Matches are
+    compared by content hash first, so unchanged recipes are skipped
+    without writes.
+
+    Rows are read incrementally and only the current title's rows are held
+    in memory. Every `chunk_size` recipes are written with one batched
+    insert per table and committed. A title that shows up again later in
+    the file adds to the recipe it already created, so each recipe read
+    keeps a small entry (its key and id) until the import ends, as do the
+    created ids and the duplicate and skip reports of the summary: memory
+    grows with the number of recipes in the file, not with its rows.
+
+    With `workers` > 1, parsing runs in that many processes (see
+    parse_recipe_csv_parallel) while this process writes; the result is
+    the same as a serial import.
+
+    Returns a summary; `echo` adds every created recipe with ingredients.
     """
-    if not csv_text or not csv_text.strip():
-        raise ValueError("csvText is required")
+    _check_import_options(on_duplicate, mode)
 
-    f = io.StringIO(csv_text)
-    reader = csv.DictReader(f)
-    if not reader.fieldnames:
-        raise ValueError("CSV must include a header row")
+    if workers > 1:
+        groups = parse_recipe_csv_parallel(stream, workers)
+    else:
+        groups = parse_recipe_csv(stream)
 
-    # Normalize headers -> lower
-    field_map = {h: (h or "").strip().lower() for h in reader.fieldnames}
+    return import_recipe_groups(
+        user_id,
+        groups,
+        on_duplicate=on_duplicate,
+        chunk_size=chunk_size,
+        echo=echo,
+        mode=mode,
+    )
 
-    def get(row: dict, key: str):
-        for original, lower in field_map.items():
-            if lower == key:
-                return row.get(original)
-        return None
 
-    def get_any(row: dict, *keys: str):
-        for k in keys:
-            v = get(row, k)
-            if v is not None:
-                return v
-        return None
+def _check_import_options(on_duplicate: str, mode: str = "create") -> None:
+    if on_duplicate not in DUPLICATE_MODES:
+        raise ValueError("onDuplicate must be one of: create, skip")
+    if mode not in IMPORT_MODES:
+        raise ValueError("mode must be one of: create, upsert")
 
-    def to_int_or_none(raw: str):
-        if not raw:
-            return None
-        try:
-            return int(float(raw))
-        except ValueError:
-            return None
 
-    grouped = defaultdict(list)
+def find_stored_recipes(
+    user_id: int,
+    keys: Iterable[tuple[str, str]],
+    import_job_id: int | None = None,
+) -> dict[tuple[str, str], tuple[int, str | None]]:
+    """
+    The user's stored recipe for each _recipe_key, as (id, content hash),
+    only among those created by `import_job_id` if given. Keys without one
+    are left out; if several match, the oldest wins. A "mealflo:<id>"
+    external id from an export also matches the recipe with that id,
+    unless a recipe stores that exact external id.
+    """
+    values = {"external_id": set(), "title": set()}
+    exported = {}
+    for kind, value in keys:
+        values[kind].add(value)
+        recipe_id = _exported_recipe_id(value) if kind == "external_id" else None
+        if recipe_id is not None:
+            exported[recipe_id] = value
 
-    for row in reader:
-        title = (get(row, "title") or "").strip()
-        if not title:
+    found = {}
+    columns = (("external_id", Recipe.external_id), ("title", Recipe.title))
+    for kind, column in columns:
+        if not values[kind]:
             continue
-        grouped[title].append(row)
+        query = select(column, Recipe.id, Recipe.content_hash).where(
+            Recipe.user_id == user_id, column.in_(values[kind])
+        )
+        if import_job_id is not None:
+            query = query.where(Recipe.import_job_id == import_job_id)
+        rows = db.session.execute(query.order_by(Recipe.id.desc()))
+        for value, recipe_id, content_hash in rows:
+            found[(kind, value)] = (recipe_id, content_hash)
 
-    created = 0
-    recipes = []
+    if exported:
+        query = select(Recipe.id, Recipe.content_hash).where(
+            Recipe.user_id == user_id, Recipe.id.in_(exported)
+        )
+        if import_job_id is not None:
+            query = query.where(Recipe.import_job_id == import_job_id)
+        for recipe_id, content_hash in db.session.execute(query):
+            key = ("external_id", exported[recipe_id])
+            found.setdefault(key, (recipe_id, content_hash))
+    return found
 
-    for title, rows in grouped.items():
-        # Pull recipe-level fields from first row
-        first = rows[0]
-        description = (get(first, "description") or "").strip() or None
-        servings_raw = (get(first, "servings") or "").strip()
 
-        try:
-            servings = int(servings_raw) if servings_raw else 1
-        except ValueError:
-            servings = 1
-
-        prep_raw = (get_any(first, "prep_min", "prepmin") or "").strip()
-        cook_raw = (get_any(first, "cook_min", "cookmin") or "").strip()
-        instructions = (get(first, "instructions") or "").strip() or None
-        recipe_notes = (get(first, "notes") or "").strip() or None
-
-        recipe = Recipe(
-            user_id=user_id,
-            title=title,
-            description=description,
-            servings=servings if servings > 0 else 1,
-            prep_min=to_int_or_none(prep_raw),
-            cook_min=to_int_or_none(cook_raw),
-            instructions=instructions,
-            notes=recipe_notes,
+def _update_stored_recipes(
+    payloads: dict[int, dict], appended: dict[int, list[tuple]]
+) -> None:
+    """
+    Rewrite stored recipes through the regular update path: `payloads` are
+    full update payloads by id, `appended` adds (name, quantity, unit,
+    notes) ingredients after a recipe's current ones. Does not commit.
+    """
+    ids = payloads.keys() | appended.keys()
+    if not ids:
+        return
+
+    recipes = (
+        Recipe.query.options(selectinload(Recipe.ingredients))
+        .filter(Recipe.id.in_(ids))
+        .order_by(Recipe.id)
+        .all()
+    )
+    for recipe in recipes:
+        payload = payloads.get(recipe.id)
+        if payload is None:
+            # Current rows are kept (matched by id), new ones go after them
+            payload = {
+                "ingredients": [
+                    {
+                        "id": ing.id,
+                        "name": ing.name,
+                        "quantity": ing.quantity,
+                        "unit": ing.unit,
+                        "notes": ing.notes,
+                    }
+                    for ing in recipe.ingredients
+                ]
+                + [
+                    {"name": name, "quantity": qty, "unit": unit, "notes": notes}
+                    for name, qty, unit, notes in appended[recipe.id]
+                ]
+            }
+        _apply_recipe_update(recipe, payload)
+
+
+def import_recipe_groups(
+    user_id: int,
+    groups: Iterator[ParsedRecipe],
+    on_duplicate: str = "create",
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    echo: bool = False,
+    seen: dict[tuple, list] | None = None,
+    on_chunk: Callable[[dict], None] | None = None,
+    mode: str = "create",
+    import_job_id: int | None = None,
+) -> dict:
+    """
+    Write parsed recipe groups in order (see import_recipes_from_csv_stream).
+
+    `seen` maps recipe keys (_recipe_key) already handled by an earlier,
+    interrupted run of the same file to [recipe id or None if skipped, next
+    ingredient sort order]. `on_chunk` is called with the chunk's counts
+    just before each commit, so progress it records is committed together
+    with the recipes. Created recipes are stamped with `import_job_id`, so
+    a resumed job can tell its own recipes from anyone else's.
+
+    If the stream breaks off (CsvReadError, serial or parallel), the recipes
+    read before it are still written and the error is raised with the
+    summary so far as its `summary`.
+
+    In upsert mode each chunk's keys are looked up in one query. A matched
+    recipe is rewritten through the regular update path only if its content
+    hash differs; recipes that come back later in the file, after their
+    chunk was committed, get the extra ingredients the same way.
+    """
+    _check_import_options(on_duplicate, mode)
+    upsert = mode == "upsert"
+
+    detector = DuplicateDetector(user_id)
+    # key -> [recipe id (None if skipped), next ingredient sort order].
+    # Recipes not inserted yet have temporary negative ids.
+    seen = {} if seen is None else seen
+    created_ids: list[int] = []
+    # Upsert: ids created by this run (the rest in `seen` are stored ones)
+    created_here: set[int] = set()
+    updated_ids: set[int] = set()
+    unchanged_count = 0
+    duplicates = []
+    skipped = []
+
+    # The chunk being built
+    pending: list[ParsedRecipe] = []
+    signatures: list = []
+    regrown: set[int] = set()
+    extra_rows: list[dict] = []
+    reappeared: set[int] = set()
+    unresolved: list[dict] = []
+    # Upsert: stored recipe id -> (stored hash, parsed recipe) matched in
+    # this chunk, and id -> extra ingredients for recipes already written
+    matched: dict[int, tuple[str | None, ParsedRecipe]] = {}
+    appended: dict[int, list[tuple]] = {}
+
+    def flush_chunk(batch: list[ParsedRecipe]):
+        nonlocal unchanged_count
+        writes = pending or extra_rows or matched or appended
+        if not writes and on_chunk is None:
+            return
+
+        ids = insert_recipe_rows(
+            user_id,
+            [p.column_values() for p in pending],
+            [
+                [
+                    {
+                        "name": name,
+                        "quantity": qty,
+                        "unit": unit,
+                        "notes": notes,
+                        "sort_order": idx,
+                    }
+                    for idx, (name, qty, unit, notes) in enumerate(p.ingredients)
+                ]
+                for p in pending
+            ],
+            import_job_id=import_job_id,
         )
+        insert_ingredient_rows(extra_rows)
 
-        # Ingredient rows
-        sort = 0
-        for row in rows:
-            name = (get(row, "ingredient_name") or get(row, "ingredient") or "").strip()
-            if not name:
-                continue
+        for idx, (parsed, recipe_id) in enumerate(zip(pending, ids)):
+            seen[_recipe_key(parsed)][0] = recipe_id
+            if idx in regrown:
+                parsed.signature = None
+                signatures[idx] = parsed.duplicate_signature()
+        for entry in unresolved:
+            for key in ("recipeId", "duplicateOf"):
+                if entry.get(key, 0) < 0:
+                    entry[key] = ids[-entry[key] - 1]
+
+        touched = ids + sorted(reappeared)
+        index_recipes(touched)
+        index_recipe_ingredients(touched)
+        store_signatures(
+            [(recipe_id, user_id, sig) for recipe_id, sig in zip(ids, signatures)]
+        )
+        # Recipes from earlier chunks that gained rows
+        index_recipe_signatures(sorted(reappeared))
+        refresh_content_hashes(sorted(reappeared))
+
+        # Upserts: only recipes whose content changed are written
+        changes = {
+            recipe_id: parsed.update_payload()
+            for recipe_id, (stored_hash, parsed) in matched.items()
+            if parsed.content_hash() != stored_hash
+        }
+        chunk_unchanged = len(matched) - len(changes)
+        _update_stored_recipes(changes, appended)
+        changed_ids = changes.keys() | appended.keys()
+        chunk_updated = len(changed_ids - updated_ids)
+        updated_ids.update(changed_ids)
+
+        if on_chunk is not None:
+            on_chunk(
+                {
+                    "groups": len(batch),
+                    "rows": sum(p.rows for p in batch),
+                    "created": len(ids),
+                    "updated": chunk_updated,
+                    "unchanged": chunk_unchanged,
+                    "skipped": len(skipped) - skipped_before,
+                    "duplicates": len(duplicates) - duplicates_before,
+                }
+            )
+        if ids or reappeared or changed_ids:
+            bump_user_revision(user_id)
+        db.session.commit()
+
+        detector.clear_pending()
+        created_ids.extend(ids)
+        if upsert:
+            created_here.update(ids)
+        unchanged_count += chunk_unchanged
+        for buffer in (pending, signatures, extra_rows, unresolved):
+            buffer.clear()
+        for buffer in (regrown, reappeared, matched, appended):
+            buffer.clear()
 
-            qty_raw = (get(row, "quantity") or "").strip()
-            unit = (get(row, "unit") or "").strip() or None
-            notes = (get(row, "notes") or "").strip() or None
-
-            qty = None
-            if qty_raw:
-                try:
-                    qty = float(qty_raw)
-                except ValueError:
-                    qty = None
-
-            recipe.ingredients.append(
-                RecipeIngredient(
-                    name=name,
-                    quantity=qty,
-                    unit=unit,
-                    notes=notes,
-                    sort_order=sort,
-                )
+    read_error = None
+    while read_error is None:
+        batch = []
+        try:
+            for parsed in islice(groups, chunk_size):
+                batch.append(parsed)
+        except (UnicodeDecodeError, csv.Error) as e:
+            read_error = CsvReadError(str(e))
+        except CsvReadError as e:
+            read_error = e
+        if not batch:
+            break
+        skipped_before, duplicates_before = len(skipped), len(duplicates)
+
+        keys = [_recipe_key(p) for p in batch]
+        stored = {}
+        if upsert:
+            stored = find_stored_recipes(
+                user_id, [key for key in keys if key not in seen]
             )
-            sort += 1
 
-        db.session.add(recipe)
-        db.session.flush()  # get id for response
-        created += 1
-        recipes.append(recipe)
+        # New recipes' signatures, with stored look-alikes fetched in one query
+        batch_signatures = [
+            None if key in seen or key in stored else p.duplicate_signature()
+            for p, key in zip(batch, keys)
+        ]
+        detector.prefetch(batch_signatures)
+
+        for parsed, key, signature in zip(batch, keys, batch_signatures):
+            title = parsed.title
+            if key in seen:
+                recipe_id, next_sort = seen[key]
+                if recipe_id is None:
+                    continue
+                if recipe_id < 0:
+                    idx = -recipe_id - 1
+                    pending[idx].ingredients.extend(parsed.ingredients)
+                    regrown.add(idx)
+                elif recipe_id in matched:
+                    matched[recipe_id][1].ingredients.extend(parsed.ingredients)
+                elif upsert and recipe_id not in created_here:
+                    # A stored recipe may be planned: go through the update
+                    # path so shopping lists follow
+                    appended.setdefault(recipe_id, []).extend(parsed.ingredients)
+                else:
+                    extra_rows.extend(
+                        {
+                            "recipe_id": recipe_id,
+                            "name": name,
+                            "quantity": qty,
+                            "unit": unit,
+                            "notes": notes,
+                            "sort_order": next_sort + idx,
+                        }
+                        for idx, (name, qty, unit, notes) in enumerate(
+                            parsed.ingredients
+                        )
+                    )
+                    reappeared.add(recipe_id)
+                seen[key][1] += len(parsed.ingredients)
+                continue
+
+            if key in stored:
+                recipe_id, stored_hash = stored[key]
+                matched[recipe_id] = (stored_hash, parsed)
+                seen[key] = [recipe_id, len(parsed.ingredients)]
+                continue
+
+            match = detector.find(signature)
+            if match and on_duplicate == "skip":
+                seen[key] = [None, 0]
+                entry = {
+                    "title": title,
+                    "duplicateOf": match[0],
+                    "similarity": round(match[1], 3),
+                }
+                skipped.append(entry)
+                unresolved.append(entry)
+                continue
 
-    db.session.commit()
+            temp_id = -(len(pending) + 1)
+            pending.append(parsed)
+            signatures.append(signature)
+            seen[key] = [temp_id, len(parsed.ingredients)]
+            detector.add(temp_id, signature)
+            if match:
+                entry = {
+                    "recipeId": temp_id,
+                    "title": title,
+                    "duplicateOf": match[0],
+                    "similarity": round(match[1], 3),
+                }
+                duplicates.append(entry)
+                unresolved.append(entry)
 
-    return {
-        "createdCount": created,
-        "recipes": [r.to_dict(include_ingredients=True) for r in recipes],
+        flush_chunk(batch)
+
+    result = {
+        "createdCount": len(created_ids),
+        "skippedCount": len(skipped),
+        "duplicates": duplicates,
+        "skipped": skipped,
     }
+    if upsert:
+        result["updatedCount"] = len(updated_ids)
+        result["unchangedCount"] = unchanged_count
+    if echo:
+        recipes = (
+            Recipe.query.options(selectinload(Recipe.ingredients))
+            .filter(Recipe.id.in_(created_ids))
+            .order_by(Recipe.id)
+            .all()
+        )
+        result["recipes"] = [r.to_dict(include_ingredients=True) for r in recipes]
+    if read_error is not None:
+        read_error.summary = result
+        raise read_error
+    return result
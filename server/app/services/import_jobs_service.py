@@ -0,0 +1,382 @@
+"""
+Background recipe CSV imports.
+
+Large imports run on a small in-process thread pool instead of inside the
+request. The upload is saved under instance/import_jobs/ and an ImportJob
+row tracks progress; the importer commits each chunk of recipes together
+with the job's counters, so the row always matches what is in the database.
+
+A running job holds a lease: a timer thread renews its heartbeat every
+HEARTBEAT_SECONDS, whatever the importer is doing. A worker that restarts
+mid-import leaves its job "running" with a heartbeat that stops moving. Any
+worker claims such jobs (and never-started queued ones) on its first
+request, replays the already-imported part of the file without writing to
+rebuild the recipe key map, and continues from the next chunk. Recipes a
+job creates carry its id, so the replay finds exactly its own.
+"""
+
+import csv
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import IO, Iterator
+
+from flask import Flask, current_app
+from sqlalchemy import func, insert, literal, or_, select, update
+
+from app.extensions import db
+from app.models.import_job import ImportJob
+from app.services.csv_import_service import (
+    _check_import_options,
+    _recipe_key,
+    find_stored_recipes,
+    import_recipe_groups,
+    parse_recipe_csv,
+    parse_recipe_csv_parallel,
+)
+from app.services.public_feed_service import invalidate_public_feed
+
+
+IMPORT_WORKERS = 2
+MAX_ACTIVE_JOBS_PER_USER = 2
+# A running job renews its heartbeat this often...
+HEARTBEAT_SECONDS = 30
+# ...and one whose heartbeat is older than this is assumed orphaned
+STALE_JOB_SECONDS = 120
+# Smaller files are parsed serially; starting worker processes costs more
+PARALLEL_PARSE_MIN_BYTES = 8 * 1024 * 1024
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Identifies this process in import_jobs.worker_id
+_WORKER_ID = uuid.uuid4().hex
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+class ImportJobLimitError(ValueError):
+    """The user already has MAX_ACTIVE_JOBS_PER_USER imports in flight."""
+
+
+class _LeaseLost(Exception):
+    """Another worker claimed the job while this one was running it."""
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=IMPORT_WORKERS, thread_name_prefix="import-job"
+            )
+        return _executor
+
+
+def _jobs_dir() -> str:
+    path = os.path.join(current_app.instance_path, "import_jobs")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def create_import_job(
+    user_id: int, source: IO, on_duplicate: str = "create", mode: str = "create"
+) -> ImportJob:
+    """
+    Save `source` (a binary file object with UTF-8 CSV) and queue its import.
+
+    Raises ImportJobLimitError when the user already has the maximum number
+    of queued or running imports.
+    """
+    _check_import_options(on_duplicate, mode)
+
+    path = os.path.join(_jobs_dir(), f"{uuid.uuid4().hex}.csv")
+    with open(path, "wb") as f:
+        shutil.copyfileobj(source, f)
+
+    # The limit is checked by the insert itself, so two uploads racing for
+    # the last slot cannot both get it
+    active = (
+        select(func.count(ImportJob.id))
+        .where(ImportJob.user_id == user_id, ImportJob.status.in_(ACTIVE_STATUSES))
+        .scalar_subquery()
+    )
+    job_id = db.session.execute(
+        insert(ImportJob)
+        .from_select(
+            ["user_id", "mode", "on_duplicate", "source_path"],
+            select(
+                literal(user_id), literal(mode), literal(on_duplicate), literal(path)
+            ).where(active < MAX_ACTIVE_JOBS_PER_USER),
+        )
+        .returning(ImportJob.id)
+    ).scalar()
+    db.session.commit()
+
+    if job_id is None:
+        os.remove(path)
+        raise ImportJobLimitError(
+            f"at most {MAX_ACTIVE_JOBS_PER_USER} imports can run at a time"
+        )
+
+    _submit(job_id)
+    return db.session.get(ImportJob, job_id)
+
+
+def get_import_job(user_id: int, job_id: int) -> ImportJob | None:
+    """Return the user's job, reclaiming it first if its worker has died."""
+    job = ImportJob.query.filter_by(id=job_id, user_id=user_id).first()
+    if job is not None and job.status == "running" and _is_stale(job):
+        _submit(job.id)
+    return job
+
+
+def _is_stale(job: ImportJob) -> bool:
+    heartbeat = job.heartbeat_at
+    if heartbeat is None:
+        return True
+    if heartbeat.tzinfo is None:
+        heartbeat = heartbeat.replace(tzinfo=timezone.utc)
+    return heartbeat < _now() - timedelta(seconds=STALE_JOB_SECONDS)
+
+
+def resume_import_jobs() -> int:
+    """Queue every unclaimed or orphaned job; returns how many were found."""
+    stale_before = _now() - timedelta(seconds=STALE_JOB_SECONDS)
+    job_ids = [
+        job_id
+        for (job_id,) in db.session.query(ImportJob.id)
+        .filter(
+            or_(
+                ImportJob.status == "queued",
+                (ImportJob.status == "running")
+                & (
+                    ImportJob.heartbeat_at.is_(None)
+                    | (ImportJob.heartbeat_at < stale_before)
+                ),
+            )
+        )
+        .order_by(ImportJob.id)
+    ]
+    for job_id in job_ids:
+        _submit(job_id)
+    return len(job_ids)
+
+
+def init_import_jobs(app: Flask) -> None:
+    """Resume interrupted jobs when this process serves its first request."""
+    started = threading.Event()
+
+    @app.before_request
+    def _resume_import_jobs_once():
+        if started.is_set():
+            return
+        with _lock:
+            if started.is_set():
+                return
+            started.set()
+        resume_import_jobs()
+
+
+def _submit(job_id: int) -> None:
+    app = current_app._get_current_object()
+    _get_executor().submit(_run_job, app, job_id)
+
+
+def _claim(job_id: int) -> str | None:
+    """
+    Atomically take the job, if nobody else has it. Returns the lease token
+    stored in worker_id, which only this run of the job renews.
+    """
+    now = _now()
+    stale_before = now - timedelta(seconds=STALE_JOB_SECONDS)
+    lease = f"{_WORKER_ID}:{uuid.uuid4().hex[:12]}"
+
+    claimed = db.session.execute(
+        update(ImportJob)
+        .where(
+            ImportJob.id == job_id,
+            or_(
+                ImportJob.status == "queued",
+                (ImportJob.status == "running")
+                & (
+                    ImportJob.heartbeat_at.is_(None)
+                    | (ImportJob.heartbeat_at < stale_before)
+                ),
+            ),
+        )
+        .values(
+            status="running",
+            worker_id=lease,
+            heartbeat_at=now,
+            attempts=ImportJob.attempts + 1,
+            started_at=func.coalesce(ImportJob.started_at, now),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return lease if claimed == 1 else None
+
+
+def _renew_lease(job_id: int, lease: str) -> bool:
+    """Move the job's heartbeat forward; False if the lease was taken over."""
+    renewed = db.session.execute(
+        update(ImportJob)
+        .where(
+            ImportJob.id == job_id,
+            ImportJob.status == "running",
+            ImportJob.worker_id == lease,
+        )
+        .values(heartbeat_at=_now())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return renewed == 1
+
+
+@contextmanager
+def _heartbeat(app: Flask, job_id: int, lease: str) -> Iterator[threading.Event]:
+    """
+    Renew the job's lease from a timer thread for the duration of the block.
+    Yields an event that is set once the lease has been lost.
+    """
+    stop = threading.Event()
+    lost = threading.Event()
+
+    def beat():
+        while not stop.wait(HEARTBEAT_SECONDS):
+            # Own app context, hence own session and connection
+            with app.app_context():
+                try:
+                    if not _renew_lease(job_id, lease):
+                        lost.set()
+                        return
+                except Exception:
+                    # e.g. the database is locked by a chunk commit; the
+                    # next beat retries well before the lease runs out
+                    db.session.rollback()
+                    app.logger.warning(
+                        "could not renew import job %s", job_id, exc_info=True
+                    )
+
+    thread = threading.Thread(
+        target=beat, name=f"import-job-{job_id}-heartbeat", daemon=True
+    )
+    thread.start()
+    try:
+        yield lost
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _run_job(app: Flask, job_id: int) -> None:
+    with app.app_context():
+        try:
+            lease = _claim(job_id)
+        except Exception:
+            app.logger.exception("could not claim import job %s", job_id)
+            return
+        if lease is None:
+            return
+
+        try:
+            with _heartbeat(app, job_id, lease) as lost:
+                _import(db.session.get(ImportJob, job_id), lost)
+        except _LeaseLost:
+            db.session.rollback()
+            app.logger.warning("import job %s was taken over", job_id)
+        except Exception as e:
+            db.session.rollback()
+            if not isinstance(e, (ValueError, csv.Error)):
+                app.logger.exception("import job %s failed", job_id)
+            _finish(job_id, "failed", str(e))
+        else:
+            _finish(job_id, "succeeded")
+
+
+def _replay_seen(job: ImportJob, groups) -> dict[tuple, list]:
+    """
+    Rebuild the importer's key map for the groups the job already wrote.
+
+    A create job's keys without a recipe created by the job were skipped as
+    duplicates; an upsert job also matched older recipes.
+    """
+    seen: dict[tuple, list] = {}
+    for parsed in islice(groups, job.groups_done):
+        entry = seen.setdefault(_recipe_key(parsed), [None, 0])
+        entry[1] += len(parsed.ingredients)
+
+    import_job_id = job.id if job.mode == "create" else None
+    keys = list(seen)
+    for start in range(0, len(keys), 500):
+        stored = find_stored_recipes(
+            job.user_id, keys[start : start + 500], import_job_id
+        )
+        for key, (recipe_id, _) in stored.items():
+            seen[key][0] = recipe_id
+    return seen
+
+
+def _import(job: ImportJob, lease_lost: threading.Event) -> None:
+    def on_chunk(counts: dict) -> None:
+        # Another worker is running the job now: stop before this chunk
+        # commits on top of its progress
+        if lease_lost.is_set():
+            raise _LeaseLost()
+        job.groups_done += counts["groups"]
+        job.rows_parsed += counts["rows"]
+        job.recipes_created += counts["created"]
+        job.recipes_updated += counts["updated"]
+        job.recipes_unchanged += counts["unchanged"]
+        job.recipes_skipped += counts["skipped"]
+        job.duplicates_found += counts["duplicates"]
+        job.heartbeat_at = _now()
+
+    workers = current_app.config.get("IMPORT_PARSE_WORKERS", 1)
+    if os.path.getsize(job.source_path) < PARALLEL_PARSE_MIN_BYTES:
+        workers = 1
+
+    with open(
+        job.source_path, encoding="utf-8-sig", errors="surrogateescape", newline=""
+    ) as f:
+        if workers > 1:
+            groups = parse_recipe_csv_parallel(f, workers)
+        else:
+            groups = parse_recipe_csv(f)
+        seen = _replay_seen(job, groups) if job.groups_done else None
+        import_recipe_groups(
+            job.user_id,
+            groups,
+            on_duplicate=job.on_duplicate,
+            seen=seen,
+            on_chunk=on_chunk,
+            mode=job.mode,
+            import_job_id=job.id,
+        )
+    # Updates may have touched public recipes
+    if job.recipes_updated:
+        invalidate_public_feed()
+
+
+def _finish(job_id: int, status: str, error: str | None = None) -> None:
+    job = db.session.get(ImportJob, job_id)
+    job.status = status
+    job.error = error
+    job.finished_at = _now()
+    path, job.source_path = job.source_path, None
+    db.session.commit()
+
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,236 @@
+"""
+"What can I cook with" ingredient index.
+
+Each ingredient name is split into normalized tokens ("Cherry tomatoes" ->
+cherry, tomato) stored in `ingredient_postings`. A lookup intersects the
+posting lists of the user's tokens and ranks recipes by coverage: the share
+of a recipe's ingredients matched by at least one token.
+"""
+
+import re
+
+from sqlalchemy import case, delete, func, insert, or_, select, update
+
+from app.extensions import db
+from app.models.ingredient_posting import IngredientPosting
+from app.models.recipe import Recipe
+from app.models.recipe_ingredient import RecipeIngredient
+
+
+DEFAULT_MATCH_LIMIT = 20
+MAX_MATCH_LIMIT = 100
+MAX_QUERY_INGREDIENTS = 50
+
+_WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+# Preparation words that say nothing about what the ingredient is
+_STOPWORDS = {
+    "a", "an", "and", "of", "or", "to", "the", "for", "with",
+    "fresh", "frozen", "dried", "chopped", "diced", "minced", "sliced",
+    "shredded", "grated", "ground", "large", "small", "medium", "whole",
+    "optional", "cooked", "raw", "boneless", "skinless", "ripe",
+}
+
+
+def _singular(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith("oes"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize_ingredient(name: str | None) -> set[str]:
+    """Normalized tokens for one ingredient name (or user-entered item)."""
+    tokens = set()
+    for word in _WORD_RE.findall((name or "").lower()):
+        if word in _STOPWORDS or len(word) < 2:
+            continue
+        tokens.add(_singular(word)[:80])
+    return tokens
+
+
+def index_recipe_ingredients(recipe_ids: list[int]) -> None:
+    """
+    Rebuild postings for the given recipes from their current ingredients.
+    Call after flushing; does not commit.
+    """
+    if not recipe_ids:
+        return
+
+    remove_recipe_postings(recipe_ids)
+
+    rows = db.session.execute(
+        _ingredient_rows().where(RecipeIngredient.recipe_id.in_(recipe_ids))
+    ).all()
+    _insert_postings(rows)
+
+
+def remove_recipe_postings(recipe_ids: list[int]) -> None:
+    """Drop postings for the given recipes. Does not commit."""
+    if not recipe_ids:
+        return
+
+    db.session.execute(
+        delete(IngredientPosting)
+        .where(IngredientPosting.recipe_id.in_(recipe_ids))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def rebuild_ingredient_index(batch_size: int = 5000) -> None:
+    """Rebuild every posting from recipe_ingredients. Does not commit."""
+    db.session.execute(
+        delete(IngredientPosting).execution_options(synchronize_session=False)
+    )
+
+    result = db.session.execute(
+        _ingredient_rows().execution_options(yield_per=batch_size)
+    )
+    for rows in result.partitions():
+        _insert_postings(rows)
+
+
+def set_postings_visibility(recipe_id: int, is_public: bool) -> None:
+    """Follow a recipe's publish toggle. Does not commit."""
+    db.session.execute(
+        update(IngredientPosting)
+        .where(IngredientPosting.recipe_id == recipe_id)
+        .values(is_public=is_public)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _ingredient_rows():
+    return select(
+        RecipeIngredient.id,
+        RecipeIngredient.recipe_id,
+        RecipeIngredient.name,
+        Recipe.user_id,
+        Recipe.is_public,
+    ).join(Recipe, Recipe.id == RecipeIngredient.recipe_id)
+
+
+def _insert_postings(rows) -> None:
+    postings = [
+        {
+            "token": token,
+            "ingredient_id": ingredient_id,
+            "recipe_id": recipe_id,
+            "user_id": user_id,
+            "is_public": is_public,
+        }
+        for ingredient_id, recipe_id, name, user_id, is_public in rows
+        for token in tokenize_ingredient(name)
+    ]
+    if postings:
+        db.session.execute(insert(IngredientPosting), postings)
+
+
+def find_recipes_by_ingredients(
+    user_id: int,
+    have: list[str],
+    scope: str = "all",
+    limit: int = DEFAULT_MATCH_LIMIT,
+) -> list[dict]:
+    """
+    Rank recipes by how many of their ingredients the user already has.
+
+    scope: "mine", "public" or "all" (the user's recipes plus public ones).
+    Each result carries matchedCount, ingredientCount, coverage (0-1) and
+    the names of the ingredients still missing.
+    """
+    if scope not in ("mine", "public", "all"):
+        raise ValueError("scope must be one of: mine, public, all")
+    if limit < 1 or limit > MAX_MATCH_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_MATCH_LIMIT}")
+    if len(have) > MAX_QUERY_INGREDIENTS:
+        raise ValueError(
+            f"Cannot search with more than {MAX_QUERY_INGREDIENTS} ingredients"
+        )
+
+    tokens = set()
+    for item in have:
+        tokens |= tokenize_ingredient(item)
+    if not tokens:
+        raise ValueError("ingredients is required")
+
+    visibility = {
+        "mine": IngredientPosting.user_id == user_id,
+        "public": IngredientPosting.is_public.is_(True),
+        "all": or_(
+            IngredientPosting.user_id == user_id,
+            IngredientPosting.is_public.is_(True),
+        ),
+    }[scope]
+
+    # Candidates: union of the posting lists for the user's tokens, narrowed
+    # to visible recipes on the (token, user_id) / (token, is_public) indexes
+    candidates = (
+        select(IngredientPosting.recipe_id)
+        .where(IngredientPosting.token.in_(tokens), visibility)
+        .distinct()
+    )
+
+    # Per candidate ingredient: did any of its tokens match?
+    per_ingredient = (
+        select(
+            IngredientPosting.recipe_id,
+            IngredientPosting.ingredient_id,
+            func.max(
+                case((IngredientPosting.token.in_(tokens), 1), else_=0)
+            ).label("hit"),
+        )
+        .where(IngredientPosting.recipe_id.in_(candidates))
+        .group_by(IngredientPosting.recipe_id, IngredientPosting.ingredient_id)
+        .subquery()
+    )
+
+    matched = func.sum(per_ingredient.c.hit)
+    total = func.count()
+
+    rows = db.session.execute(
+        select(per_ingredient.c.recipe_id, matched, total)
+        .group_by(per_ingredient.c.recipe_id)
+        .order_by(
+            (matched * 1.0 / total).desc(),
+            matched.desc(),
+            per_ingredient.c.recipe_id,
+        )
+        .limit(limit)
+    ).all()
+
+    ids = [r[0] for r in rows]
+    if not ids:
+        return []
+
+    recipes = {r.id: r for r in Recipe.query.filter(Recipe.id.in_(ids)).all()}
+
+    names = {}
+    for recipe_id, name in db.session.execute(
+        select(RecipeIngredient.recipe_id, RecipeIngredient.name)
+        .where(RecipeIngredient.recipe_id.in_(ids))
+        .order_by(RecipeIngredient.recipe_id, RecipeIngredient.sort_order)
+    ):
+        names.setdefault(recipe_id, []).append(name)
+
+    results = []
+    for recipe_id, matched_count, ingredient_count in rows:
+        missing = []
+        for name in names.get(recipe_id, []):
+            name_tokens = tokenize_ingredient(name)
+            if name_tokens and not name_tokens & tokens:
+                missing.append(name)
+
+        results.append(
+            {
+                "recipe": recipes[recipe_id].to_dict(),
+                "matchedCount": int(matched_count),
+                "ingredientCount": int(ingredient_count),
+                "coverage": round(matched_count / ingredient_count, 3),
+                "missing": missing,
+            }
+        )
+    return results
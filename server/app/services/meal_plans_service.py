@@ -1,10 +1,15 @@
 from datetime import date, timedelta
 
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import joinedload, selectinload
+
 from app.extensions import db
 from app.models.meal_plan_week import MealPlanWeek
 from app.models.meal_group import MealGroup
 from app.models.meal_group_recipe import MealGroupRecipe
 from app.models.recipe import Recipe
+from app.services.shopping_service import apply_placement_change
+from app.services.revisions import bump_user_revision
 
 
 MAX_RECIPES_PER_GROUP = 5
@@ -16,6 +21,13 @@ def _parse_iso_date(value: str) -> date:
     return date.fromisoformat(value)
 
 
+def _parse_planned_servings(value) -> int:
+    # Servings feed the shopping list totals, so only real counts are kept
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError("plannedServings must be a positive integer")
+    return value
+
+
 def get_or_create_week(user_id: int, week_start_iso: str) -> MealPlanWeek:
     week_start = _parse_iso_date(week_start_iso)
 
@@ -29,15 +41,58 @@ def get_or_create_week(user_id: int, week_start_iso: str) -> MealPlanWeek:
 
     week = MealPlanWeek(user_id=user_id, week_start=week_start)
     db.session.add(week)
+    bump_user_revision(user_id)
     db.session.commit()
     return week
 
 
-def get_week_by_id(user_id: int, week_id: int) -> MealPlanWeek | None:
-    return MealPlanWeek.query.filter(
+def get_week_by_id(
+    user_id: int, week_id: int, include_groups: bool = False
+) -> MealPlanWeek | None:
+    """
+    Fetch a week owned by the user.
+
+    With `include_groups=True` the whole tree needed by
+    `to_dict(include_groups=True)` (groups -> placements -> recipes) is
+    loaded up front with selectin loads: four queries regardless of how many
+    groups or placements the week holds.
+    """
+    query = MealPlanWeek.query.filter(
         MealPlanWeek.id == week_id,
         MealPlanWeek.user_id == user_id,
-    ).first()
+    )
+    if include_groups:
+        query = query.options(
+            selectinload(MealPlanWeek.meal_groups)
+            .selectinload(MealGroup.group_recipes)
+            .selectinload(MealGroupRecipe.recipe)
+        )
+    return query.first()
+
+
+def get_group_for_user(user_id: int, group_id: int) -> MealGroup | None:
+    """Fetch and authorize a group in one query (week loaded alongside)."""
+    return (
+        MealGroup.query.options(joinedload(MealGroup.week))
+        .filter(MealGroup.id == group_id, MealGroup.user_id == user_id)
+        .first()
+    )
+
+
+def get_group_recipe_for_user(
+    user_id: int, group_recipe_id: int
+) -> MealGroupRecipe | None:
+    """Fetch and authorize a placement in one query (group + week alongside)."""
+    return (
+        MealGroupRecipe.query.options(
+            joinedload(MealGroupRecipe.meal_group).joinedload(MealGroup.week)
+        )
+        .filter(
+            MealGroupRecipe.id == group_recipe_id,
+            MealGroupRecipe.user_id == user_id,
+        )
+        .first()
+    )
 
 
 def create_meal_group(user_id: int, payload: dict) -> MealGroup:
@@ -60,20 +115,21 @@ def create_meal_group(user_id: int, payload: dict) -> MealGroup:
 
     group = MealGroup(
         week_id=week.id,
+        user_id=week.user_id,
         day=day,
         name=name.strip(),
         sort_order=payload.get("sortOrder", 0),
     )
     db.session.add(group)
+    bump_user_revision(user_id)
     db.session.commit()
     return group
 
 
 def update_meal_group(user_id: int, group: MealGroup, payload: dict) -> MealGroup:
-    # Ownership check: group belongs to a week belonging to the user
-    week = get_week_by_id(user_id, group.week_id)
-    if not week:
-        raise ValueError("Week not found")
+    # Ownership check: the denormalized owner must match
+    if group.user_id != user_id:
+        raise ValueError("Meal group not found")
 
     if "name" in payload:
         group.name = payload["name"].strip()
@@ -84,25 +140,30 @@ def update_meal_group(user_id: int, group: MealGroup, payload: dict) -> MealGrou
     if "sortOrder" in payload:
         group.sort_order = payload["sortOrder"]
 
+    bump_user_revision(user_id)
     db.session.commit()
     return group
 
 
 def delete_meal_group(user_id: int, group: MealGroup) -> None:
-    week = get_week_by_id(user_id, group.week_id)
-    if not week:
-        raise ValueError("Week not found")
+    if group.user_id != user_id:
+        raise ValueError("Meal group not found")
+
+    apply_placement_change(
+        group.week,
+        [(gr.recipe_id, -gr.planned_servings, -1) for gr in group.group_recipes],
+    )
 
     db.session.delete(group)
+    bump_user_revision(user_id)
     db.session.commit()
 
 
 def add_recipe_to_group(
     user_id: int, group: MealGroup, payload: dict
 ) -> MealGroupRecipe:
-    week = get_week_by_id(user_id, group.week_id)
-    if not week:
-        raise ValueError("Week not found")
+    if group.user_id != user_id:
+        raise ValueError("Meal group not found")
 
     recipe_id = payload.get("recipeId")
     if not recipe_id:
@@ -123,16 +184,24 @@ def add_recipe_to_group(
     if existing_count >= MAX_RECIPES_PER_GROUP:
         raise ValueError(f"Meal group cannot exceed {MAX_RECIPES_PER_GROUP} recipes")
 
-    planned_servings = payload.get("plannedServings", recipe.servings or 1)
+    planned_servings = _parse_planned_servings(
+        payload.get("plannedServings", recipe.servings or 1)
+    )
     sort_order = payload.get("sortOrder", existing_count)
 
     group_recipe = MealGroupRecipe(
         meal_group_id=group.id,
+        user_id=group.user_id,
         recipe_id=recipe.id,
         planned_servings=planned_servings,
         sort_order=sort_order,
     )
     db.session.add(group_recipe)
+    db.session.flush()
+    apply_placement_change(
+        group.week, [(group_recipe.recipe_id, group_recipe.planned_servings, 1)]
+    )
+    bump_user_revision(user_id)
     db.session.commit()
     return group_recipe
 
@@ -140,38 +209,327 @@ def add_recipe_to_group(
 def update_group_recipe(
     user_id: int, group_recipe: MealGroupRecipe, payload: dict
 ) -> MealGroupRecipe:
-    # Verify ownership via week
-    group = MealGroup.query.get(group_recipe.meal_group_id)
-    if not group:
-        raise ValueError("Meal group not found")
-
-    week = get_week_by_id(user_id, group.week_id)
-    if not week:
-        raise ValueError("Week not found")
+    # Verify ownership via the denormalized owner
+    if group_recipe.user_id != user_id:
+        raise ValueError("Meal group recipe not found")
 
     if "plannedServings" in payload:
-        group_recipe.planned_servings = payload["plannedServings"]
+        planned_servings = _parse_planned_servings(payload["plannedServings"])
+        previous = group_recipe.planned_servings
+        group_recipe.planned_servings = planned_servings
+        apply_placement_change(
+            group_recipe.meal_group.week,
+            [(group_recipe.recipe_id, planned_servings - previous, 0)],
+        )
 
     if "sortOrder" in payload:
         group_recipe.sort_order = payload["sortOrder"]
 
+    bump_user_revision(user_id)
     db.session.commit()
     return group_recipe
 
 
 def delete_group_recipe(user_id: int, group_recipe: MealGroupRecipe) -> None:
-    group = MealGroup.query.get(group_recipe.meal_group_id)
-    if not group:
-        raise ValueError("Meal group not found")
+    if group_recipe.user_id != user_id:
+        raise ValueError("Meal group recipe not found")
 
-    week = get_week_by_id(user_id, group.week_id)
-    if not week:
-        raise ValueError("Week not found")
+    apply_placement_change(
+        group_recipe.meal_group.week, [(group_recipe.recipe_id, -group_recipe.planned_servings, -1)]
+    )
 
     db.session.delete(group_recipe)
+    bump_user_revision(user_id)
     db.session.commit()
 
 
+MAX_OPS_PER_BATCH = 200
+
+
+def apply_week_ops(user_id: int, week_id: int, ops: list) -> tuple[MealPlanWeek, dict]:
+    """
+    Apply an ordered batch of planner edits to one week in one transaction.
+
+    Supported ops (field names match the single-item endpoints):
+      - createGroup:  day, name, sortOrder?, ref?
+      - updateGroup:  id | ref, name?, day?, sortOrder?
+      - deleteGroup:  id | ref
+      - addRecipe:    groupId | groupRef, recipeId, plannedServings?,
+                      sortOrder?, ref?
+      - updateRecipe: id | ref, plannedServings?, sortOrder?
+      - removeRecipe: id | ref
+      - moveRecipe:   id | ref, groupId | groupRef, sortOrder?
+
+    `ref` names an object created earlier in the batch so later ops can
+    target it. Ownership is checked once for the week; every referenced
+    group and placement must belong to it. Any failing op rolls back the
+    whole batch. Returns the week and a map of refs to new ids.
+    """
+    if not isinstance(ops, list) or not ops:
+        raise ValueError("ops must be a non-empty list")
+    if len(ops) > MAX_OPS_PER_BATCH:
+        raise ValueError(f"A batch cannot exceed {MAX_OPS_PER_BATCH} ops")
+
+    week = get_week_by_id(user_id, week_id, include_groups=True)
+    if not week:
+        raise ValueError("Week not found")
+
+    groups = {g.id: g for g in week.meal_groups}
+    placements = {gr.id: gr for g in week.meal_groups for gr in g.group_recipes}
+    group_refs = {}
+    placement_refs = {}
+
+    def op_recipe_id(op: dict) -> int:
+        if not op.get("recipeId"):
+            raise ValueError("recipeId is required")
+        try:
+            return int(op["recipeId"])
+        except (TypeError, ValueError):
+            raise ValueError("recipeId must be an integer") from None
+
+    recipe_ids = set()
+    for op in ops:
+        if isinstance(op, dict) and op.get("op") == "addRecipe":
+            try:
+                recipe_ids.add(op_recipe_id(op))
+            except ValueError:
+                # Reported with its index when the op is applied
+                continue
+    recipes = {}
+    if recipe_ids:
+        recipes = {
+            r.id: r
+            for r in Recipe.query.filter(
+                Recipe.id.in_(recipe_ids), Recipe.user_id == user_id
+            ).all()
+        }
+
+    def find_group(op: dict, id_key: str, ref_key: str) -> MealGroup:
+        group = (
+            group_refs.get(op[ref_key])
+            if op.get(ref_key)
+            else groups.get(int(op.get(id_key) or 0))
+        )
+        if group is None:
+            raise ValueError("Meal group not found")
+        return group
+
+    def find_placement(op: dict) -> MealGroupRecipe:
+        gr = (
+            placement_refs.get(op["ref"])
+            if op.get("ref")
+            else placements.get(int(op.get("id") or 0))
+        )
+        if gr is None:
+            raise ValueError("Meal group recipe not found")
+        return gr
+
+    def check_capacity(group: MealGroup) -> None:
+        if len(group.group_recipes) >= MAX_RECIPES_PER_GROUP:
+            raise ValueError(
+                f"Meal group cannot exceed {MAX_RECIPES_PER_GROUP} recipes"
+            )
+
+    # (recipe_id, servings_delta, count_delta) for the shopping list
+    contributions = []
+
+    try:
+        for idx, op in enumerate(ops):
+            try:
+                if not isinstance(op, dict):
+                    raise ValueError("op must be an object")
+                kind = op.get("op")
+
+                if kind == "createGroup":
+                    if not op.get("day"):
+                        raise ValueError("day is required")
+                    if not op.get("name"):
+                        raise ValueError("name is required")
+                    group = MealGroup(
+                        user_id=week.user_id,
+                        day=_parse_iso_date(op["day"]),
+                        name=op["name"].strip(),
+                        sort_order=op.get("sortOrder", 0),
+                    )
+                    week.meal_groups.append(group)
+                    if op.get("ref"):
+                        group_refs[op["ref"]] = group
+
+                elif kind == "updateGroup":
+                    group = find_group(op, "id", "ref")
+                    if "name" in op:
+                        group.name = op["name"].strip()
+                    if "day" in op:
+                        group.day = _parse_iso_date(op["day"])
+                    if "sortOrder" in op:
+                        group.sort_order = op["sortOrder"]
+
+                elif kind == "deleteGroup":
+                    group = find_group(op, "id", "ref")
+                    for gr in group.group_recipes:
+                        contributions.append((gr.recipe_id, -gr.planned_servings, -1))
+                        placements.pop(gr.id, None)
+                    groups.pop(group.id, None)
+                    week.meal_groups.remove(group)
+
+                elif kind == "addRecipe":
+                    group = find_group(op, "groupId", "groupRef")
+                    recipe = recipes.get(op_recipe_id(op))
+                    if not recipe:
+                        raise ValueError("Recipe not found")
+                    check_capacity(group)
+
+                    gr = MealGroupRecipe(
+                        user_id=week.user_id,
+                        recipe_id=recipe.id,
+                        recipe=recipe,
+                        planned_servings=_parse_planned_servings(
+                            op.get("plannedServings", recipe.servings or 1)
+                        ),
+                        sort_order=op.get("sortOrder", len(group.group_recipes)),
+                    )
+                    group.group_recipes.append(gr)
+                    contributions.append((recipe.id, gr.planned_servings, 1))
+                    if op.get("ref"):
+                        placement_refs[op["ref"]] = gr
+
+                elif kind == "updateRecipe":
+                    gr = find_placement(op)
+                    if "plannedServings" in op:
+                        servings = _parse_planned_servings(op["plannedServings"])
+                        contributions.append(
+                            (gr.recipe_id, servings - gr.planned_servings, 0)
+                        )
+                        gr.planned_servings = servings
+                    if "sortOrder" in op:
+                        gr.sort_order = op["sortOrder"]
+
+                elif kind == "removeRecipe":
+                    gr = find_placement(op)
+                    contributions.append((gr.recipe_id, -gr.planned_servings, -1))
+                    placements.pop(gr.id, None)
+                    gr.meal_group.group_recipes.remove(gr)
+
+                elif kind == "moveRecipe":
+                    gr = find_placement(op)
+                    target = find_group(op, "groupId", "groupRef")
+                    if target is not gr.meal_group:
+                        check_capacity(target)
+                        gr.meal_group = target
+                    gr.sort_order = op.get("sortOrder", gr.sort_order)
+
+                else:
+                    raise ValueError(f"Unknown op: {kind}")
+            except (KeyError, TypeError, ValueError) as e:
+                message = str(e) if isinstance(e, ValueError) else "Invalid op"
+                raise ValueError(f"ops[{idx}]: {message}") from e
+
+        db.session.flush()
+        apply_placement_change(week, contributions)
+        bump_user_revision(user_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    refs = {ref: g.id for ref, g in group_refs.items()}
+    refs.update({ref: gr.id for ref, gr in placement_refs.items()})
+    return week, refs
+
+
+def _copy_week_into(source: MealPlanWeek, targets: list[MealPlanWeek]) -> None:
+    """
+    Replace the groups of every target week with a copy of the source's.
+
+    Set-based: one read each for source groups and placements, one bulk
+    delete per table for the targets, and one batched insert per table
+    (new group ids come back via RETURNING, in row order). Does not commit.
+    """
+    target_ids = [t.id for t in targets]
+    if source.id in target_ids:
+        raise ValueError("Target week must differ from source week")
+
+    src_groups = db.session.execute(
+        select(MealGroup.id, MealGroup.day, MealGroup.name, MealGroup.sort_order)
+        .where(MealGroup.week_id == source.id)
+        .order_by(MealGroup.id)
+    ).all()
+
+    src_placements = db.session.execute(
+        select(
+            MealGroupRecipe.meal_group_id,
+            MealGroupRecipe.recipe_id,
+            MealGroupRecipe.planned_servings,
+            MealGroupRecipe.sort_order,
+        )
+        .join(MealGroup, MealGroup.id == MealGroupRecipe.meal_group_id)
+        .where(MealGroup.week_id == source.id)
+        .order_by(MealGroupRecipe.id)
+    ).all()
+
+    # Clear existing groups in targets (so copy is idempotent for demo).
+    # Placements are removed explicitly; SQLite does not enforce FK cascades
+    # unless foreign_keys is switched on.
+    target_groups = select(MealGroup.id).where(MealGroup.week_id.in_(target_ids))
+    db.session.execute(
+        delete(MealGroupRecipe)
+        .where(MealGroupRecipe.meal_group_id.in_(target_groups))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        delete(MealGroup)
+        .where(MealGroup.week_id.in_(target_ids))
+        .execution_options(synchronize_session=False)
+    )
+
+    if src_groups:
+        group_rows = []
+        for target in targets:
+            # Build day offset mapping
+            day_delta = target.week_start - source.week_start
+            for g in src_groups:
+                group_rows.append(
+                    {
+                        "week_id": target.id,
+                        "user_id": target.user_id,
+                        "day": g.day + day_delta,
+                        "name": g.name,
+                        "sort_order": g.sort_order,
+                    }
+                )
+
+        new_ids = db.session.scalars(
+            insert(MealGroup).returning(MealGroup.id, sort_by_parameter_order=True),
+            group_rows,
+        ).all()
+        # group_rows run target by target, source group by source group
+        keys = [
+            (target_idx, g.id)
+            for target_idx in range(len(targets))
+            for g in src_groups
+        ]
+        new_group_id = dict(zip(keys, new_ids))
+
+        placement_rows = [
+            {
+                "meal_group_id": new_group_id[(target_idx, p.meal_group_id)],
+                "user_id": source.user_id,
+                "recipe_id": p.recipe_id,
+                "planned_servings": p.planned_servings,
+                "sort_order": p.sort_order,
+            }
+            for target_idx in range(len(targets))
+            for p in src_placements
+        ]
+        if placement_rows:
+            db.session.execute(insert(MealGroupRecipe), placement_rows)
+
+    # Groups were replaced wholesale; rebuild the lists on next read.
+    for target in targets:
+        target.shopping_list_stale = True
+        db.session.expire(target, ["meal_groups"])
+
+
 def copy_week(
     user_id: int, source_week_id: int, target_week_start_iso: str
 ) -> MealPlanWeek:
@@ -181,39 +539,58 @@ def copy_week(
 
     target = get_or_create_week(user_id, target_week_start_iso)
 
-    # Clear existing groups in target (so copy is idempotent for demo)
-    for g in list(target.meal_groups):
-        db.session.delete(g)
-    db.session.flush()
+    _copy_week_into(source, [target])
 
-    # Build day offset mapping
-    src_start = source.week_start
-    tgt_start = target.week_start
-    day_delta = (tgt_start - src_start).days
+    bump_user_revision(user_id)
+    db.session.commit()
+    return target
 
-    # Copy groups + recipes
-    old_to_new_group = {}
 
-    for g in source.meal_groups:
-        new_group = MealGroup(
-            week_id=target.id,
-            day=g.day + timedelta(days=day_delta),
-            name=g.name,
-            sort_order=g.sort_order,
-        )
-        db.session.add(new_group)
-        db.session.flush()
-        old_to_new_group[g.id] = new_group
-
-        for gr in g.group_recipes:
-            db.session.add(
-                MealGroupRecipe(
-                    meal_group_id=new_group.id,
-                    recipe_id=gr.recipe_id,
-                    planned_servings=gr.planned_servings,
-                    sort_order=gr.sort_order,
-                )
-            )
+MAX_ROLLOUT_WEEKS = 12
+
 
+def rollout_week(
+    user_id: int, source_week_id: int, count: int, first_week_start_iso: str | None
+) -> list[MealPlanWeek]:
+    """
+    Stamp a source week onto `count` consecutive weeks in one transaction.
+
+    Targets start at `first_week_start_iso` (default: the week after the
+    source) and advance by 7 days. Missing weeks are created; existing ones
+    have their groups replaced.
+    """
+    source = get_week_by_id(user_id, source_week_id)
+    if not source:
+        raise ValueError("Source week not found")
+
+    if count < 1 or count > MAX_ROLLOUT_WEEKS:
+        raise ValueError(f"count must be between 1 and {MAX_ROLLOUT_WEEKS}")
+
+    first = (
+        _parse_iso_date(first_week_start_iso)
+        if first_week_start_iso
+        else source.week_start + timedelta(days=7)
+    )
+    week_starts = [first + timedelta(days=7 * i) for i in range(count)]
+
+    existing = {
+        w.week_start: w
+        for w in MealPlanWeek.query.filter(
+            MealPlanWeek.user_id == user_id,
+            MealPlanWeek.week_start.in_(week_starts),
+        ).all()
+    }
+    targets = []
+    for week_start in week_starts:
+        week = existing.get(week_start)
+        if week is None:
+            week = MealPlanWeek(user_id=user_id, week_start=week_start)
+            db.session.add(week)
+        targets.append(week)
+    db.session.flush()
+
+    _copy_week_into(source, targets)
+
+    bump_user_revision(user_id)
     db.session.commit()
-    return target
+    return targets
@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, timedelta
 from sqlalchemy.orm import joinedload
 
 from app.models.meal_group import MealGroup
@@ -6,6 +6,37 @@ from app.models.meal_group_recipe import MealGroupRecipe
 from app.models.recipe import Recipe
 
 
+def serialize_overview_groups(groups: list[MealGroup], recipe_cache=None):
+    """
+    Serialize eager-loaded groups for the overview in a single pass.
+
+    Each recipe is serialized (with ingredients) once and the result is
+    reused wherever it is placed again. Pass a shared `recipe_cache` dict to
+    reuse payloads across calls.
+    """
+    if recipe_cache is None:
+        recipe_cache = {}
+
+    payload_groups = []
+    for g in groups:
+        group_dict = g.to_dict()
+        recipes = []
+        for gr in g.group_recipes:
+            gr_dict = gr.to_dict()
+            if gr.recipe:
+                recipe_dict = recipe_cache.get(gr.recipe_id)
+                if recipe_dict is None:
+                    recipe_dict = gr.recipe.to_dict(include_ingredients=True)
+                    recipe_cache[gr.recipe_id] = recipe_dict
+                gr_dict["recipe"] = recipe_dict
+            recipes.append(gr_dict)
+
+        group_dict["recipes"] = recipes
+        payload_groups.append(group_dict)
+
+    return payload_groups
+
+
 def get_today_overview(user_id: int, target_date: date | None = None):
     """
     Return today's meal groups with recipes (including instructions).
@@ -27,29 +58,62 @@ def get_today_overview(user_id: int, target_date: date | None = None):
         .all()
     )
 
-    payload_groups = []
-    for g in groups:
-        group_dict = g.to_dict(include_recipes=True)
-        normalized = []
-        for gr in group_dict.get("recipes", []):
-            recipe = gr.get("recipe")
-            if recipe:
-                recipe_id = gr.get("recipeId") or recipe.get("id")
-                orm_recipe = None
-                for ogr in g.group_recipes:
-                    if ogr.recipe_id == recipe_id:
-                        orm_recipe = ogr.recipe
-                        break
-
-                if orm_recipe:
-                    gr["recipe"] = orm_recipe.to_dict(include_ingredients=True)
-
-            normalized.append(gr)
-
-        group_dict["recipes"] = normalized
-        payload_groups.append(group_dict)
+    payload_groups = serialize_overview_groups(groups)
 
     return {
         "date": target_date.isoformat(),
         "mealGroups": payload_groups,
     }
+
+
+MAX_OVERVIEW_DAYS = 14
+
+
+def get_range_overview(user_id: int, start: date, days: int):
+    """
+    Return meal groups for `days` consecutive days starting at `start`.
+
+    All groups are fetched with one eager-loaded query. Recipe payloads
+    (with ingredients) are listed once under "recipes", keyed by id; each
+    placement references its recipe by `recipeId` instead of embedding it.
+    """
+    if days < 1 or days > MAX_OVERVIEW_DAYS:
+        raise ValueError(f"days must be between 1 and {MAX_OVERVIEW_DAYS}")
+
+    end = start + timedelta(days=days - 1)
+
+    groups = (
+        MealGroup.query.join(MealGroup.week)
+        .filter(
+            MealGroup.day >= start,
+            MealGroup.day <= end,
+            MealGroup.week.has(user_id=user_id),
+        )
+        .options(
+            joinedload(MealGroup.group_recipes)
+            .joinedload(MealGroupRecipe.recipe)
+            .joinedload(Recipe.ingredients)
+        )
+        .order_by(MealGroup.day.asc(), MealGroup.sort_order.asc())
+        .all()
+    )
+
+    recipes = {}
+    by_day = {(start + timedelta(days=i)).isoformat(): [] for i in range(days)}
+    for g in groups:
+        group_dict = g.to_dict()
+        group_dict["recipes"] = []
+        for gr in g.group_recipes:
+            if gr.recipe and gr.recipe_id not in recipes:
+                recipes[gr.recipe_id] = gr.recipe.to_dict(include_ingredients=True)
+            group_dict["recipes"].append(gr.to_dict())
+        by_day[group_dict["day"]].append(group_dict)
+
+    return {
+        "from": start.isoformat(),
+        "days": [
+            {"date": day, "mealGroups": day_groups}
+            for day, day_groups in by_day.items()
+        ],
+        "recipes": {str(rid): payload for rid, payload in recipes.items()},
+    }
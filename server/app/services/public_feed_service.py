@@ -0,0 +1,94 @@
+"""
+Public recipe feed.
+
+The feed is the busiest anonymous endpoint, so serialized pages are cached
+in-process for a short TTL. Routes that change what a public recipe looks
+like (publish, unpublish, update, delete) call `invalidate_public_feed`.
+The cache is per process: other workers pick up changes when their entries
+expire, which bounds staleness to the TTL.
+"""
+
+import hashlib
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import and_, or_, select
+
+from app.extensions import db
+from app.models.recipe import Recipe
+from app.services.recipes_service import _decode_cursor, _encode_cursor
+
+
+DEFAULT_FEED_PAGE_SIZE = 50
+MAX_FEED_PAGE_SIZE = 100
+PUBLIC_FEED_TTL_SECONDS = 30
+_MAX_CACHED_PAGES = 256
+
+_lock = threading.Lock()
+_cache: dict[tuple, tuple[float, str, str]] = {}
+
+
+def invalidate_public_feed() -> None:
+    """Drop every cached feed page in this process."""
+    with _lock:
+        _cache.clear()
+
+
+def _query_feed_page(limit: int, cursor: str | None) -> tuple[list[dict], str | None]:
+    query = (
+        select(Recipe)
+        .where(Recipe.is_public.is_(True))
+        .order_by(Recipe.updated_at.desc(), Recipe.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        updated_at, recipe_id = _decode_cursor(cursor)
+        query = query.where(
+            or_(
+                Recipe.updated_at < updated_at,
+                and_(Recipe.updated_at == updated_at, Recipe.id < recipe_id),
+            )
+        )
+
+    recipes = db.session.scalars(query).all()
+    has_more = len(recipes) > limit
+    recipes = recipes[:limit]
+
+    next_cursor = None
+    if has_more and recipes:
+        next_cursor = _encode_cursor(recipes[-1].updated_at, recipes[-1].id)
+    return [r.to_dict() for r in recipes], next_cursor
+
+
+def get_public_feed_page(
+    limit: int = DEFAULT_FEED_PAGE_SIZE,
+    cursor: str | None = None,
+    paginated: bool = True,
+) -> tuple[str, str]:
+    """
+    Serialized JSON for one feed page, newest update first, plus its ETag.
+
+    paginated=False returns the legacy bare array of the first page.
+    Served from the in-process cache while fresh.
+    """
+    if limit < 1 or limit > MAX_FEED_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_FEED_PAGE_SIZE}")
+
+    key = (limit, cursor, paginated)
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1], hit[2]
+
+    items, next_cursor = _query_feed_page(limit, cursor)
+    payload = {"items": items, "nextCursor": next_cursor} if paginated else items
+    body = current_app.json.dumps(payload)
+    etag = hashlib.sha1(body.encode("utf-8")).hexdigest()[:20]
+
+    with _lock:
+        if len(_cache) >= _MAX_CACHED_PAGES:
+            _cache.clear()
+        _cache[key] = (now + PUBLIC_FEED_TTL_SECONDS, body, etag)
+    return body, etag
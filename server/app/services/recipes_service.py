@@ -1,8 +1,28 @@
+import base64
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime, timezone
+from operator import attrgetter
 from typing import List
 
+from sqlalchemy import and_, bindparam, insert, or_, select, update
+
 from app.extensions import db
 from app.models.recipe import Recipe
-from app.models.recipe_ingredient import RecipeIngredient
+from app.models.recipe_ingredient import RecipeIngredient, ingredient_name_key
+from app.services.shopping_service import apply_recipe_change
+from app.services.units import canonicalize
+from app.services.revisions import bump_user_revision
+from app.services.search_service import index_recipes, remove_recipes
+from app.services.ingredient_index_service import (
+    index_recipe_ingredients,
+    remove_recipe_postings,
+)
+from app.services.similarity_service import (
+    index_recipe_signatures,
+    remove_recipe_signatures,
+)
 
 
 def get_all_recipes(user_id: int) -> List[Recipe]:
@@ -13,6 +33,104 @@ def get_all_recipes(user_id: int) -> List[Recipe]:
     )
 
 
+# API field name -> (column, serializer) for column-limited list queries
+LIST_FIELDS = {
+    "id": (Recipe.id, None),
+    "userId": (Recipe.user_id, None),
+    "title": (Recipe.title, None),
+    "description": (Recipe.description, None),
+    "servings": (Recipe.servings, None),
+    "prepMin": (Recipe.prep_min, None),
+    "cookMin": (Recipe.cook_min, None),
+    "instructions": (Recipe.instructions, None),
+    "notes": (Recipe.notes, None),
+    "createdAt": (Recipe.created_at, datetime.isoformat),
+    "updatedAt": (Recipe.updated_at, datetime.isoformat),
+    "isPublic": (Recipe.is_public, None),
+    "externalId": (Recipe.external_id, None),
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _encode_cursor(created_at: datetime, recipe_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{recipe_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_iso, recipe_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_iso), int(recipe_id)
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+def get_recipes_page(
+    user_id: int,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    fields: list[str] | None = None,
+) -> tuple[list[dict], str | None]:
+    """
+    Keyset-paginated recipe listing, newest first.
+
+    Pages are ordered by (created_at, id) descending; `cursor` is the opaque
+    value returned as the previous page's next cursor. `fields` limits both
+    the response keys and the selected columns, so unrequested text columns
+    (instructions, notes) are never read. "id" is always included.
+
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    fields = list(fields or LIST_FIELDS)
+    unknown = [f for f in fields if f not in LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    if "id" not in fields:
+        fields.insert(0, "id")
+
+    columns = [LIST_FIELDS[f][0] for f in fields]
+    query = (
+        select(Recipe.created_at.label("_cursor_created_at"), *columns)
+        .where(Recipe.user_id == user_id)
+        .order_by(Recipe.created_at.desc(), Recipe.id.desc())
+        .limit(limit + 1)
+    )
+
+    if cursor:
+        created_at, recipe_id = _decode_cursor(cursor)
+        query = query.where(
+            or_(
+                Recipe.created_at < created_at,
+                and_(Recipe.created_at == created_at, Recipe.id < recipe_id),
+            )
+        )
+
+    rows = db.session.execute(query).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = []
+    for row in rows:
+        item = {}
+        for name, value in zip(fields, row[1:]):
+            serializer = LIST_FIELDS[name][1]
+            item[name] = serializer(value) if serializer and value is not None else value
+        items.append(item)
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = _encode_cursor(last[0], last[1 + fields.index("id")])
+
+    return items, next_cursor
+
+
 def get_recipe_by_id(recipe_id: int, user_id: int) -> Recipe | None:
     return Recipe.query.filter(
         Recipe.id == recipe_id,
@@ -20,6 +138,97 @@ def get_recipe_by_id(recipe_id: int, user_id: int) -> Recipe | None:
     ).first()
 
 
+def _normalized_text(value: str | None) -> str | None:
+    return (value or "").strip() or None
+
+
+def recipe_content_hash(recipe: dict, ingredients: list[tuple]) -> str:
+    """
+    sha256 over a recipe's normalized fields and ingredient list.
+
+    `recipe` holds column values (title, description, servings, prep_min,
+    cook_min, instructions, notes); `ingredients` are (name, quantity,
+    unit, notes) tuples in sort order. Text is trimmed with blanks read as
+    None and quantities compared as floats, so a recipe hashes the same
+    whether it comes from the API, a CSV import or the database.
+    """
+    content = [
+        _normalized_text(recipe.get("title")),
+        _normalized_text(recipe.get("description")),
+        recipe.get("servings"),
+        recipe.get("prep_min"),
+        recipe.get("cook_min"),
+        _normalized_text(recipe.get("instructions")),
+        _normalized_text(recipe.get("notes")),
+        [
+            [
+                _normalized_text(name),
+                None if quantity is None else float(quantity),
+                _normalized_text(unit),
+                _normalized_text(notes),
+            ]
+            for name, quantity, unit, notes in ingredients
+        ],
+    ]
+    raw = json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _recipe_content_hash(recipe: Recipe) -> str:
+    return recipe_content_hash(
+        {c.key: getattr(recipe, c.key) for c in _RECIPE_CONTENT_COLUMNS},
+        [
+            (i.name, i.quantity, i.unit, i.notes)
+            for i in sorted(recipe.ingredients, key=attrgetter("sort_order"))
+        ],
+    )
+
+
+def refresh_content_hashes(recipe_ids: list[int]) -> None:
+    """Recompute content hashes from the recipes' current rows. Does not commit."""
+    if not recipe_ids:
+        return
+
+    ingredients = defaultdict(list)
+    for row in db.session.execute(
+        select(
+            RecipeIngredient.recipe_id,
+            RecipeIngredient.name,
+            RecipeIngredient.quantity,
+            RecipeIngredient.unit,
+            RecipeIngredient.notes,
+        )
+        .where(RecipeIngredient.recipe_id.in_(recipe_ids))
+        .order_by(RecipeIngredient.recipe_id, RecipeIngredient.sort_order)
+    ):
+        ingredients[row.recipe_id].append(tuple(row[1:]))
+
+    recipes = db.session.execute(
+        select(Recipe.id, *_RECIPE_CONTENT_COLUMNS).where(Recipe.id.in_(recipe_ids))
+    ).all()
+
+    table = Recipe.__table__
+    db.session.execute(
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values(content_hash=bindparam("_hash")),
+        [
+            {
+                "_id": r.id,
+                "_hash": recipe_content_hash(r._asdict(), ingredients[r.id]),
+            }
+            for r in recipes
+        ],
+    )
+
+
+def rebuild_content_hashes(batch_size: int = 1000) -> None:
+    """Recompute every recipe's content hash. Does not commit."""
+    ids = db.session.scalars(select(Recipe.id).order_by(Recipe.id)).all()
+    for start in range(0, len(ids), batch_size):
+        refresh_content_hashes(ids[start : start + batch_size])
+
+
 def create_recipe(user_id: int, payload: dict) -> Recipe:
     title = payload.get("title")
     if not title:
@@ -50,12 +259,139 @@ def create_recipe(user_id: int, payload: dict) -> Recipe:
             )
         )
 
+    recipe.content_hash = _recipe_content_hash(recipe)
     db.session.add(recipe)
+    db.session.flush()
+    index_recipes([recipe.id])
+    index_recipe_ingredients([recipe.id])
+    index_recipe_signatures([recipe.id])
+    bump_user_revision(user_id)
     db.session.commit()
     return recipe
 
 
-def update_recipe(recipe: Recipe, payload: dict) -> Recipe:
+_INGREDIENT_FIELDS = ("name", "quantity", "unit", "notes", "sort_order")
+
+
+def _plan_ingredient_diff(
+    existing: list[RecipeIngredient], incoming: list[dict]
+) -> list[tuple[RecipeIngredient | None, dict]]:
+    """
+    Pair each incoming ingredient with the existing row it replaces.
+
+    Rows are matched by "id" when the payload carries one, otherwise by
+    position when the name at that position is unchanged, and failing that
+    by the first unclaimed row with the same name. Unpaired incoming items
+    map to None (insert); unclaimed existing rows are deleted.
+    """
+    by_id = {ing.id: ing for ing in existing}
+    claimed = set()
+
+    for ing in incoming:
+        ing_id = ing.get("id")
+        if ing_id is None:
+            continue
+        if ing_id not in by_id:
+            raise ValueError(f"Ingredient {ing_id} does not belong to this recipe")
+        if ing_id in claimed:
+            raise ValueError(f"Ingredient {ing_id} appears more than once")
+        claimed.add(ing_id)
+
+    plan = []
+    for idx, ing in enumerate(incoming):
+        name = ing["name"].strip()
+        values = {
+            "name": name,
+            "quantity": ing.get("quantity"),
+            "unit": ing.get("unit"),
+            "notes": ing.get("notes"),
+            "sort_order": idx,
+        }
+
+        row = by_id.get(ing.get("id"))
+        if row is None and idx < len(existing):
+            candidate = existing[idx]
+            if (
+                candidate.id not in claimed
+                and candidate.name.strip().lower() == name.lower()
+            ):
+                row = candidate
+        if row is None:
+            row = next(
+                (
+                    e
+                    for e in existing
+                    if e.id not in claimed
+                    and e.name.strip().lower() == name.lower()
+                ),
+                None,
+            )
+        if row is not None:
+            claimed.add(row.id)
+        plan.append((row, values))
+
+    return plan
+
+
+def _sync_ingredients(recipe: Recipe, incoming: list[dict]) -> dict:
+    """
+    Apply an ingredient list to a recipe, touching only rows that changed.
+
+    Returns {"updated", "inserted", "deleted"} row counts.
+    """
+    existing = list(recipe.ingredients)
+    plan = _plan_ingredient_diff(existing, incoming)
+    kept = {row.id for row, _ in plan if row is not None}
+
+    counts = {"updated": 0, "inserted": 0, "deleted": 0}
+
+    for row in existing:
+        if row.id not in kept:
+            recipe.ingredients.remove(row)
+            counts["deleted"] += 1
+
+    for row, values in plan:
+        if row is None:
+            recipe.ingredients.append(RecipeIngredient(**values))
+            counts["inserted"] += 1
+            continue
+
+        changed = False
+        for field in _INGREDIENT_FIELDS:
+            if getattr(row, field) != values[field]:
+                setattr(row, field, values[field])
+                changed = True
+        if changed:
+            counts["updated"] += 1
+
+    return counts
+
+
+def update_recipe(recipe: Recipe, payload: dict) -> tuple[Recipe, dict | None]:
+    """
+    Apply a partial update. Returns (recipe, ingredient_changes), where
+    ingredient_changes holds update/insert/delete row counts when the payload
+    carried an ingredient list, else None.
+    """
+    ingredient_changes = _apply_recipe_update(recipe, payload)
+    bump_user_revision(recipe.user_id)
+    db.session.commit()
+    return recipe, ingredient_changes
+
+
+def _apply_recipe_update(recipe: Recipe, payload: dict) -> dict | None:
+    """Body of update_recipe; flushes and re-indexes but does not commit."""
+    ingredient_plan = None
+    if "ingredients" in payload:
+        # Validate ids before anything is touched
+        _plan_ingredient_diff(list(recipe.ingredients), payload["ingredients"])
+        ingredient_plan = payload["ingredients"]
+
+    # Planned weeks' shopping lists depend on ingredients and servings
+    affects_shopping = ingredient_plan is not None or "servings" in payload
+    if affects_shopping:
+        apply_recipe_change(recipe, -1)
+
     if "title" in payload:
         recipe.title = payload["title"].strip()
 
@@ -65,18 +401,10 @@ def update_recipe(recipe: Recipe, payload: dict) -> Recipe:
     if "servings" in payload:
         recipe.servings = payload["servings"]
 
-    if "ingredients" in payload:
-        recipe.ingredients.clear()
-        for idx, ing in enumerate(payload["ingredients"]):
-            recipe.ingredients.append(
-                RecipeIngredient(
-                    name=ing["name"].strip(),
-                    quantity=ing.get("quantity"),
-                    unit=ing.get("unit"),
-                    notes=ing.get("notes"),
-                    sort_order=idx,
-                )
-            )
+    ingredient_changes = None
+    if ingredient_plan is not None:
+        ingredient_changes = _sync_ingredients(recipe, ingredient_plan)
+
     if "prepMin" in payload:
         recipe.prep_min = payload["prepMin"]
 
@@ -89,10 +417,291 @@ def update_recipe(recipe: Recipe, payload: dict) -> Recipe:
     if "notes" in payload:
         recipe.notes = payload["notes"]
 
-    db.session.commit()
-    return recipe
+    recipe.content_hash = _recipe_content_hash(recipe)
+    db.session.flush()
+    if affects_shopping:
+        apply_recipe_change(recipe, 1)
+    index_recipes([recipe.id])
+    ingredients_changed = bool(ingredient_changes and any(ingredient_changes.values()))
+    if ingredients_changed:
+        index_recipe_ingredients([recipe.id])
+    if ingredients_changed or "title" in payload:
+        index_recipe_signatures([recipe.id])
+
+    return ingredient_changes
+
+
+MAX_BULK_RECIPES = 5000
+BULK_CHUNK_SIZE = 500
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _validate_recipe_payload(payload, partial: bool = False) -> str | None:
+    """
+    Check a recipe payload's shape up front. Returns an error message, or
+    None when valid. `partial` allows a missing title (updates).
+    """
+    if not isinstance(payload, dict):
+        return "Recipe must be an object"
+
+    if not partial or "title" in payload:
+        title = payload.get("title")
+        if not isinstance(title, str) or not title.strip():
+            return "Recipe title is required"
+
+    if "servings" in payload:
+        servings = payload["servings"]
+        if not _is_int(servings) or servings < 1:
+            return "servings must be a positive integer"
+
+    for key in ("prepMin", "cookMin"):
+        value = payload.get(key)
+        if value is not None and (not _is_int(value) or value < 0):
+            return f"{key} must be a non-negative integer"
+
+    for key in ("description", "instructions", "notes"):
+        value = payload.get(key)
+        if value is not None and not isinstance(value, str):
+            return f"{key} must be a string"
+
+    ingredients = payload.get("ingredients", [])
+    if not isinstance(ingredients, list):
+        return "ingredients must be a list"
+    for idx, ing in enumerate(ingredients):
+        if not isinstance(ing, dict):
+            return f"Ingredient {idx} must be an object"
+        name = ing.get("name")
+        if not isinstance(name, str) or not name.strip():
+            return f"Ingredient {idx} name is required"
+        quantity = ing.get("quantity")
+        if quantity is not None and (
+            isinstance(quantity, bool) or not isinstance(quantity, (int, float))
+        ):
+            return f"Ingredient {idx} quantity must be a number"
+        for key in ("unit", "notes"):
+            value = ing.get(key)
+            if value is not None and not isinstance(value, str):
+                return f"Ingredient {idx} {key} must be a string"
+
+    return None
+
+
+# Recipe columns written by bulk inserts and covered by the content hash
+_RECIPE_CONTENT_COLUMNS = (
+    Recipe.title,
+    Recipe.description,
+    Recipe.servings,
+    Recipe.prep_min,
+    Recipe.cook_min,
+    Recipe.instructions,
+    Recipe.notes,
+)
+
+
+def insert_ingredient_rows(rows: list[dict]) -> None:
+    """
+    Batch-insert ingredient rows (recipe_id, name, quantity, unit, notes,
+    sort_order). Core inserts skip the ORM event that fills the name key and
+    canonical units, so they are computed here. Does not commit.
+    """
+    if not rows:
+        return
+
+    for row in rows:
+        row["name_key"] = ingredient_name_key(row["name"])
+        row["canonical_unit"], row["base_quantity"] = canonicalize(
+            row.get("quantity"), row.get("unit")
+        )
+    db.session.execute(insert(RecipeIngredient), rows)
+
+
+def insert_recipe_rows(
+    user_id: int,
+    recipes: list[dict],
+    ingredients: list[list[dict]],
+    import_job_id: int | None = None,
+) -> list[int]:
+    """
+    Insert recipes and their ingredients with one batched statement per table.
+
+    `recipes` hold column values (title, description, servings, prep_min,
+    cook_min, instructions, notes, optionally external_id);
+    `ingredients[i]` holds the ingredient rows of recipes[i] without
+    recipe_id. Content hashes are filled in. Returns the new ids in input
+    order. Does not index or commit.
+    """
+    if not recipes:
+        return []
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            **{c.key: r.get(c.key) for c in _RECIPE_CONTENT_COLUMNS},
+            "user_id": user_id,
+            "external_id": r.get("external_id"),
+            "content_hash": recipe_content_hash(
+                r,
+                [
+                    (i["name"], i.get("quantity"), i.get("unit"), i.get("notes"))
+                    for i in recipe_ingredients
+                ],
+            ),
+            "is_public": False,
+            "import_job_id": import_job_id,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for r, recipe_ingredients in zip(recipes, ingredients)
+    ]
+
+    ids = db.session.scalars(
+        insert(Recipe).returning(Recipe.id, sort_by_parameter_order=True), rows
+    ).all()
+
+    insert_ingredient_rows(
+        [
+            {**ing, "recipe_id": recipe_id}
+            for recipe_id, recipe_ingredients in zip(ids, ingredients)
+            for ing in recipe_ingredients
+        ]
+    )
+    return ids
+
+
+def _insert_recipe_chunk(user_id: int, payloads: list[dict]) -> list[int]:
+    """
+    Insert validated recipe payloads and index them.
+    Returns the new ids in payload order. Does not commit.
+    """
+    ids = insert_recipe_rows(
+        user_id,
+        [
+            {
+                "title": p["title"].strip(),
+                "description": p.get("description"),
+                "servings": p.get("servings", 1),
+                "prep_min": p.get("prepMin"),
+                "cook_min": p.get("cookMin"),
+                "instructions": p.get("instructions"),
+                "notes": p.get("notes"),
+            }
+            for p in payloads
+        ],
+        [
+            [
+                {
+                    "name": ing["name"].strip(),
+                    "quantity": ing.get("quantity"),
+                    "unit": ing.get("unit"),
+                    "notes": ing.get("notes"),
+                    "sort_order": idx,
+                }
+                for idx, ing in enumerate(p.get("ingredients", []))
+            ]
+            for p in payloads
+        ],
+    )
+
+    index_recipes(ids)
+    index_recipe_ingredients(ids)
+    index_recipe_signatures(ids)
+    return ids
+
+
+def bulk_save_recipes(user_id: int, items: list) -> list[dict]:
+    """
+    Create or update many recipes in one call.
+
+    Items without "id" are created (same shape as create_recipe); items with
+    "id" are partial updates of the user's recipe. Every item is validated
+    before any write; invalid ones are reported and skipped. Creates are
+    inserted in batched chunks, and each chunk is committed on its own.
+
+    Returns one {"index", "status", "id" | "error"} entry per item, where
+    status is "created", "updated" or "error".
+    """
+    if not isinstance(items, list):
+        raise ValueError("Expected a list of recipes")
+    if len(items) > MAX_BULK_RECIPES:
+        raise ValueError(f"Cannot save more than {MAX_BULK_RECIPES} recipes at once")
+
+    results: list[dict | None] = [None] * len(items)
+
+    def fail(index: int, message: str) -> None:
+        results[index] = {"index": index, "status": "error", "error": message}
+
+    update_ids = {
+        item["id"]
+        for item in items
+        if isinstance(item, dict) and _is_int(item.get("id"))
+    }
+    existing = {}
+    if update_ids:
+        existing = {
+            r.id: r
+            for r in Recipe.query.filter(
+                Recipe.id.in_(update_ids), Recipe.user_id == user_id
+            ).all()
+        }
+
+    creates: list[tuple[int, dict]] = []
+    updates: list[tuple[int, dict]] = []
+    seen_ids = set()
+    for index, item in enumerate(items):
+        is_update = isinstance(item, dict) and "id" in item
+        error = _validate_recipe_payload(item, partial=is_update)
+        if error:
+            fail(index, error)
+            continue
+
+        if not is_update:
+            creates.append((index, item))
+            continue
+
+        recipe = existing.get(item["id"])
+        if recipe is None:
+            fail(index, "Recipe not found")
+            continue
+        if recipe.id in seen_ids:
+            fail(index, f"Recipe {recipe.id} appears more than once")
+            continue
+        if "ingredients" in item:
+            try:
+                _plan_ingredient_diff(list(recipe.ingredients), item["ingredients"])
+            except ValueError as e:
+                fail(index, str(e))
+                continue
+        seen_ids.add(recipe.id)
+        updates.append((index, item))
+
+    for start in range(0, len(creates), BULK_CHUNK_SIZE):
+        chunk = creates[start : start + BULK_CHUNK_SIZE]
+        ids = _insert_recipe_chunk(user_id, [p for _, p in chunk])
+        bump_user_revision(user_id)
+        db.session.commit()
+        for (index, _), recipe_id in zip(chunk, ids):
+            results[index] = {"index": index, "status": "created", "id": recipe_id}
+
+    for start in range(0, len(updates), BULK_CHUNK_SIZE):
+        chunk = updates[start : start + BULK_CHUNK_SIZE]
+        for index, item in chunk:
+            _apply_recipe_update(existing[item["id"]], item)
+        bump_user_revision(user_id)
+        db.session.commit()
+        for index, item in chunk:
+            results[index] = {"index": index, "status": "updated", "id": item["id"]}
+
+    return results
 
 
 def delete_recipe(recipe: Recipe) -> None:
+    apply_recipe_change(recipe, -1)
+    remove_recipes([recipe.id])
+    remove_recipe_postings([recipe.id])
+    remove_recipe_signatures([recipe.id])
     db.session.delete(recipe)
+    bump_user_revision(recipe.user_id)
     db.session.commit()
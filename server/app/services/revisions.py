@@ -0,0 +1,27 @@
+"""
+Per-user data revision.
+
+Every service mutation that changes what a user's GET endpoints return calls
+`bump_user_revision` inside its transaction. Conditional GETs build their
+ETag from the current value, so a matching If-None-Match can be answered
+with a 304 without loading or serializing anything else.
+"""
+
+from sqlalchemy import select, update
+
+from app.extensions import db
+from app.models.user import User
+
+
+def bump_user_revision(user_id: int) -> None:
+    """Increment the user's revision. Does not commit."""
+    db.session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(revision=User.revision + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_user_revision(user_id: int) -> int | None:
+    return db.session.scalar(select(User.revision).where(User.id == user_id))
@@ -0,0 +1,152 @@
+import re
+
+from sqlalchemy import bindparam, text
+
+from app.extensions import db
+from app.models.recipe import Recipe
+from app.models.recipe_search import SEARCH_TABLE
+
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# bm25 column weights: title, description, instructions, ingredients
+_RANK = f"bm25({SEARCH_TABLE}, 10.0, 2.0, 1.0, 4.0)"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Index rows are built in SQL straight from recipes + ingredient names
+_INDEX_FROM_RECIPES = (
+    f"INSERT INTO {SEARCH_TABLE} "
+    "(rowid, title, description, instructions, ingredients) "
+    "SELECT r.id, r.title, COALESCE(r.description, ''), "
+    "COALESCE(r.instructions, ''), "
+    "COALESCE((SELECT group_concat(i.name, ' ') "
+    "FROM recipe_ingredients i WHERE i.recipe_id = r.id), '') "
+    "FROM recipes r"
+)
+
+
+def _fts_enabled() -> bool:
+    return db.session.get_bind().dialect.name == "sqlite"
+
+
+def index_recipes(recipe_ids: list[int]) -> None:
+    """
+    (Re)index recipes by id from their current rows. Call after flushing
+    the changes; does not commit.
+    """
+    if not recipe_ids or not _fts_enabled():
+        return
+
+    ids = bindparam("ids", expanding=True)
+    db.session.execute(
+        text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN :ids").bindparams(ids),
+        {"ids": list(recipe_ids)},
+    )
+    db.session.execute(
+        text(_INDEX_FROM_RECIPES + " WHERE r.id IN :ids").bindparams(ids),
+        {"ids": list(recipe_ids)},
+    )
+
+
+def remove_recipes(recipe_ids: list[int]) -> None:
+    """Drop recipes from the index. Does not commit."""
+    if not recipe_ids or not _fts_enabled():
+        return
+
+    db.session.execute(
+        text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN :ids").bindparams(
+            bindparam("ids", expanding=True)
+        ),
+        {"ids": list(recipe_ids)},
+    )
+
+
+def rebuild_search_index() -> None:
+    """Rebuild the whole index from the recipes table. Does not commit."""
+    if not _fts_enabled():
+        return
+
+    db.session.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    db.session.execute(text(_INDEX_FROM_RECIPES))
+
+
+def _match_expression(q: str) -> str | None:
+    # Quote each word so user input can never be parsed as FTS syntax;
+    # the last word is a prefix match to support search-as-you-type.
+    tokens = _TOKEN_RE.findall(q or "")
+    if not tokens:
+        return None
+    terms = [f'"{t}"' for t in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_recipes(
+    user_id: int,
+    q: str,
+    scope: str = "all",
+    limit: int = DEFAULT_SEARCH_LIMIT,
+    offset: int = 0,
+) -> tuple[list[dict], int | None]:
+    """
+    Ranked full-text search over title, description, instructions and
+    ingredient names.
+
+    scope:
+      - "mine": the user's recipes
+      - "public": published recipes from anyone
+      - "all": both (default)
+
+    Returns (items, next_offset); next_offset is None on the last page.
+    """
+    if scope not in ("mine", "public", "all"):
+        raise ValueError("scope must be one of: mine, public, all")
+    if limit < 1 or limit > MAX_SEARCH_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+    if offset < 0:
+        raise ValueError("offset must be >= 0")
+
+    match = _match_expression(q)
+    if not match:
+        raise ValueError("q is required")
+
+    visibility = {
+        "mine": "r.user_id = :user_id",
+        "public": "r.is_public",
+        "all": "(r.user_id = :user_id OR r.is_public)",
+    }[scope]
+
+    if _fts_enabled():
+        rows = db.session.execute(
+            text(
+                f"SELECT r.id FROM {SEARCH_TABLE} s "
+                "JOIN recipes r ON r.id = s.rowid "
+                f"WHERE {SEARCH_TABLE} MATCH :match AND {visibility} "
+                f"ORDER BY {_RANK}, r.id LIMIT :limit OFFSET :offset"
+            ),
+            {"match": match, "user_id": user_id, "limit": limit + 1, "offset": offset},
+        ).all()
+    else:
+        # Other databases: plain title match, newest first
+        rows = db.session.execute(
+            text(
+                f"SELECT r.id FROM recipes r "
+                f"WHERE lower(r.title) LIKE :pattern AND {visibility} "
+                "ORDER BY r.updated_at DESC, r.id LIMIT :limit OFFSET :offset"
+            ),
+            {
+                "pattern": f"%{(q or '').strip().lower()}%",
+                "user_id": user_id,
+                "limit": limit + 1,
+                "offset": offset,
+            },
+        ).all()
+
+    ids = [row[0] for row in rows[:limit]]
+    next_offset = offset + limit if len(rows) > limit else None
+
+    recipes = {r.id: r for r in Recipe.query.filter(Recipe.id.in_(ids)).all()}
+    items = [recipes[i].to_dict() for i in ids if i in recipes]
+    return items, next_offset
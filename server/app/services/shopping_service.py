@@ -1,21 +1,366 @@
 from collections import defaultdict
+from datetime import date, timedelta
 
+from sqlalchemy import case, func, select
+
+from app.extensions import db
 from app.models.meal_plan_week import MealPlanWeek
+from app.models.meal_group import MealGroup
 from app.models.meal_group_recipe import MealGroupRecipe
 from app.models.recipe import Recipe
+from app.models.recipe_ingredient import RecipeIngredient
+from app.models.shopping_list_item import ShoppingListItem
+from app.services.units import from_base
+
+
+# Totals are floats summed incrementally; anything closer than this is equal.
+QUANTITY_TOLERANCE = 1e-6
+
+
+def _recipe_servings():
+    # guard against bad data so scaling never divides by zero
+    return case((Recipe.servings > 0, Recipe.servings), else_=1)
+
+
+def _servings_scale():
+    # planned servings relative to the recipe's yield
+    return MealGroupRecipe.planned_servings * 1.0 / _recipe_servings()
+
+
+def _aggregate_week(
+    week_id: int,
+    user_id: int,
+    name_keys: set[str] | None = None,
+    days: tuple[date, date] | None = None,
+) -> list:
+    """
+    Compute a week's shopping list from scratch in a single query, or just
+    the items for `name_keys`, or for the meals on `days` (first, last).
+
+    Joins groups -> placements -> ingredients and groups by the stored
+    (name key, canonical unit). A window rank keeps the display name/unit of
+    the last row in plan order. Returns one row per item; `name` is the raw
+    ingredient name (strip it for display).
+    """
+    partition = (RecipeIngredient.name_key, RecipeIngredient.canonical_unit)
+
+    filters = [
+        MealGroup.week_id == week_id,
+        Recipe.user_id == user_id,
+        RecipeIngredient.name_key != "",
+    ]
+    if name_keys is not None:
+        filters.append(RecipeIngredient.name_key.in_(name_keys))
+    if days is not None:
+        filters.append(MealGroup.day.between(*days))
+
+    rows = (
+        select(
+            RecipeIngredient.name_key.label("name_key"),
+            RecipeIngredient.canonical_unit.label("canonical_unit"),
+            RecipeIngredient.name.label("name"),
+            RecipeIngredient.unit.label("unit"),
+            func.sum(
+                func.coalesce(RecipeIngredient.base_quantity, 0.0)
+                * _servings_scale()
+            )
+            .over(partition_by=partition)
+            .label("total"),
+            func.count().over(partition_by=partition).label("contributions"),
+            func.row_number()
+            .over(
+                partition_by=partition,
+                order_by=(
+                    MealGroupRecipe.id.desc(),
+                    RecipeIngredient.sort_order.desc(),
+                    RecipeIngredient.id.desc(),
+                ),
+            )
+            .label("rank"),
+        )
+        .select_from(MealGroup)
+        .join(MealGroupRecipe, MealGroupRecipe.meal_group_id == MealGroup.id)
+        .join(Recipe, Recipe.id == MealGroupRecipe.recipe_id)
+        .join(RecipeIngredient, RecipeIngredient.recipe_id == Recipe.id)
+        .where(*filters)
+        .subquery()
+    )
+
+    return db.session.execute(
+        select(
+            rows.c.name_key,
+            rows.c.canonical_unit,
+            rows.c.name,
+            rows.c.unit,
+            rows.c.total,
+            rows.c.contributions,
+        ).where(rows.c.rank == 1)
+    ).all()
+
+
+def rebuild_week_shopping_list(week: MealPlanWeek) -> None:
+    """
+    Recompute a week's materialized shopping list from scratch.
+
+    Does not commit; callers own the transaction.
+    """
+    ShoppingListItem.query.filter(ShoppingListItem.week_id == week.id).delete(
+        synchronize_session=False
+    )
+
+    rows = _aggregate_week(week.id, week.user_id)
+    if rows:
+        db.session.execute(
+            ShoppingListItem.__table__.insert(),
+            [
+                {
+                    "week_id": week.id,
+                    "name_key": r.name_key,
+                    "canonical_unit": r.canonical_unit,
+                    "name": r.name.strip(),
+                    "unit": r.unit,
+                    "base_quantity": float(r.total),
+                    "contributions": r.contributions,
+                }
+                for r in rows
+            ],
+        )
+
+    week.shopping_list_stale = False
+
+
+def check_week_shopping_list(week: MealPlanWeek, repair: bool = False) -> list:
+    """
+    Compare a week's materialized shopping list against a fresh aggregate.
+
+    Returns a list of mismatches (empty when consistent). With `repair=True`
+    the week is rebuilt from scratch if anything differs; the caller commits.
+    """
+    expected = {
+        (r.name_key, r.canonical_unit): r
+        for r in _aggregate_week(week.id, week.user_id)
+    }
+    actual = {
+        (i.name_key, i.canonical_unit): i
+        for i in ShoppingListItem.query.filter(
+            ShoppingListItem.week_id == week.id
+        ).all()
+    }
+
+    problems = []
+    for key in expected.keys() | actual.keys():
+        want = expected.get(key)
+        have = actual.get(key)
+        if want is None:
+            problems.append({"key": list(key), "problem": "unexpected"})
+        elif have is None:
+            problems.append({"key": list(key), "problem": "missing"})
+        elif (
+            abs(float(want.total) - have.base_quantity) > QUANTITY_TOLERANCE
+            or want.contributions != have.contributions
+        ):
+            problems.append(
+                {
+                    "key": list(key),
+                    "problem": "mismatch",
+                    "expected": float(want.total),
+                    "actual": have.base_quantity,
+                }
+            )
+        # Pending labels are re-derived on the next read
+        elif not have.label_stale and (have.name, have.unit) != (
+            want.name.strip(),
+            want.unit,
+        ):
+            problems.append(
+                {
+                    "key": list(key),
+                    "problem": "label",
+                    "expected": [want.name.strip(), want.unit],
+                    "actual": [have.name, have.unit],
+                }
+            )
+
+    if repair and problems:
+        rebuild_week_shopping_list(week)
+
+    return problems
+
+
+def _apply_deltas(
+    week_id: int, user_id: int, contributions: list[tuple[int, float, int]]
+):
+    """
+    Adjust a week's materialized rows for a set of placement changes.
+
+    `contributions` holds (recipe_id, servings_delta, count_delta) tuples:
+    adding a placement is (+planned, +1), removing it (-planned, -1) and
+    rescaling it (new - old, 0). Only the week owner's recipes count, as in
+    `_aggregate_week`. Touched rows get label_stale, since which row supplies
+    the display name/unit depends on the whole week.
+    """
+    by_recipe = defaultdict(lambda: [0.0, 0])
+    for recipe_id, servings_delta, count_delta in contributions:
+        by_recipe[recipe_id][0] += servings_delta
+        by_recipe[recipe_id][1] += count_delta
+
+    if not by_recipe:
+        return
+
+    ingredients = db.session.execute(
+        select(
+            RecipeIngredient.recipe_id,
+            RecipeIngredient.name_key,
+            RecipeIngredient.canonical_unit,
+            RecipeIngredient.name,
+            RecipeIngredient.unit,
+            func.coalesce(RecipeIngredient.base_quantity, 0.0),
+            _recipe_servings(),
+        )
+        .join(Recipe, Recipe.id == RecipeIngredient.recipe_id)
+        .where(
+            RecipeIngredient.recipe_id.in_(list(by_recipe)),
+            Recipe.user_id == user_id,
+            RecipeIngredient.name_key != "",
+        )
+        .order_by(RecipeIngredient.recipe_id, RecipeIngredient.sort_order)
+    ).all()
 
+    deltas = {}
+    for recipe_id, name_key, canonical_unit, name, unit, base, servings in ingredients:
+        servings_delta, count_delta = by_recipe[recipe_id]
+        key = (name_key, canonical_unit)
+        entry = deltas.setdefault(key, [name.strip(), unit, 0.0, 0])
+        entry[2] += base * servings_delta / servings
+        entry[3] += count_delta
 
-def _key(name: str, unit: str | None) -> tuple[str, str | None]:
-    return (name.strip().lower(), unit.strip().lower() if unit else None)
+    if not deltas:
+        return
+
+    existing = {
+        (i.name_key, i.canonical_unit): i
+        for i in ShoppingListItem.query.filter(
+            ShoppingListItem.week_id == week_id,
+            ShoppingListItem.name_key.in_({k[0] for k in deltas}),
+        ).all()
+    }
+
+    for key, (name, unit, qty, count) in deltas.items():
+        item = existing.get(key)
+        if item is None:
+            if count > 0:
+                db.session.add(
+                    ShoppingListItem(
+                        week_id=week_id,
+                        name_key=key[0],
+                        canonical_unit=key[1],
+                        name=name,
+                        unit=unit,
+                        base_quantity=qty,
+                        contributions=count,
+                        label_stale=True,
+                    )
+                )
+            continue
+
+        item.contributions += count
+        if item.contributions <= 0:
+            db.session.delete(item)
+        else:
+            item.base_quantity += qty
+            item.label_stale = True
+
+
+def _refresh_labels(weeks: list[MealPlanWeek]) -> bool:
+    """
+    Re-derive display name/unit for the weeks' label_stale rows with the
+    rebuild's rule. Returns whether anything changed; does not commit.
+    """
+    stale = ShoppingListItem.query.filter(
+        ShoppingListItem.week_id.in_([w.id for w in weeks]),
+        ShoppingListItem.label_stale.is_(True),
+    ).all()
+    if not stale:
+        return False
+
+    by_week = defaultdict(list)
+    for item in stale:
+        by_week[item.week_id].append(item)
+
+    for week in weeks:
+        items = by_week.get(week.id)
+        if not items:
+            continue
+        labels = {
+            (r.name_key, r.canonical_unit): (r.name.strip(), r.unit)
+            for r in _aggregate_week(
+                week.id, week.user_id, {i.name_key for i in items}
+            )
+        }
+        for item in items:
+            label = labels.get((item.name_key, item.canonical_unit))
+            if label is not None:
+                item.name, item.unit = label
+            item.label_stale = False
+    return True
+
+
+def apply_placement_change(
+    week: MealPlanWeek, contributions: list[tuple[int, float, int]]
+) -> None:
+    """
+    Record placement changes for a week (see `_apply_deltas`).
+
+    Stale weeks are skipped; they are rebuilt on the next read anyway.
+    Does not commit.
+    """
+    if week.shopping_list_stale:
+        return
+    _apply_deltas(week.id, week.user_id, contributions)
+
+
+def apply_recipe_change(recipe: Recipe, sign: int) -> None:
+    """
+    Add (sign=+1) or remove (sign=-1) a recipe's current ingredients from
+    every week it is planned in.
+
+    Call with -1 before changing a recipe's ingredients or servings, and
+    with +1 after flushing the change. Does not commit.
+    """
+    placements = db.session.execute(
+        select(
+            MealGroup.week_id,
+            MealPlanWeek.user_id,
+            func.sum(MealGroupRecipe.planned_servings),
+            func.count(MealGroupRecipe.id),
+        )
+        .join(MealGroup, MealGroup.id == MealGroupRecipe.meal_group_id)
+        .join(MealPlanWeek, MealPlanWeek.id == MealGroup.week_id)
+        .where(
+            MealGroupRecipe.recipe_id == recipe.id,
+            MealPlanWeek.shopping_list_stale.is_(False),
+        )
+        .group_by(MealGroup.week_id, MealPlanWeek.user_id)
+    ).all()
+
+    for week_id, user_id, planned, count in placements:
+        _apply_deltas(
+            week_id, user_id, [(recipe.id, sign * float(planned), sign * count)]
+        )
 
 
 def build_shopping_list_for_week(user_id: int, week_id: int) -> list[dict]:
     """
     Aggregate ingredients for all recipes planned in a week.
 
-    MVP behavior:
-      - Sums by (ingredient name, unit)
-      - Ignores serving scaling initially (we can add scaling as polish)
+    Behavior:
+      - Sums by (ingredient name, canonical unit), so "cup"/"cups" or
+        "g"/"kg" merge into one item
+      - Scales each placement by planned servings / recipe servings
+      - Totals are shown in the item's display unit
+
+    Reads the week's materialized `shopping_list_items`, rebuilding them
+    first if the week is marked stale.
     """
     week = MealPlanWeek.query.filter(
         MealPlanWeek.id == week_id,
@@ -25,53 +370,141 @@ def build_shopping_list_for_week(user_id: int, week_id: int) -> list[dict]:
     if not week:
         raise ValueError("Week not found")
 
-    # Collect group recipe placements
-    placements = (
-        MealGroupRecipe.query.join(Recipe, MealGroupRecipe.recipe_id == Recipe.id)
-        .filter(Recipe.user_id == user_id)
-        .all()
+    if week.shopping_list_stale:
+        rebuild_week_shopping_list(week)
+        db.session.commit()
+    elif _refresh_labels([week]):
+        db.session.commit()
+
+    rows = db.session.execute(
+        select(
+            ShoppingListItem.name,
+            ShoppingListItem.unit,
+            ShoppingListItem.base_quantity,
+        ).where(ShoppingListItem.week_id == week_id)
     )
 
-    # Filter placements to only this week via meal_groups relationship
-    # Avoid importing MealGroup at module import time; use relationship traversal.
-    placements = [
-        p for p in placements if p.meal_group and p.meal_group.week_id == week_id
+    # Build list output. Every item has a single canonical unit, so the base
+    # total converts cleanly into the display unit.
+    items = [
+        {
+            "name": name,
+            "unit": unit,
+            "quantity": round(from_base(base_quantity, unit), 3),
+        }
+        for name, unit, base_quantity in rows
     ]
 
-    totals = defaultdict(float)
-    meta = {}
+    # Stable sort: name then unit
+    items.sort(key=lambda x: (x["name"].lower(), (x["unit"] or "").lower()))
+    return items
 
-    for placement in placements:
-        recipe = placement.recipe
-        if not recipe:
-            continue
 
-        for ing in recipe.ingredients:
-            name = ing.name or ""
-            if not name.strip():
-                continue
+def build_shopping_list_for_weeks(
+    user_id: int,
+    week_ids: list[int] | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    by_week: bool = False,
+) -> dict:
+    """
+    Aggregate the shopping list across several weeks.
+
+    Weeks are selected either by id or by overlapping [date_from, date_to];
+    only meals on days inside the range count, so weeks the range cuts are
+    aggregated from their matching days instead of the materialized list.
+    Items are merged across weeks by the same (name, canonical unit) key as
+    the single-week list; with `by_week=True` each item also carries its
+    per-week quantities.
+    """
+    query = MealPlanWeek.query.filter(MealPlanWeek.user_id == user_id)
+    if week_ids is not None:
+        query = query.filter(MealPlanWeek.id.in_(week_ids))
+    else:
+        if not date_from or not date_to:
+            raise ValueError("from and to are required")
+        if date_from > date_to:
+            raise ValueError("from must be on or before to")
+        query = query.filter(
+            MealPlanWeek.week_start > date_from - timedelta(days=7),
+            MealPlanWeek.week_start <= date_to,
+        )
+
+    weeks = query.order_by(MealPlanWeek.week_start.asc()).all()
+    if week_ids is not None and len(weeks) != len(set(week_ids)):
+        raise ValueError("Week not found")
 
-            unit = ing.unit
-            qty = ing.quantity if ing.quantity is not None else 0.0
+    partial = []
+    if week_ids is None:
+        partial = [
+            w
+            for w in weeks
+            if w.week_start < date_from or w.week_start + timedelta(days=6) > date_to
+        ]
+    whole = [w for w in weeks if w not in partial]
 
-            k = _key(name, unit)
-            totals[k] += float(qty)
-            meta[k] = {
-                "name": ing.name.strip(),
-                "unit": ing.unit,
-            }
+    stale = [w for w in whole if w.shopping_list_stale]
+    for week in stale:
+        rebuild_week_shopping_list(week)
+    relabeled = _refresh_labels([w for w in whole if w not in stale])
+    if stale or relabeled:
+        db.session.commit()
 
-    # Build list output
-    items = []
-    for k, total_qty in totals.items():
-        items.append(
-            {
-                "name": meta[k]["name"],
-                "unit": meta[k]["unit"],
-                "quantity": round(total_qty, 3),
-            }
+    rows_by_week = defaultdict(list)
+    for row in db.session.execute(
+        select(
+            ShoppingListItem.week_id,
+            ShoppingListItem.name_key,
+            ShoppingListItem.canonical_unit,
+            ShoppingListItem.name,
+            ShoppingListItem.unit,
+            ShoppingListItem.base_quantity,
+        ).where(ShoppingListItem.week_id.in_([w.id for w in whole]))
+    ):
+        rows_by_week[row.week_id].append(tuple(row))
+    for week in partial:
+        rows_by_week[week.id] = [
+            (week.id, r.name_key, r.canonical_unit, r.name.strip(), r.unit, float(r.total))
+            for r in _aggregate_week(week.id, user_id, days=(date_from, date_to))
+        ]
+
+    week_starts = {w.id: w.week_start.isoformat() for w in weeks}
+    rows = [row for w in weeks for row in rows_by_week[w.id]]
+
+    # Later weeks win the display name/unit, like later rows within a week.
+    merged = {}
+    for week_id, name_key, canonical_unit, name, unit, base_quantity in rows:
+        entry = merged.setdefault(
+            (name_key, canonical_unit), {"base": 0.0, "weeks": []}
         )
+        entry["name"] = name
+        entry["unit"] = unit
+        entry["base"] += base_quantity
+        entry["weeks"].append((week_id, base_quantity))
+
+    items = []
+    for entry in merged.values():
+        unit = entry["unit"]
+        item = {
+            "name": entry["name"],
+            "unit": unit,
+            "quantity": round(from_base(entry["base"], unit), 3),
+        }
+        if by_week:
+            item["weeks"] = [
+                {
+                    "weekId": week_id,
+                    "weekStart": week_starts[week_id],
+                    "quantity": round(from_base(base_quantity, unit), 3),
+                }
+                for week_id, base_quantity in entry["weeks"]
+            ]
+        items.append(item)
 
     # Stable sort: name then unit
     items.sort(key=lambda x: (x["name"].lower(), (x["unit"] or "").lower()))
-    return items
+
+    return {
+        "weekIds": [w.id for w in weeks],
+        "items": items,
+    }
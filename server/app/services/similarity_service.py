@@ -0,0 +1,370 @@
+"""
+Near-duplicate recipe detection with MinHash + LSH.
+
+A recipe's features are its title words and its normalized ingredient names.
+The MinHash signature (NUM_PERM values) estimates Jaccard similarity between
+feature sets; it is split into LSH_BANDS bands whose hashes are stored as
+buckets. Two recipes become candidates only if they share a bucket, so a
+lookup reads a handful of index rows instead of every recipe the user owns.
+Candidates are then confirmed by comparing full signatures.
+
+With 16 bands of 4 rows, pairs at 0.8 similarity share a bucket with
+probability > 0.99, pairs at 0.3 only ~0.12.
+"""
+
+import hashlib
+import heapq
+import random
+import struct
+from collections import Counter, defaultdict
+from functools import lru_cache
+from operator import eq
+
+from sqlalchemy import delete, func, insert, select
+
+from app.extensions import db
+from app.models.recipe import Recipe
+from app.models.recipe_ingredient import RecipeIngredient
+from app.models.recipe_lsh_bucket import RecipeLshBucket
+from app.models.recipe_signature import RecipeSignature
+from app.services.ingredient_index_service import tokenize_ingredient
+
+
+NUM_PERM = 64
+LSH_BANDS = 16
+_ROWS_PER_BAND = NUM_PERM // LSH_BANDS
+
+DUPLICATE_THRESHOLD = 0.7
+
+# Libraries full of near-identical recipes share buckets with each other;
+# cap the candidates checked per lookup so that stays cheap. The ones kept
+# share the most buckets with the lookup, so an exact duplicate (sharing
+# every bucket) is never cut.
+MAX_CANDIDATES = 100
+
+_PRIME = (1 << 61) - 1
+
+# Fixed seed: signatures are persisted, so permutations must never change
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)
+]
+
+_SIGNATURE_FORMAT = f">{NUM_PERM}Q"
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+def recipe_features(title: str | None, ingredient_names: list[str]) -> set[str]:
+    """Title words plus one key per ingredient ("cherry tomato")."""
+    features = {f"t:{word}" for word in tokenize_ingredient(title)}
+    for name in ingredient_names:
+        tokens = tokenize_ingredient(name)
+        if tokens:
+            features.add("i:" + " ".join(sorted(tokens)))
+    return features
+
+
+def compute_signature(
+    title: str | None, ingredient_names: list[str]
+) -> tuple[int, ...] | None:
+    """MinHash signature for a recipe, or None if it has no features."""
+    features = recipe_features(title, ingredient_names)
+    if not features:
+        return None
+
+    hashes = [_hash64(f) for f in features]
+    return tuple(
+        min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS
+    )
+
+
+# A signature's buckets are needed by prefetch, find, add and store in turn
+@lru_cache(maxsize=4096)
+def lsh_buckets(signature: tuple[int, ...]) -> tuple[int, ...]:
+    """One signed 64-bit bucket key per band."""
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * _ROWS_PER_BAND : (band + 1) * _ROWS_PER_BAND]
+        raw = struct.pack(f">B{_ROWS_PER_BAND}Q", band, *rows)
+        buckets.append(
+            int.from_bytes(
+                hashlib.blake2b(raw, digest_size=8).digest(), "big", signed=True
+            )
+        )
+    return tuple(buckets)
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(map(eq, a, b)) / NUM_PERM
+
+
+def pack_signature(signature: tuple[int, ...]) -> bytes:
+    return struct.pack(_SIGNATURE_FORMAT, *signature)
+
+
+def unpack_signature(raw: bytes) -> tuple[int, ...]:
+    return struct.unpack(_SIGNATURE_FORMAT, raw)
+
+
+def _top_candidates(shared: Counter) -> list[int]:
+    """Up to MAX_CANDIDATES ids, sharing the most buckets first."""
+    return heapq.nsmallest(
+        MAX_CANDIDATES, shared, key=lambda recipe_id: (-shared[recipe_id], recipe_id)
+    )
+
+
+def _bucket_mates(user_id: int, buckets, exclude: int | None = None):
+    """
+    Subquery of the user's recipe ids sharing any of `buckets`, as
+    (recipe_id, shared bucket count), capped to the MAX_CANDIDATES sharing
+    the most.
+    """
+    shared = func.count().label("shared")
+    query = select(RecipeLshBucket.recipe_id, shared).where(
+        RecipeLshBucket.user_id == user_id,
+        RecipeLshBucket.bucket.in_(buckets),
+    )
+    if exclude is not None:
+        query = query.where(RecipeLshBucket.recipe_id != exclude)
+    return (
+        query.group_by(RecipeLshBucket.recipe_id)
+        .order_by(shared.desc(), RecipeLshBucket.recipe_id)
+        .limit(MAX_CANDIDATES)
+        .subquery()
+    )
+
+
+def store_signatures(rows: list[tuple[int, int, tuple[int, ...] | None]]) -> None:
+    """
+    Replace stored signatures for (recipe_id, user_id, signature) rows.
+    A None signature just clears the recipe. Does not commit.
+    """
+    if not rows:
+        return
+
+    remove_recipe_signatures([recipe_id for recipe_id, _, _ in rows])
+
+    signatures = []
+    buckets = []
+    for recipe_id, user_id, signature in rows:
+        if signature is None:
+            continue
+        signatures.append(
+            {"recipe_id": recipe_id, "signature": pack_signature(signature)}
+        )
+        buckets.extend(
+            {"recipe_id": recipe_id, "bucket": bucket, "user_id": user_id}
+            for bucket in set(lsh_buckets(signature))
+        )
+
+    if signatures:
+        db.session.execute(insert(RecipeSignature), signatures)
+        db.session.execute(insert(RecipeLshBucket), buckets)
+
+
+def index_recipe_signatures(recipe_ids: list[int]) -> None:
+    """Recompute signatures from the recipes' current rows. Does not commit."""
+    if not recipe_ids:
+        return
+
+    names = defaultdict(list)
+    for recipe_id, name in db.session.execute(
+        select(RecipeIngredient.recipe_id, RecipeIngredient.name).where(
+            RecipeIngredient.recipe_id.in_(recipe_ids)
+        )
+    ):
+        names[recipe_id].append(name)
+
+    recipes = db.session.execute(
+        select(Recipe.id, Recipe.user_id, Recipe.title).where(
+            Recipe.id.in_(recipe_ids)
+        )
+    ).all()
+
+    store_signatures(
+        [
+            (recipe_id, user_id, compute_signature(title, names[recipe_id]))
+            for recipe_id, user_id, title in recipes
+        ]
+    )
+
+
+def remove_recipe_signatures(recipe_ids: list[int]) -> None:
+    """Drop signatures and buckets for the given recipes. Does not commit."""
+    if not recipe_ids:
+        return
+
+    for model in (RecipeLshBucket, RecipeSignature):
+        db.session.execute(
+            delete(model)
+            .where(model.recipe_id.in_(recipe_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+
+def rebuild_similarity_index(batch_size: int = 1000) -> None:
+    """Recompute every recipe's signature. Does not commit."""
+    for model in (RecipeLshBucket, RecipeSignature):
+        db.session.execute(delete(model).execution_options(synchronize_session=False))
+
+    ids = db.session.scalars(select(Recipe.id).order_by(Recipe.id)).all()
+    for start in range(0, len(ids), batch_size):
+        index_recipe_signatures(ids[start : start + batch_size])
+
+
+class DuplicateDetector:
+    """
+    Near-duplicate lookups for one user during a write batch.
+
+    `find` checks both stored recipes and ones `add`-ed earlier in the batch
+    (not yet indexed), so a file that repeats a recipe is caught too.
+    `prefetch` loads stored candidates for many signatures in one query so
+    the following `find` calls need none.
+    """
+
+    def __init__(self, user_id: int, threshold: float = DUPLICATE_THRESHOLD):
+        self.user_id = user_id
+        self.threshold = threshold
+        self._pending_buckets = defaultdict(set)
+        self._pending = {}
+        self._prefetched: set[int] = set()
+        self._stored_buckets = defaultdict(list)
+        self._stored = {}
+
+    def prefetch(self, signatures: list[tuple[int, ...] | None]) -> None:
+        buckets = {
+            bucket
+            for signature in signatures
+            if signature is not None
+            for bucket in lsh_buckets(signature)
+        }
+        if not buckets:
+            return
+
+        rows = db.session.execute(
+            select(
+                RecipeLshBucket.bucket,
+                RecipeLshBucket.recipe_id,
+                RecipeSignature.signature,
+            )
+            .join(
+                RecipeSignature,
+                RecipeSignature.recipe_id == RecipeLshBucket.recipe_id,
+            )
+            .where(
+                RecipeLshBucket.user_id == self.user_id,
+                RecipeLshBucket.bucket.in_(buckets),
+            )
+        ).all()
+        for bucket, recipe_id, raw in rows:
+            self._stored_buckets[bucket].append(recipe_id)
+            if recipe_id not in self._stored:
+                self._stored[recipe_id] = unpack_signature(raw)
+        self._prefetched |= buckets
+
+    def _stored_candidates(self, buckets: tuple[int, ...]) -> dict:
+        """Stored candidates as recipe_id -> (shared buckets, signature)."""
+        if self._prefetched.issuperset(buckets):
+            shared = Counter()
+            for bucket in buckets:
+                shared.update(self._stored_buckets.get(bucket, ()))
+            return {
+                recipe_id: (shared[recipe_id], self._stored[recipe_id])
+                for recipe_id in _top_candidates(shared)
+            }
+
+        mates = _bucket_mates(self.user_id, buckets)
+        stored = db.session.execute(
+            select(mates.c.recipe_id, mates.c.shared, RecipeSignature.signature)
+            .join(RecipeSignature, RecipeSignature.recipe_id == mates.c.recipe_id)
+        ).all()
+        return {
+            recipe_id: (shared, unpack_signature(raw))
+            for recipe_id, shared, raw in stored
+        }
+
+    def find(self, signature: tuple[int, ...] | None) -> tuple[int, float] | None:
+        """
+        Best (recipe_id, similarity) at or above the threshold, or None.
+        Of the batch's and stored recipes sharing a bucket, the
+        MAX_CANDIDATES sharing the most are compared.
+        """
+        if signature is None:
+            return None
+
+        buckets = lsh_buckets(signature)
+        shared = Counter()
+        for bucket in buckets:
+            shared.update(self._pending_buckets.get(bucket, ()))
+        signatures = {recipe_id: self._pending[recipe_id] for recipe_id in shared}
+
+        for recipe_id, (count, other) in self._stored_candidates(buckets).items():
+            shared[recipe_id] = max(shared[recipe_id], count)
+            signatures.setdefault(recipe_id, other)
+
+        best = None
+        for recipe_id in _top_candidates(shared):
+            score = similarity(signature, signatures[recipe_id])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (recipe_id, score)
+                if score == 1.0:
+                    break
+        return best
+
+    def add(self, recipe_id: int, signature: tuple[int, ...] | None) -> None:
+        if signature is None:
+            return
+        self._pending[recipe_id] = signature
+        for bucket in lsh_buckets(signature):
+            self._pending_buckets[bucket].add(recipe_id)
+
+    def clear_pending(self) -> None:
+        """
+        Forget added recipes once their signatures have been stored, along
+        with prefetched candidates (which would not include them).
+        """
+        self._pending.clear()
+        self._pending_buckets.clear()
+        self._prefetched.clear()
+        self._stored_buckets.clear()
+        self._stored.clear()
+
+
+def find_similar_recipes(
+    user_id: int, recipe_id: int, threshold: float = DUPLICATE_THRESHOLD
+) -> list[dict]:
+    """
+    The user's recipes that look like near-duplicates of `recipe_id`,
+    most similar first.
+    """
+    raw = db.session.scalar(
+        select(RecipeSignature.signature).where(
+            RecipeSignature.recipe_id == recipe_id
+        )
+    )
+    if raw is None:
+        return []
+    signature = unpack_signature(raw)
+
+    mates = _bucket_mates(user_id, lsh_buckets(signature), exclude=recipe_id)
+    rows = db.session.execute(
+        select(Recipe.id, Recipe.title, RecipeSignature.signature)
+        .join(mates, mates.c.recipe_id == Recipe.id)
+        .join(RecipeSignature, RecipeSignature.recipe_id == Recipe.id)
+    ).all()
+
+    matches = []
+    for other_id, title, other_raw in rows:
+        score = similarity(signature, unpack_signature(other_raw))
+        if score >= threshold:
+            matches.append(
+                {"recipeId": other_id, "title": title, "similarity": round(score, 3)}
+            )
+    matches.sort(key=lambda m: (-m["similarity"], m["recipeId"]))
+    return matches
@@ -0,0 +1,99 @@
+"""
+Unit conversion registry.
+
+Every known unit belongs to a dimension (mass, volume, count) and converts to
+that dimension's base unit by a fixed factor. Ingredients store the canonical
+unit and base-unit quantity at write time so aggregation can sum without
+parsing unit strings per request.
+
+Unknown units are kept as their own canonical unit (lowercased, with a simple
+plural fold so "slice" and "slices" still merge).
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class UnitDef:
+    dimension: str
+    canonical: str | None
+    factor: float
+
+
+_MASS = {
+    ("g", "gram", "grams", "gr"): 1.0,
+    ("kg", "kilogram", "kilograms", "kgs"): 1000.0,
+    ("mg", "milligram", "milligrams"): 0.001,
+    ("oz", "ounce", "ounces"): 28.349523125,
+    ("lb", "lbs", "pound", "pounds"): 453.59237,
+}
+
+_VOLUME = {
+    ("ml", "milliliter", "milliliters", "millilitre", "millilitres"): 1.0,
+    ("l", "liter", "liters", "litre", "litres"): 1000.0,
+    ("tsp", "teaspoon", "teaspoons", "tsps"): 4.92892159375,
+    ("tbsp", "tablespoon", "tablespoons", "tbsps", "tbs"): 14.78676478125,
+    ("fl oz", "floz", "fluid ounce", "fluid ounces"): 29.5735295625,
+    ("cup", "cups", "c"): 236.5882365,
+    ("pint", "pints", "pt"): 473.176473,
+    ("quart", "quarts", "qt"): 946.352946,
+    ("gallon", "gallons", "gal"): 3785.411784,
+}
+
+# Plain counts ("2 eggs") have no unit; these spellings mean the same thing.
+_COUNT = {
+    ("", "each", "ea", "whole", "piece", "pieces", "pc", "pcs"): 1.0,
+}
+
+
+def _build_registry() -> dict[str, UnitDef]:
+    registry = {}
+    for dimension, canonical, table in (
+        ("mass", "g", _MASS),
+        ("volume", "ml", _VOLUME),
+        ("count", None, _COUNT),
+    ):
+        for aliases, factor in table.items():
+            for alias in aliases:
+                registry[alias] = UnitDef(dimension, canonical, factor)
+    return registry
+
+
+UNIT_REGISTRY = _build_registry()
+
+
+def _clean(unit: str | None) -> str:
+    return " ".join((unit or "").strip().lower().rstrip(".").split())
+
+
+def lookup_unit(unit: str | None) -> UnitDef:
+    """Return the registry entry for a unit, or an identity entry if unknown."""
+    key = _clean(unit)
+    found = UNIT_REGISTRY.get(key)
+    if found:
+        return found
+
+    # Fold simple plurals of unknown units ("cloves" -> "clove").
+    if len(key) > 3 and key.endswith("s") and not key.endswith("ss"):
+        key = key[:-1]
+    return UnitDef("other", key, 1.0)
+
+
+def canonicalize(
+    quantity: float | None, unit: str | None
+) -> tuple[str | None, float | None]:
+    """
+    Convert a quantity/unit pair to (canonical unit, base-unit quantity).
+
+    A missing quantity stays None; the canonical unit is still resolved so
+    "to taste" rows aggregate under the right key.
+    """
+    u = lookup_unit(unit)
+    if quantity is None:
+        return u.canonical, None
+    return u.canonical, float(quantity) * u.factor
+
+
+def from_base(base_quantity: float, unit: str | None) -> float:
+    """Convert a base-unit quantity back into `unit`."""
+    return base_quantity / lookup_unit(unit).factor
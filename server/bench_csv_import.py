@@ -0,0 +1,188 @@
+"""
+Parse-only benchmark for the recipe CSV importer.
+
+Compares the old per-field header scan (csv.DictReader + linear lookup per
+field) with the compiled column accessor used by parse_recipe_csv. Then
+compares parse_recipe_csv plus near-duplicate signatures (the importer's
+per-recipe CPU work) with parse_recipe_csv_parallel, whose workers do
+both. No database is touched.
+
+Usage (from server/):
+    python bench_csv_import.py            # 1,000,000 rows
+    python bench_csv_import.py --rows 200000
+    python bench_csv_import.py --workers 8
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+from app.services.csv_import_service import parse_recipe_csv, parse_recipe_csv_parallel
+
+
+HEADER = [
+    "title",
+    "description",
+    "servings",
+    "prep_min",
+    "cook_min",
+    "instructions",
+    "ingredient_name",
+    "quantity",
+    "unit",
+    "notes",
+]
+
+INGREDIENTS_PER_RECIPE = 5
+
+
+def write_sample(path: str, rows: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for i in range(rows):
+            recipe = i // INGREDIENTS_PER_RECIPE
+            writer.writerow(
+                [
+                    f"Recipe {recipe}",
+                    "A weeknight dinner",
+                    "4",
+                    "10",
+                    "25",
+                    "Chop, simmer and serve.",
+                    f"ingredient {i % 97}",
+                    "1.5",
+                    "cup",
+                    "",
+                ]
+            )
+
+
+def parse_header_scan(f) -> int:
+    """The importer's previous parsing loop, minus database writes."""
+    reader = csv.DictReader(f)
+    field_map = {h: (h or "").strip().lower() for h in reader.fieldnames}
+
+    def get(row: dict, key: str):
+        for original, lower in field_map.items():
+            if lower == key:
+                return row.get(original)
+        return None
+
+    def get_any(row: dict, *keys: str):
+        for k in keys:
+            v = get(row, k)
+            if v is not None:
+                return v
+        return None
+
+    def to_int_or_none(raw: str):
+        if not raw:
+            return None
+        try:
+            return int(float(raw))
+        except ValueError:
+            return None
+
+    grouped = defaultdict(list)
+    for row in reader:
+        title = (get(row, "title") or "").strip()
+        if not title:
+            continue
+        grouped[title].append(row)
+
+    ingredients = 0
+    for title, rows in grouped.items():
+        first = rows[0]
+        (get(first, "description") or "").strip()
+        servings_raw = (get(first, "servings") or "").strip()
+        int(servings_raw) if servings_raw else 1
+        to_int_or_none((get_any(first, "prep_min", "prepmin") or "").strip())
+        to_int_or_none((get_any(first, "cook_min", "cookmin") or "").strip())
+        (get(first, "instructions") or "").strip()
+        (get(first, "notes") or "").strip()
+
+        for row in rows:
+            name = (get(row, "ingredient_name") or get(row, "ingredient") or "").strip()
+            if not name:
+                continue
+            qty_raw = (get(row, "quantity") or "").strip()
+            (get(row, "unit") or "").strip()
+            (get(row, "notes") or "").strip()
+            if qty_raw:
+                float(qty_raw)
+            ingredients += 1
+    return ingredients
+
+
+def parse_compiled(f) -> int:
+    return sum(len(parsed.ingredients) for parsed in parse_recipe_csv(f))
+
+
+def parse_with_signatures(f) -> int:
+    ingredients = 0
+    for parsed in parse_recipe_csv(f):
+        parsed.duplicate_signature()
+        ingredients += len(parsed.ingredients)
+    return ingredients
+
+
+def parse_parallel(workers: int):
+    def parse(f) -> int:
+        ingredients = 0
+        for parsed in parse_recipe_csv_parallel(f, workers):
+            parsed.duplicate_signature()
+            ingredients += len(parsed.ingredients)
+        return ingredients
+
+    return parse
+
+
+def run(path: str, label: str, parse, rows: int) -> float:
+    with open(path, newline="", encoding="utf-8") as f:
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        ingredients = parse(f)
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+
+    assert ingredients == rows, (label, ingredients, rows)
+    # With worker processes, this process's CPU time bounds the speedup
+    print(
+        f"{label:<14} {elapsed:7.2f}s  {rows / elapsed:>12,.0f} rows/s"
+        f"  (this process {cpu:.2f}s CPU)"
+    )
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        write_sample(path, args.rows)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"{args.rows:,} rows, {size_mb:.1f} MB, {len(HEADER)} columns")
+
+        before = run(path, "header scan", parse_header_scan, args.rows)
+        after = run(path, "compiled", parse_compiled, args.rows)
+        print(f"speedup        {before / after:7.2f}x")
+
+        serial = run(path, "+ signatures", parse_with_signatures, args.rows)
+        parallel = run(
+            path, f"parallel x{args.workers}", parse_parallel(args.workers), args.rows
+        )
+        print(f"speedup        {serial / parallel:7.2f}x")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
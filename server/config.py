@@ -13,6 +13,9 @@ class Config:
 
     JSON_SORT_KEYS = False
 
+    # Parse processes for large background CSV imports (1 = parse serially)
+    IMPORT_PARSE_WORKERS = int(os.getenv("IMPORT_PARSE_WORKERS", os.cpu_count() or 1))
+
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -0,0 +1,93 @@
+"""ingredient canonical units
+
+Revision ID: 4d2a91c7e0b1
+Revises: 886c7a8b35ee
+Create Date: 2026-10-18 09:12:40.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d2a91c7e0b1'
+down_revision = '886c7a8b35ee'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of the units registry and units.canonicalize as of this
+# revision, so the backfill does not change when the registry does.
+_UNITS = {}
+for _canonical, _table in (
+    ('g', {
+        ('g', 'gram', 'grams', 'gr'): 1.0,
+        ('kg', 'kilogram', 'kilograms', 'kgs'): 1000.0,
+        ('mg', 'milligram', 'milligrams'): 0.001,
+        ('oz', 'ounce', 'ounces'): 28.349523125,
+        ('lb', 'lbs', 'pound', 'pounds'): 453.59237,
+    }),
+    ('ml', {
+        ('ml', 'milliliter', 'milliliters', 'millilitre', 'millilitres'): 1.0,
+        ('l', 'liter', 'liters', 'litre', 'litres'): 1000.0,
+        ('tsp', 'teaspoon', 'teaspoons', 'tsps'): 4.92892159375,
+        ('tbsp', 'tablespoon', 'tablespoons', 'tbsps', 'tbs'): 14.78676478125,
+        ('fl oz', 'floz', 'fluid ounce', 'fluid ounces'): 29.5735295625,
+        ('cup', 'cups', 'c'): 236.5882365,
+        ('pint', 'pints', 'pt'): 473.176473,
+        ('quart', 'quarts', 'qt'): 946.352946,
+        ('gallon', 'gallons', 'gal'): 3785.411784,
+    }),
+    (None, {
+        ('', 'each', 'ea', 'whole', 'piece', 'pieces', 'pc', 'pcs'): 1.0,
+    }),
+):
+    for _aliases, _factor in _table.items():
+        for _alias in _aliases:
+            _UNITS[_alias] = (_canonical, _factor)
+
+
+def _canonicalize(quantity, unit):
+    key = ' '.join((unit or '').strip().lower().rstrip('.').split())
+    if key in _UNITS:
+        canonical, factor = _UNITS[key]
+    else:
+        if len(key) > 3 and key.endswith('s') and not key.endswith('ss'):
+            key = key[:-1]
+        canonical, factor = key, 1.0
+    if quantity is None:
+        return canonical, None
+    return canonical, float(quantity) * factor
+
+
+def upgrade():
+    with op.batch_alter_table('recipe_ingredients', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('canonical_unit', sa.String(length=40), nullable=True))
+        batch_op.add_column(sa.Column('base_quantity', sa.Float(), nullable=True))
+
+    # Backfill existing rows
+    conn = op.get_bind()
+    ingredients = sa.table(
+        'recipe_ingredients',
+        sa.column('id', sa.Integer),
+        sa.column('quantity', sa.Float),
+        sa.column('unit', sa.String),
+        sa.column('canonical_unit', sa.String),
+        sa.column('base_quantity', sa.Float),
+    )
+    rows = conn.execute(
+        sa.select(ingredients.c.id, ingredients.c.quantity, ingredients.c.unit)
+    ).all()
+    for row_id, quantity, unit in rows:
+        canonical_unit, base_quantity = _canonicalize(quantity, unit)
+        conn.execute(
+            ingredients.update()
+            .where(ingredients.c.id == row_id)
+            .values(canonical_unit=canonical_unit, base_quantity=base_quantity)
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('recipe_ingredients', schema=None) as batch_op:
+        batch_op.drop_column('base_quantity')
+        batch_op.drop_column('canonical_unit')
@@ -0,0 +1,43 @@
+"""materialized shopping list items
+
+Revision ID: 7b3e5f20a9c4
+Revises: 4d2a91c7e0b1
+Create Date: 2026-10-18 10:03:27.550914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3e5f20a9c4'
+down_revision = '4d2a91c7e0b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('shopping_list_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('week_id', sa.Integer(), nullable=False),
+    sa.Column('name_key', sa.String(length=200), nullable=False),
+    sa.Column('canonical_unit', sa.String(length=40), nullable=True),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('unit', sa.String(length=40), nullable=True),
+    sa.Column('base_quantity', sa.Float(), nullable=False),
+    sa.Column('contributions', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['week_id'], ['meal_plan_weeks.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('week_id', 'name_key', 'canonical_unit', name='uq_shopping_item_key')
+    )
+
+    # Existing weeks start stale and are rebuilt on their first read.
+    with op.batch_alter_table('meal_plan_weeks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('shopping_list_stale', sa.Boolean(), server_default=sa.true(), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('meal_plan_weeks', schema=None) as batch_op:
+        batch_op.drop_column('shopping_list_stale')
+
+    op.drop_table('shopping_list_items')
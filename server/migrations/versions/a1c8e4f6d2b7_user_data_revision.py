@@ -0,0 +1,26 @@
+"""user data revision
+
+Revision ID: a1c8e4f6d2b7
+Revises: 7b3e5f20a9c4
+Create Date: 2026-10-18 11:26:04.310552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c8e4f6d2b7'
+down_revision = '7b3e5f20a9c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('revision', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('revision')
@@ -0,0 +1,80 @@
+"""ingredient postings
+
+Revision ID: a3d7f9b1c5e8
+Revises: f7b9d1e3a5c2
+Create Date: 2026-10-18 15:11:52.604117
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d7f9b1c5e8'
+down_revision = 'f7b9d1e3a5c2'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of ingredient_index_service.tokenize_ingredient as of this
+# revision, so the backfill does not change when the app's rule does. If the
+# rule changes later, `flask rebuild-ingredient-index` re-derives every
+# posting.
+_WORD_RE = re.compile(r'[^\W\d_]+', re.UNICODE)
+
+_STOPWORDS = {
+    'a', 'an', 'and', 'of', 'or', 'to', 'the', 'for', 'with',
+    'fresh', 'frozen', 'dried', 'chopped', 'diced', 'minced', 'sliced',
+    'shredded', 'grated', 'ground', 'large', 'small', 'medium', 'whole',
+    'optional', 'cooked', 'raw', 'boneless', 'skinless', 'ripe',
+}
+
+
+def _singular(word):
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith('oes'):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def _tokenize(name):
+    tokens = set()
+    for word in _WORD_RE.findall((name or '').lower()):
+        if word in _STOPWORDS or len(word) < 2:
+            continue
+        tokens.add(_singular(word)[:80])
+    return tokens
+
+
+def upgrade():
+    postings = op.create_table('ingredient_postings',
+    sa.Column('token', sa.String(length=80), nullable=False),
+    sa.Column('ingredient_id', sa.Integer(), nullable=False),
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ingredient_id'], ['recipe_ingredients.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('token', 'ingredient_id')
+    )
+    with op.batch_alter_table('ingredient_postings', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ingredient_postings_recipe_id'), ['recipe_id'], unique=False)
+
+    rows = op.get_bind().execute(
+        sa.text('SELECT id, recipe_id, name FROM recipe_ingredients')
+    ).fetchall()
+    op.bulk_insert(postings, [
+        {'token': token, 'ingredient_id': ingredient_id, 'recipe_id': recipe_id}
+        for ingredient_id, recipe_id, name in rows
+        for token in _tokenize(name)
+    ])
+
+
+def downgrade():
+    with op.batch_alter_table('ingredient_postings', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ingredient_postings_recipe_id'))
+
+    op.drop_table('ingredient_postings')
@@ -0,0 +1,29 @@
+"""shopping item label stale
+
+Revision ID: a4c6e8f0b2d3
+Revises: f1b3d5a7c9e2
+Create Date: 2026-10-19 10:02:11.842915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c6e8f0b2d3'
+down_revision = 'f1b3d5a7c9e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('shopping_list_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('label_stale', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+    # Labels kept by earlier delta updates may not follow the rebuild's rule
+    op.execute('UPDATE shopping_list_items SET label_stale = 1')
+
+
+def downgrade():
+    with op.batch_alter_table('shopping_list_items', schema=None) as batch_op:
+        batch_op.drop_column('label_stale')
@@ -0,0 +1,48 @@
+"""ingredient posting visibility
+
+Revision ID: b5d7f9a1c3e4
+Revises: a4c6e8f0b2d3
+Create Date: 2026-10-19 14:26:37.510284
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d7f9a1c3e4'
+down_revision = 'a4c6e8f0b2d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ingredient_postings', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('is_public', sa.Boolean(), nullable=True))
+
+    # Copy owner and visibility from each posting's recipe
+    op.execute(
+        "UPDATE ingredient_postings SET "
+        "user_id = (SELECT recipes.user_id FROM recipes "
+        "WHERE recipes.id = ingredient_postings.recipe_id), "
+        "is_public = (SELECT recipes.is_public FROM recipes "
+        "WHERE recipes.id = ingredient_postings.recipe_id)"
+    )
+    op.execute("DELETE FROM ingredient_postings WHERE user_id IS NULL")
+
+    with op.batch_alter_table('ingredient_postings', schema=None) as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('is_public', existing_type=sa.Boolean(), nullable=False)
+        batch_op.create_foreign_key(batch_op.f('fk_ingredient_postings_user_id_users'), 'users', ['user_id'], ['id'], ondelete='CASCADE')
+        batch_op.create_index('ix_ingredient_postings_token_user', ['token', 'user_id'], unique=False)
+        batch_op.create_index('ix_ingredient_postings_token_public', ['token', 'is_public'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ingredient_postings', schema=None) as batch_op:
+        batch_op.drop_index('ix_ingredient_postings_token_public')
+        batch_op.drop_index('ix_ingredient_postings_token_user')
+        batch_op.drop_constraint(batch_op.f('fk_ingredient_postings_user_id_users'), type_='foreignkey')
+        batch_op.drop_column('is_public')
+        batch_op.drop_column('user_id')
@@ -0,0 +1,32 @@
+"""public feed index
+
+Revision ID: b8e2f4a6c1d9
+Revises: a3d7f9b1c5e8
+Create Date: 2026-10-18 16:05:41.930264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e2f4a6c1d9'
+down_revision = 'a3d7f9b1c5e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # recipes.is_public exists on the model but was never migrated; databases
+    # built with create_all already have it.
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('recipes')}
+
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        if 'is_public' not in columns:
+            batch_op.add_column(sa.Column('is_public', sa.Boolean(), nullable=False, server_default=sa.false()))
+        batch_op.create_index('ix_recipes_public_updated', ['is_public', 'updated_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_index('ix_recipes_public_updated')
@@ -0,0 +1,151 @@
+"""recipe similarity index
+
+Revision ID: c4f6a8e0b2d7
+Revises: b8e2f4a6c1d9
+Create Date: 2026-10-18 16:48:09.117352
+
+"""
+import hashlib
+import random
+import re
+import struct
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f6a8e0b2d7'
+down_revision = 'b8e2f4a6c1d9'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of similarity_service's signature rule (and the ingredient
+# tokenizer it uses) as of this revision, so the backfill does not change
+# when the app's rule does. If the rule changes later,
+# `flask rebuild-similarity-index` re-derives every signature.
+_NUM_PERM = 64
+_LSH_BANDS = 16
+_ROWS_PER_BAND = _NUM_PERM // _LSH_BANDS
+_PRIME = (1 << 61) - 1
+
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(_NUM_PERM)
+]
+
+_WORD_RE = re.compile(r'[^\W\d_]+', re.UNICODE)
+
+_STOPWORDS = {
+    'a', 'an', 'and', 'of', 'or', 'to', 'the', 'for', 'with',
+    'fresh', 'frozen', 'dried', 'chopped', 'diced', 'minced', 'sliced',
+    'shredded', 'grated', 'ground', 'large', 'small', 'medium', 'whole',
+    'optional', 'cooked', 'raw', 'boneless', 'skinless', 'ripe',
+}
+
+
+def _singular(word):
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith('oes'):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def _tokenize(name):
+    tokens = set()
+    for word in _WORD_RE.findall((name or '').lower()):
+        if word in _STOPWORDS or len(word) < 2:
+            continue
+        tokens.add(_singular(word)[:80])
+    return tokens
+
+
+def _hash64(text):
+    return int.from_bytes(
+        hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big'
+    )
+
+
+def _signature(title, ingredient_names):
+    features = {f't:{word}' for word in _tokenize(title)}
+    for name in ingredient_names:
+        tokens = _tokenize(name)
+        if tokens:
+            features.add('i:' + ' '.join(sorted(tokens)))
+    if not features:
+        return None
+
+    hashes = [_hash64(f) for f in features]
+    return tuple(
+        min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS
+    )
+
+
+def _buckets(signature):
+    buckets = set()
+    for band in range(_LSH_BANDS):
+        rows = signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND]
+        raw = struct.pack(f'>B{_ROWS_PER_BAND}Q', band, *rows)
+        buckets.add(int.from_bytes(
+            hashlib.blake2b(raw, digest_size=8).digest(), 'big', signed=True
+        ))
+    return buckets
+
+
+def upgrade():
+    signatures = op.create_table('recipe_signatures',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('signature', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('recipe_id')
+    )
+    buckets = op.create_table('recipe_lsh_buckets',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('recipe_id', 'bucket')
+    )
+    with op.batch_alter_table('recipe_lsh_buckets', schema=None) as batch_op:
+        batch_op.create_index('ix_recipe_lsh_buckets_user_bucket', ['user_id', 'bucket'], unique=False)
+
+    bind = op.get_bind()
+    names = defaultdict(list)
+    for recipe_id, name in bind.execute(
+        sa.text('SELECT recipe_id, name FROM recipe_ingredients')
+    ):
+        names[recipe_id].append(name)
+
+    signature_rows = []
+    bucket_rows = []
+    for recipe_id, user_id, title in bind.execute(
+        sa.text('SELECT id, user_id, title FROM recipes')
+    ):
+        signature = _signature(title, names[recipe_id])
+        if signature is None:
+            continue
+        signature_rows.append({
+            'recipe_id': recipe_id,
+            'signature': struct.pack(f'>{_NUM_PERM}Q', *signature),
+        })
+        bucket_rows.extend(
+            {'recipe_id': recipe_id, 'bucket': bucket, 'user_id': user_id}
+            for bucket in _buckets(signature)
+        )
+
+    op.bulk_insert(signatures, signature_rows)
+    op.bulk_insert(buckets, bucket_rows)
+
+
+def downgrade():
+    with op.batch_alter_table('recipe_lsh_buckets', schema=None) as batch_op:
+        batch_op.drop_index('ix_recipe_lsh_buckets_user_bucket')
+
+    op.drop_table('recipe_lsh_buckets')
+    op.drop_table('recipe_signatures')
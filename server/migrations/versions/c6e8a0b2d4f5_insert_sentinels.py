@@ -0,0 +1,32 @@
+"""insert sentinels
+
+Revision ID: c6e8a0b2d4f5
+Revises: b5d7f9a1c3e4
+Create Date: 2026-10-19 16:05:48.271936
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e8a0b2d4f5'
+down_revision = 'b5d7f9a1c3e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('_sentinel', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('meal_groups', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('_sentinel', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('meal_groups', schema=None) as batch_op:
+        batch_op.drop_column('_sentinel')
+
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_column('_sentinel')
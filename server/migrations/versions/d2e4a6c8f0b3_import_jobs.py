@@ -0,0 +1,52 @@
+"""import jobs
+
+Revision ID: d2e4a6c8f0b3
+Revises: c4f6a8e0b2d7
+Create Date: 2026-10-18 17:41:16.078769
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2e4a6c8f0b3'
+down_revision = 'c4f6a8e0b2d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('import_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('on_duplicate', sa.String(length=16), nullable=False),
+    sa.Column('source_path', sa.String(length=500), nullable=True),
+    sa.Column('groups_done', sa.Integer(), nullable=False),
+    sa.Column('rows_parsed', sa.Integer(), nullable=False),
+    sa.Column('recipes_created', sa.Integer(), nullable=False),
+    sa.Column('recipes_skipped', sa.Integer(), nullable=False),
+    sa.Column('duplicates_found', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('recipe_id_floor', sa.Integer(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('worker_id', sa.String(length=64), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_import_jobs_status_heartbeat', ['status', 'heartbeat_at'], unique=False)
+        batch_op.create_index('ix_import_jobs_user_status', ['user_id', 'status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_import_jobs_user_status')
+        batch_op.drop_index('ix_import_jobs_status_heartbeat')
+
+    op.drop_table('import_jobs')
@@ -0,0 +1,72 @@
+"""denormalize meal group owner
+
+Revision ID: d5f0b3a7c912
+Revises: a1c8e4f6d2b7
+Create Date: 2026-10-18 12:40:51.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f0b3a7c912'
+down_revision = 'a1c8e4f6d2b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('meal_groups', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('meal_group_recipes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+
+    # Backfill owners from the week chain
+    op.execute(
+        "UPDATE meal_groups SET user_id = ("
+        "SELECT meal_plan_weeks.user_id FROM meal_plan_weeks "
+        "WHERE meal_plan_weeks.id = meal_groups.week_id)"
+    )
+
+    # Groups whose week is gone (SQLite without foreign keys enforced never
+    # cascaded the delete) have no owner and are unreachable; drop them and
+    # their placements so the column can be made NOT NULL.
+    op.execute(
+        "DELETE FROM meal_group_recipes WHERE meal_group_id IN ("
+        "SELECT id FROM meal_groups WHERE user_id IS NULL)"
+    )
+    op.execute("DELETE FROM meal_groups WHERE user_id IS NULL")
+
+    op.execute(
+        "UPDATE meal_group_recipes SET user_id = ("
+        "SELECT meal_groups.user_id FROM meal_groups "
+        "WHERE meal_groups.id = meal_group_recipes.meal_group_id)"
+    )
+
+    # Placements whose group is gone can never be reached; drop them so the
+    # column can be made NOT NULL.
+    op.execute("DELETE FROM meal_group_recipes WHERE user_id IS NULL")
+
+    with op.batch_alter_table('meal_groups', schema=None) as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_meal_groups_user_id'), ['user_id'], unique=False)
+        batch_op.create_foreign_key(batch_op.f('fk_meal_groups_user_id_users'), 'users', ['user_id'], ['id'], ondelete='CASCADE')
+
+    with op.batch_alter_table('meal_group_recipes', schema=None) as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_meal_group_recipes_user_id'), ['user_id'], unique=False)
+        batch_op.create_foreign_key(batch_op.f('fk_meal_group_recipes_user_id_users'), 'users', ['user_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    with op.batch_alter_table('meal_group_recipes', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_meal_group_recipes_user_id_users'), type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_meal_group_recipes_user_id'))
+        batch_op.drop_column('user_id')
+
+    with op.batch_alter_table('meal_groups', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_meal_groups_user_id_users'), type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_meal_groups_user_id'))
+        batch_op.drop_column('user_id')
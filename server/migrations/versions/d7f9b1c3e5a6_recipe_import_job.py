@@ -0,0 +1,54 @@
+"""recipe import job
+
+Revision ID: d7f9b1c3e5a6
+Revises: c6e8a0b2d4f5
+Create Date: 2026-10-19 17:48:20.663105
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7f9b1c3e5a6'
+down_revision = 'c6e8a0b2d4f5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('import_job_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_recipes_import_job_id'), ['import_job_id'], unique=False)
+        batch_op.create_foreign_key(batch_op.f('fk_recipes_import_job_id_import_jobs'), 'import_jobs', ['import_job_id'], ['id'], ondelete='SET NULL')
+
+    # Jobs still in flight resume from their recipes; attribute those past
+    # each job's old id floor to it (the latest job wins if several overlap)
+    op.execute(
+        "UPDATE recipes SET import_job_id = ("
+        "SELECT MAX(import_jobs.id) FROM import_jobs "
+        "WHERE import_jobs.user_id = recipes.user_id "
+        "AND import_jobs.status = 'running' "
+        "AND recipes.id > import_jobs.recipe_id_floor)"
+    )
+
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('recipe_id_floor')
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('recipe_id_floor', sa.Integer(), nullable=True))
+
+    op.execute(
+        "UPDATE import_jobs SET recipe_id_floor = COALESCE(("
+        "SELECT MIN(recipes.id) - 1 FROM recipes "
+        "WHERE recipes.import_job_id = import_jobs.id), ("
+        "SELECT COALESCE(MAX(recipes.id), 0) FROM recipes)) "
+        "WHERE status = 'running'"
+    )
+
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_recipes_import_job_id_import_jobs'), type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_recipes_import_job_id'))
+        batch_op.drop_column('import_job_id')
@@ -0,0 +1,26 @@
+"""recipe keyset index
+
+Revision ID: e2a6c8d4f1b3
+Revises: d5f0b3a7c912
+Create Date: 2026-10-18 13:18:22.671045
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a6c8d4f1b3'
+down_revision = 'd5f0b3a7c912'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.create_index('ix_recipes_user_created', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_index('ix_recipes_user_created')
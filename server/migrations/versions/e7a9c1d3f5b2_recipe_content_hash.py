@@ -0,0 +1,99 @@
+"""recipe content hash and external id
+
+Revision ID: e7a9c1d3f5b2
+Revises: d2e4a6c8f0b3
+Create Date: 2026-10-18 19:02:37.514820
+
+"""
+import hashlib
+import json
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a9c1d3f5b2'
+down_revision = 'd2e4a6c8f0b3'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of recipes_service.recipe_content_hash as of this revision, so
+# the backfill does not change when the app's rule does. If the rule changes
+# later, `flask rebuild-content-hashes` re-derives every hash.
+def _text(value):
+    return (value or '').strip() or None
+
+
+def _content_hash(recipe, ingredients):
+    content = [
+        _text(recipe['title']),
+        _text(recipe['description']),
+        recipe['servings'],
+        recipe['prep_min'],
+        recipe['cook_min'],
+        _text(recipe['instructions']),
+        _text(recipe['notes']),
+        [
+            [
+                _text(name),
+                None if quantity is None else float(quantity),
+                _text(unit),
+                _text(notes),
+            ]
+            for name, quantity, unit, notes in ingredients
+        ],
+    ]
+    raw = json.dumps(content, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def upgrade():
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('external_id', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index('ix_recipes_user_external_id', ['user_id', 'external_id'], unique=False)
+
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('mode', sa.String(length=16), nullable=False, server_default='create'))
+        batch_op.add_column(sa.Column('recipes_updated', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('recipes_unchanged', sa.Integer(), nullable=False, server_default='0'))
+
+    bind = op.get_bind()
+    ingredients = defaultdict(list)
+    for recipe_id, name, quantity, unit, notes in bind.execute(
+        sa.text(
+            'SELECT recipe_id, name, quantity, unit, notes FROM recipe_ingredients '
+            'ORDER BY recipe_id, sort_order'
+        )
+    ):
+        ingredients[recipe_id].append((name, quantity, unit, notes))
+
+    hashes = [
+        {'id': row['id'], 'content_hash': _content_hash(row, ingredients[row['id']])}
+        for row in bind.execute(
+            sa.text(
+                'SELECT id, title, description, servings, prep_min, cook_min, '
+                'instructions, notes FROM recipes'
+            )
+        ).mappings()
+    ]
+    if hashes:
+        bind.execute(
+            sa.text('UPDATE recipes SET content_hash = :content_hash WHERE id = :id'),
+            hashes,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('import_jobs', schema=None) as batch_op:
+        batch_op.drop_column('recipes_unchanged')
+        batch_op.drop_column('recipes_updated')
+        batch_op.drop_column('mode')
+
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_index('ix_recipes_user_external_id')
+        batch_op.drop_column('content_hash')
+        batch_op.drop_column('external_id')
@@ -0,0 +1,45 @@
+"""ingredient name key
+
+Revision ID: f1b3d5a7c9e2
+Revises: e7a9c1d3f5b2
+Create Date: 2026-10-19 09:14:52.306118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b3d5a7c9e2'
+down_revision = 'e7a9c1d3f5b2'
+branch_labels = None
+depends_on = None
+
+
+def _name_key(name):
+    # Frozen copy of models.recipe_ingredient.ingredient_name_key
+    return (name or '').strip().lower()
+
+
+def upgrade():
+    with op.batch_alter_table('recipe_ingredients', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('name_key', sa.String(length=200), nullable=False, server_default=''))
+
+    bind = op.get_bind()
+    keys = [
+        {'id': row_id, 'name_key': _name_key(name)}
+        for row_id, name in bind.execute(sa.text('SELECT id, name FROM recipe_ingredients'))
+    ]
+    if keys:
+        bind.execute(
+            sa.text('UPDATE recipe_ingredients SET name_key = :name_key WHERE id = :id'),
+            keys,
+        )
+
+    # Materialized lists were keyed with SQL lower(trim()); rebuild on next read
+    bind.execute(sa.text('UPDATE meal_plan_weeks SET shopping_list_stale = 1'))
+
+
+def downgrade():
+    with op.batch_alter_table('recipe_ingredients', schema=None) as batch_op:
+        batch_op.drop_column('name_key')
@@ -0,0 +1,43 @@
+"""recipe full text search
+
+Revision ID: f7b9d1e3a5c2
+Revises: e2a6c8d4f1b3
+Create Date: 2026-10-18 14:02:36.285519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7b9d1e3a5c2'
+down_revision = 'e2a6c8d4f1b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS recipe_search USING fts5("
+        "title, description, instructions, ingredients, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "INSERT INTO recipe_search "
+        "(rowid, title, description, instructions, ingredients) "
+        "SELECT r.id, r.title, COALESCE(r.description, ''), "
+        "COALESCE(r.instructions, ''), "
+        "COALESCE((SELECT group_concat(i.name, ' ') "
+        "FROM recipe_ingredients i WHERE i.recipe_id = r.id), '') "
+        "FROM recipes r"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TABLE IF EXISTS recipe_search")
@@ -10,6 +10,10 @@ from app.models.recipe_ingredient import RecipeIngredient
 from app.models.meal_plan_week import MealPlanWeek
 from app.models.meal_group import MealGroup
 from app.models.meal_group_recipe import MealGroupRecipe
+from app.services.ingredient_index_service import rebuild_ingredient_index
+from app.services.recipes_service import rebuild_content_hashes
+from app.services.search_service import rebuild_search_index
+from app.services.similarity_service import rebuild_similarity_index
 
 
 def _week_start_for(d: date) -> date:
@@ -297,6 +301,7 @@ def run():
             for sort_order, (meal_name, pool) in enumerate(zip(meal_names, pools)):
                 group = MealGroup(
                     week_id=week.id,
+                    user_id=user.id,
                     day=day,
                     name=meal_name,
                     sort_order=sort_order,
@@ -308,12 +313,17 @@ def run():
                 db.session.add(
                     MealGroupRecipe(
                         meal_group_id=group.id,
+                        user_id=user.id,
                         recipe_id=recipe.id,
                         planned_servings=recipe.servings or 1,
                         sort_order=0,
                     )
                 )
 
+        rebuild_search_index()
+        rebuild_ingredient_index()
+        rebuild_similarity_index()
+        rebuild_content_hashes()
         db.session.commit()
 
         print("Seed complete.")
@@ -0,0 +1,57 @@
+"""
+An exported CSV must import back idempotently.
+
+Exports name recipes without an external id of their own "mealflo:<id>";
+importing such a file, exporting again and upserting the result must not
+rewrite anything.
+"""
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.models.recipe import Recipe
+from app.models.user import User
+from app.services.csv_import_service import import_recipes_from_csv_text
+from app.services.export_service import export_recipes
+
+
+@pytest.fixture
+def app():
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _export(user_id: int) -> str:
+    return "".join(export_recipes(user_id, "csv"))
+
+
+def test_export_import_export_upsert_is_unchanged(app):
+    user = User(username="roundtrip", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    user_id = user.id
+
+    import_recipes_from_csv_text(
+        user_id, "title,ingredient_name,quantity,unit\nSoup,salt,1,tsp\n"
+    )
+    first = _export(user_id)
+    assert "mealflo:" in first
+
+    created = import_recipes_from_csv_text(user_id, first)
+    assert created["createdCount"] == 1
+    # The copy does not keep the synthesized id
+    assert Recipe.query.filter(Recipe.external_id.isnot(None)).count() == 0
+
+    second = _export(user_id)
+    summary = import_recipes_from_csv_text(user_id, second, mode="upsert")
+    assert summary["createdCount"] == 0
+    assert summary["updatedCount"] == 0
+    assert summary["unchangedCount"] == 2
+
+    for recipe in Recipe.query.order_by(Recipe.id):
+        assert [ing.name for ing in recipe.ingredients] == ["salt"]
@@ -0,0 +1,85 @@
+"""
+parse_recipe_csv_parallel must yield exactly what parse_recipe_csv does,
+whatever the block size, including for files that break off with a read
+error partway: the same recipes come before the same error.
+"""
+
+import csv
+import io
+import random
+
+import pytest
+
+from app.services.csv_import_service import (
+    CsvReadError,
+    parse_recipe_csv,
+    parse_recipe_csv_parallel,
+)
+
+# A lone surrogate is how a surrogateescape stream passes undecodable bytes
+_BAD_LINE = "Soup,\udcff\n"
+
+
+def _random_csv(rng: random.Random) -> str:
+    out = [
+        rng.choice(
+            [
+                "title,external_id,ingredient,quantity,unit,notes\n",
+                "Description,TITLE,ingredient_name,quantity\r\n",
+            ]
+        )
+    ]
+    titles = ["Soup", "Stew", "Pie", " Soup ", "", "Tart"]
+    values = ["a", "b c", '5" pan', '"multi\nline"', '"q""uote"', "", "1.5", "x,y"]
+    for _ in range(rng.randint(0, 150)):
+        fields = [rng.choice(titles)]
+        fields += [rng.choice(values) for _ in range(rng.randint(0, 5))]
+        out.append(",".join(fields) + rng.choice(["\n", "\r\n", "\n\n"]))
+
+    ending = rng.random()
+    if ending < 0.3:
+        out.insert(rng.randint(1, len(out)), _BAD_LINE)
+    elif ending < 0.45:
+        # A quoted field still open when the bad line comes
+        at = rng.randint(1, len(out))
+        out[at:at] = ['Pie,"open\n', _BAD_LINE, 'close"\n']
+    elif ending < 0.55:
+        out.append("Pie," + "x" * (csv.field_size_limit() + 1) + "\n")
+    return "".join(out)
+
+
+def _parse(parse, text: str, **kwargs) -> tuple[list, str | None]:
+    recipes = []
+    try:
+        for parsed in parse(io.StringIO(text, newline=""), **kwargs):
+            parsed.signature = None
+            recipes.append(parsed)
+    except (CsvReadError, csv.Error) as e:
+        return recipes, f"{type(e).__name__}: {e}"
+    return recipes, None
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_parallel_parse_matches_serial(seed):
+    rng = random.Random(seed)
+    for _ in range(3):
+        text = _random_csv(rng)
+        expected = _parse(parse_recipe_csv, text)
+        got = _parse(
+            parse_recipe_csv_parallel,
+            text,
+            workers=2,
+            block_chars=rng.randint(1, 400),
+        )
+        assert got == expected
+
+
+def test_parallel_parse_keeps_blocks_read_before_a_bad_line():
+    rows = "".join(f"Dish {n},salt\n" for n in range(40))
+    text = "title,ingredient\n" + rows + _BAD_LINE
+
+    recipes, error = _parse(
+        parse_recipe_csv_parallel, text, workers=2, block_chars=64
+    )
+    assert [r.title for r in recipes] == [f"Dish {n}" for n in range(39)]
+    assert error == "CsvReadError: Line 42: File is not valid UTF-8"
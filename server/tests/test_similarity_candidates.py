@@ -0,0 +1,81 @@
+"""
+Duplicate lookups cap their candidates at MAX_CANDIDATES, but must keep the
+recipes sharing the most LSH buckets: crowded buckets must not hide a true
+duplicate behind recipes that share only one band with it.
+"""
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.models.recipe import Recipe
+from app.models.user import User
+from app.services.similarity_service import (
+    LSH_BANDS,
+    MAX_CANDIDATES,
+    NUM_PERM,
+    DuplicateDetector,
+    find_similar_recipes,
+    store_signatures,
+)
+
+
+@pytest.fixture
+def app():
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _library(decoys_per_band: int) -> tuple[int, tuple[int, ...], int, int]:
+    """
+    For every LSH band, `decoys_per_band` recipes sharing only that band
+    with a base signature; then the base recipe and its exact duplicate,
+    stored last. Returns (user id, base signature, base id, duplicate id).
+    """
+    user = User(username="lookalikes", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+
+    base = tuple(range(NUM_PERM))
+    rows = NUM_PERM // LSH_BANDS
+    signatures = []
+    for band in range(LSH_BANDS):
+        for n in range(decoys_per_band):
+            unique = 1000 + len(signatures) * NUM_PERM
+            signature = [unique + k for k in range(NUM_PERM)]
+            shared = slice(band * rows, (band + 1) * rows)
+            signature[shared] = base[shared]
+            signatures.append(tuple(signature))
+    signatures += [base, base]
+
+    recipes = [Recipe(user_id=user.id, title="Soup") for _ in signatures]
+    db.session.add_all(recipes)
+    db.session.flush()
+    store_signatures(
+        [(recipe.id, user.id, sig) for recipe, sig in zip(recipes, signatures)]
+    )
+    db.session.commit()
+    return user.id, base, recipes[-2].id, recipes[-1].id
+
+
+def test_find_similar_keeps_duplicate_behind_crowded_bucket(app):
+    user_id, _, base_id, duplicate_id = _library(MAX_CANDIDATES + 10)
+
+    matches = find_similar_recipes(user_id, base_id)
+    assert [m["recipeId"] for m in matches] == [duplicate_id]
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_detector_keeps_duplicate_behind_crowded_bucket(app, prefetch):
+    user_id, base, base_id, _ = _library(MAX_CANDIDATES + 10)
+
+    detector = DuplicateDetector(user_id)
+    if prefetch:
+        detector.prefetch([base])
+    recipe_id, score = detector.find(base)
+    assert score == 1.0
+    assert recipe_id == base_id
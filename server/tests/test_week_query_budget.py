@@ -0,0 +1,91 @@
+"""
+Loading a week with its groups must cost a fixed number of queries.
+
+`get_week_by_id(..., include_groups=True)` followed by `to_dict` is the
+planner's hot path; a lazy load slipping back into the tree would make the
+query count grow with the number of placements.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.meal_group import MealGroup
+from app.models.meal_group_recipe import MealGroupRecipe
+from app.models.meal_plan_week import MealPlanWeek
+from app.models.recipe import Recipe
+from app.models.user import User
+from app.services.meal_plans_service import get_week_by_id
+
+
+@pytest.fixture
+def app():
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _make_week(user: User, week_start: date, placements_per_group: int) -> int:
+    """A week with a group per day, each placing its own distinct recipes."""
+    week = MealPlanWeek(user_id=user.id, week_start=week_start)
+    db.session.add(week)
+    db.session.flush()
+    for offset in range(7):
+        group = MealGroup(
+            week_id=week.id,
+            user_id=user.id,
+            day=week_start + timedelta(days=offset),
+            name="Dinner",
+        )
+        db.session.add(group)
+        db.session.flush()
+        for n in range(placements_per_group):
+            recipe = Recipe(user_id=user.id, title=f"{group.day} #{n}")
+            db.session.add(recipe)
+            db.session.flush()
+            db.session.add(
+                MealGroupRecipe(
+                    meal_group_id=group.id,
+                    user_id=user.id,
+                    recipe_id=recipe.id,
+                    sort_order=n,
+                )
+            )
+    db.session.commit()
+    return week.id
+
+
+def _count_week_queries(user_id: int, week_id: int) -> int:
+    db.session.expunge_all()
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        week = get_week_by_id(user_id, week_id, include_groups=True)
+        data = week.to_dict(include_groups=True)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+
+    assert len(data["mealGroups"]) == 7
+    return len(statements)
+
+
+def test_week_with_groups_query_count_is_flat(app):
+    user = User(username="budget", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+
+    user_id = user.id
+    small = _make_week(user, date(2030, 1, 7), placements_per_group=2)
+    large = _make_week(user, date(2030, 1, 14), placements_per_group=8)
+
+    assert _count_week_queries(user_id, small) == _count_week_queries(user_id, large)